@@ -0,0 +1,129 @@
+"""
+pyesi-client:
+
+Auth hot path benchmark
+
+Measures the client-side overhead of token refreshes and JWT verification against an
+in-process fake of EVE SSO, so only pyesi-client work is timed.
+
+Usage: python benchmarks/auth_overhead.py [iterations]
+"""
+
+import base64
+import json
+import sys
+import time
+import timeit
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from pyesi_client import EsiAuth, EsiScope, EsiScopeManager
+
+CLIENT_ID = "benchmark-client"
+KID = "JWT-Signature-Key"
+METADATA = {
+    "issuer": "https://login.eveonline.com",
+    "authorization_endpoint": "https://login.eveonline.com/v2/oauth/authorize",
+    "token_endpoint": "https://login.eveonline.com/v2/oauth/token",
+    "jwks_uri": "https://login.eveonline.com/oauth/jwks",
+    "revocation_endpoint": "https://login.eveonline.com/v2/oauth/revoke",
+}
+
+
+def _b64url_uint(value: int) -> str:
+    return base64.urlsafe_b64encode(value.to_bytes(32, "big")).decode().rstrip("=")
+
+
+class _FakeResponse:
+    def __init__(self, body: bytes) -> None:
+        self.status = 200
+        self.data = body
+
+    def read(self) -> bytes:
+        return self.data
+
+
+class _FakeSsoApiClient:
+    """Serves SSO metadata, signing keys and token responses without any network I/O."""
+
+    def __init__(self) -> None:
+        self.private_key = ec.generate_private_key(ec.SECP256R1())
+        numbers = self.private_key.public_key().public_numbers()
+        self.jwks = {
+            "keys": [
+                {
+                    "alg": "ES256",
+                    "crv": "P-256",
+                    "kid": KID,
+                    "kty": "EC",
+                    "use": "sig",
+                    "x": _b64url_uint(numbers.x),
+                    "y": _b64url_uint(numbers.y),
+                }
+            ]
+        }
+        # Encoded and signed once so refreshes time the client, not the fake SSO
+        token_body = {
+            "access_token": self.access_token(),
+            "expires_in": 1199,
+            "token_type": "Bearer",
+            "refresh_token": "r",
+        }
+        self.responses = {
+            METADATA["jwks_uri"]: _FakeResponse(json.dumps(self.jwks).encode()),
+            METADATA["token_endpoint"]: _FakeResponse(json.dumps(token_body).encode()),
+        }
+        self.metadata_response = _FakeResponse(json.dumps(METADATA).encode())
+
+    def access_token(self) -> str:
+        now = int(time.time())
+        payload = {
+            "scp": [EsiScope.SKILLS_READ_SKILLS.value, EsiScope.WALLET_READ_CHARACTER_WALLET.value],
+            "jti": "benchmark",
+            "kid": KID,
+            "sub": "CHARACTER:EVE:90000001",
+            "azp": CLIENT_ID,
+            "tenant": "tranquility",
+            "tier": "live",
+            "region": "world",
+            "aud": [CLIENT_ID, "EVE Online"],
+            "name": "Benchmark Pilot",
+            "owner": "owner-hash",
+            "exp": now + 1200,
+            "iat": now,
+            "iss": METADATA["issuer"],
+        }
+        return jwt.encode(payload, self.private_key, algorithm="ES256", headers={"kid": KID})
+
+    def call_api(self, method: str, url: str, **kwargs: object) -> _FakeResponse:
+        return self.responses.get(url, self.metadata_response)
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    api_client = _FakeSsoApiClient()
+    auth = EsiAuth(
+        api_client,  # type: ignore[arg-type]
+        EsiScopeManager(),
+        "http://localhost",
+        CLIENT_ID,
+        client_secret="benchmark-secret",
+        refresh_token="r",
+    )
+    auth.verify()  # warm metadata and keys
+
+    cases = {
+        "endpoints.token_endpoint": lambda: auth.endpoints.token_endpoint,
+        "issuer": lambda: auth.issuer,
+        "token request headers": auth._get_auth_headers,
+        "refresh (fake SSO)": lambda: auth.refresh("r"),
+        "verify": auth.verify,
+    }
+    for name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=iterations, repeat=5))
+        print(f"{name:<26} {seconds / iterations * 1e6:10.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+pyesi-client:
+
+Parallel paged fetch benchmark
+
+Measures how throughput of parse-heavy paged fetches scales with thread count. Market
+order pages are served by an in-process transport, so the time is spent in pyesi-client,
+urllib3 response handling and pydantic validation. On a free-threaded build (3.13t) the
+parse threads run in parallel; with the GIL they take turns.
+
+Usage: python benchmarks/parallel_pages.py [pages] [max_threads]
+"""
+
+import json
+import os
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import urllib3
+from pyesi_openapi.rest import RESTResponse
+
+from pyesi_client import EsiClient, EsiExecutorMode, EsiTransport
+
+ORDERS_PER_PAGE = 1000
+REGION_ID = 10000002
+
+
+def _page_body(page: int) -> bytes:
+    orders = [
+        {
+            "duration": 90,
+            "is_buy_order": order_id % 2 == 0,
+            "issued": "2025-09-01T12:00:00Z",
+            "location_id": 60003760,
+            "min_volume": 1,
+            "order_id": page * ORDERS_PER_PAGE + order_id,
+            "price": 5.5 + order_id,
+            "range": "region",
+            "system_id": 30000142,
+            "type_id": 34 + order_id % 500,
+            "volume_remain": 100,
+            "volume_total": 100,
+        }
+        for order_id in range(ORDERS_PER_PAGE)
+    ]
+    return json.dumps(orders).encode()
+
+
+class _PagedOrdersTransport(EsiTransport):
+    """Serves pre-encoded order pages without any network I/O."""
+
+    def __init__(self, pages: int) -> None:
+        self.pages = pages
+        self.bodies = {page: _page_body(page) for page in range(1, pages + 1)}
+
+    def request(self, method, url, headers=None, body=None, post_params=None, _request_timeout=None):  # type: ignore[no-untyped-def]
+        page = int(parse_qs(urlsplit(url).query).get("page", ["1"])[0])
+        response = urllib3.HTTPResponse(
+            body=self.bodies[page],
+            headers={"Content-Type": "application/json", "X-Pages": str(self.pages)},
+            status=200,
+            preload_content=False,
+        )
+        return RESTResponse(response)
+
+
+def _thread_counts(max_threads: int) -> list[int]:
+    counts = [1]
+    while counts[-1] * 2 <= max_threads:
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def main() -> None:
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    max_threads = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    transport = _PagedOrdersTransport(pages)
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if is_gil_enabled else 'disabled'}, {os.cpu_count()} CPUs")
+    print(f"{pages} pages of {ORDERS_PER_PAGE} orders")
+
+    baseline = None
+    for threads in _thread_counts(max_threads):
+        client = EsiClient(
+            "benchmark-client",
+            transport=transport,
+            executor_mode=EsiExecutorMode.THREAD,
+            executor_workers=threads,
+        )
+        client.executor.min_offload_bytes = 0
+        fetch = client.market.get_markets_region_id_orders
+        client.fetch_pages(fetch, region_id=REGION_ID, order_type="all", max_concurrency=threads)  # warm up
+
+        best = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            orders = client.fetch_pages(fetch, region_id=REGION_ID, order_type="all", max_concurrency=threads)
+            best = min(best, time.perf_counter() - started)
+        assert len(orders) == pages * ORDERS_PER_PAGE
+        client.close()
+
+        baseline = baseline or best
+        print(f"{threads:>3} threads {pages / best:10.1f} pages/s {baseline / best:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
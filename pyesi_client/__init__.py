@@ -8,7 +8,112 @@ caching, rate limiting, and utility functions.
 
 __version__ = "0.1.0"
 
-from pyesi_client.constants import EsiScope
-from pyesi_client.core import EsiAuth, EsiClient, EsiMetadataManager, EsiScopeManager
+from pyesi_client.constants import (
+    EsiCircuitState,
+    EsiCorporationRole,
+    EsiExecutorMode,
+    EsiIndustryActivity,
+    EsiMapEventType,
+    EsiPriority,
+    EsiResultFormat,
+    EsiRouteFlag,
+    EsiScope,
+)
+from pyesi_client.core import (
+    EsiAdaptiveLimit,
+    EsiAuth,
+    EsiBatch,
+    EsiBlobStore,
+    EsiCharacterRouter,
+    EsiCircuitBreakers,
+    EsiCircuitOpenError,
+    EsiClient,
+    EsiHashRing,
+    EsiMemoryTokenStore,
+    EsiMetadataManager,
+    EsiOperationIndex,
+    EsiParseExecutor,
+    EsiRecordingTransport,
+    EsiReplayTransport,
+    EsiRequestScheduler,
+    EsiScopeIndex,
+    EsiScopeManager,
+    EsiScopeSet,
+    EsiShard,
+    EsiShardCoordinator,
+    EsiSqliteTokenStore,
+    EsiTokenPool,
+    EsiTokenStore,
+    EsiTransport,
+    EsiTransportArchive,
+    EsiTtlCache,
+)
+from pyesi_client.services import (
+    EsiAssetEngine,
+    EsiAssetTree,
+    EsiContractCrawler,
+    EsiEntityResolver,
+    EsiFetchGraph,
+    EsiIndustryFeed,
+    EsiKillmailPipeline,
+    EsiMapState,
+    EsiMarketHistory,
+    EsiMarketHistoryLoader,
+    EsiRouteEngine,
+    EsiUniversePreloader,
+    EsiUniverseTables,
+    EsiWalletSync,
+)
 
-__all__ = ["EsiAuth", "EsiClient", "EsiMetadataManager", "EsiScopeManager", "EsiScope"]
+__all__ = [
+    "EsiAuth",
+    "EsiClient",
+    "EsiMetadataManager",
+    "EsiScopeManager",
+    "EsiScopeSet",
+    "EsiScopeIndex",
+    "EsiScope",
+    "EsiCorporationRole",
+    "EsiTokenPool",
+    "EsiTokenStore",
+    "EsiMemoryTokenStore",
+    "EsiSqliteTokenStore",
+    "EsiTransport",
+    "EsiTransportArchive",
+    "EsiRecordingTransport",
+    "EsiReplayTransport",
+    "EsiOperationIndex",
+    "EsiCharacterRouter",
+    "EsiRequestScheduler",
+    "EsiAdaptiveLimit",
+    "EsiCircuitBreakers",
+    "EsiCircuitOpenError",
+    "EsiCircuitState",
+    "EsiPriority",
+    "EsiHashRing",
+    "EsiShard",
+    "EsiShardCoordinator",
+    "EsiBatch",
+    "EsiParseExecutor",
+    "EsiExecutorMode",
+    "EsiResultFormat",
+    "EsiBlobStore",
+    "EsiTtlCache",
+    "EsiKillmailPipeline",
+    "EsiUniversePreloader",
+    "EsiUniverseTables",
+    "EsiRouteEngine",
+    "EsiRouteFlag",
+    "EsiEntityResolver",
+    "EsiFetchGraph",
+    "EsiWalletSync",
+    "EsiAssetEngine",
+    "EsiAssetTree",
+    "EsiContractCrawler",
+    "EsiIndustryFeed",
+    "EsiIndustryActivity",
+    "EsiMarketHistory",
+    "EsiMarketHistoryLoader",
+    "EsiMapState",
+    "EsiMapEventType",
+]
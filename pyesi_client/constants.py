@@ -22,6 +22,41 @@ DEFAULT_BACKOFF_FACTOR = 3
 DEFAULT_BACKOFF_JITTER = 0.5
 DEFAULT_BACKOFF_MAX = 300
 DEFAULT_COMPATIBILITY_DATE = date(2025, 8, 26)
+DEFAULT_PAGE_CONCURRENCY = 8
+DEFAULT_BATCH_CONCURRENCY = 16
+DEFAULT_KILLMAIL_CONCURRENCY = 16
+DEFAULT_INGESTED_KILLMAILS = 100_000  # killmail ids a pipeline remembers as yielded
+DEFAULT_UNIVERSE_CONCURRENCY = 20
+DEFAULT_UNIVERSE_ATTEMPTS = 3  # tries per id before a universe preload fails
+DEFAULT_ROUTE_CACHE_SIZE = 256
+DEFAULT_TTL_CACHE_SIZE = 10_000
+DEFAULT_ENTITY_CONCURRENCY = 20
+DEFAULT_ENTITY_TTL = 3600  # seconds, used when a response has no Expires header
+DEFAULT_WALLET_CONCURRENCY = 16
+DEFAULT_ASSET_CONCURRENCY = 8
+DEFAULT_CONTRACT_CONCURRENCY = 16
+DEFAULT_HISTORY_CONCURRENCY = 20
+DEFAULT_GRAPH_CONCURRENCY = 20
+WALLET_DIVISIONS = (1, 2, 3, 4, 5, 6, 7)  # corporation wallet divisions
+DEFAULT_PRICE_TTL = 3600  # seconds, used when price or cost index responses have no Expires header
+SCC_SURCHARGE = 0.04  # share of the estimated item value added to every industry job
+DEFAULT_MAP_TTL = 300  # seconds, used when map responses have no Expires header
+DEFAULT_CONTESTED_THRESHOLDS = (0.25, 0.5, 0.75, 0.9)  # faction warfare victory point shares
+DEFAULT_REFRESH_LEASE_TTL = 30  # seconds a process may hold a shared token refresh lease
+DEFAULT_LEASE_POLL_INTERVAL = 0.25  # seconds between store reads while another process refreshes
+DEFAULT_SHARD_REPLICAS = 64  # hash ring points per worker
+DEFAULT_SHARD_TTL = 30  # seconds without heartbeat after which a worker is considered gone
+DEFAULT_MAX_CONCURRENCY = 32  # concurrent requests allowed by a request scheduler
+DEFAULT_INTERACTIVE_RESERVED = 4  # scheduler slots only interactive requests may use
+DEFAULT_ADAPTIVE_MAX = 256  # highest concurrency an adaptive limit grows to
+DEFAULT_ADAPTIVE_BACKOFF = 0.5  # factor applied to an adaptive limit when ESI sheds load
+DEFAULT_ADAPTIVE_COOLDOWN = 1.0  # seconds between two decreases of an adaptive limit
+DEFAULT_LATENCY_TOLERANCE = 2.0  # smoothed latency over the fastest recent latency that counts as overload
+DEFAULT_ERROR_LIMIT_FLOOR = 20  # remaining ESI error budget below which the adaptive limit backs off
+DEFAULT_CIRCUIT_THRESHOLD = 5  # consecutive failures of an operation that open its circuit
+DEFAULT_CIRCUIT_RESET_TIMEOUT = 30.0  # seconds an open circuit waits before letting a probe request through
+MAX_BULK_IDS = 1000  # ids per request for affiliation and names lookups
+HIGHSEC_THRESHOLD = 0.45  # security status that rounds to 0.5
 
 
 class EsiResponseType(str, Enum):
@@ -132,3 +167,125 @@ class EsiScope(str, Enum):
     UNIVERSE_READ_STRUCTURES = "esi-universe.read_structures.v1"
     WALLET_READ_CHARACTER_WALLET = "esi-wallet.read_character_wallet.v1"
     WALLET_READ_CORPORATION_WALLETS = "esi-wallet.read_corporation_wallets.v1"
+
+
+class EsiCorporationRole(str, Enum):
+    """In-game corporation roles checked by ESI corporation endpoints"""
+
+    ACCOUNT_TAKE_1 = "Account_Take_1"
+    ACCOUNT_TAKE_2 = "Account_Take_2"
+    ACCOUNT_TAKE_3 = "Account_Take_3"
+    ACCOUNT_TAKE_4 = "Account_Take_4"
+    ACCOUNT_TAKE_5 = "Account_Take_5"
+    ACCOUNT_TAKE_6 = "Account_Take_6"
+    ACCOUNT_TAKE_7 = "Account_Take_7"
+    ACCOUNTANT = "Accountant"
+    AUDITOR = "Auditor"
+    BRAND_MANAGER = "Brand_Manager"
+    COMMUNICATIONS_OFFICER = "Communications_Officer"
+    CONFIG_EQUIPMENT = "Config_Equipment"
+    CONFIG_STARBASE_EQUIPMENT = "Config_Starbase_Equipment"
+    CONTAINER_TAKE_1 = "Container_Take_1"
+    CONTAINER_TAKE_2 = "Container_Take_2"
+    CONTAINER_TAKE_3 = "Container_Take_3"
+    CONTAINER_TAKE_4 = "Container_Take_4"
+    CONTAINER_TAKE_5 = "Container_Take_5"
+    CONTAINER_TAKE_6 = "Container_Take_6"
+    CONTAINER_TAKE_7 = "Container_Take_7"
+    CONTRACT_MANAGER = "Contract_Manager"
+    DELIVERIES_CONTAINER_TAKE = "Deliveries_Container_Take"
+    DELIVERIES_QUERY = "Deliveries_Query"
+    DELIVERIES_TAKE = "Deliveries_Take"
+    DIPLOMAT = "Diplomat"
+    DIRECTOR = "Director"
+    FACTORY_MANAGER = "Factory_Manager"
+    FITTING_MANAGER = "Fitting_Manager"
+    HANGAR_QUERY_1 = "Hangar_Query_1"
+    HANGAR_QUERY_2 = "Hangar_Query_2"
+    HANGAR_QUERY_3 = "Hangar_Query_3"
+    HANGAR_QUERY_4 = "Hangar_Query_4"
+    HANGAR_QUERY_5 = "Hangar_Query_5"
+    HANGAR_QUERY_6 = "Hangar_Query_6"
+    HANGAR_QUERY_7 = "Hangar_Query_7"
+    HANGAR_TAKE_1 = "Hangar_Take_1"
+    HANGAR_TAKE_2 = "Hangar_Take_2"
+    HANGAR_TAKE_3 = "Hangar_Take_3"
+    HANGAR_TAKE_4 = "Hangar_Take_4"
+    HANGAR_TAKE_5 = "Hangar_Take_5"
+    HANGAR_TAKE_6 = "Hangar_Take_6"
+    HANGAR_TAKE_7 = "Hangar_Take_7"
+    JUNIOR_ACCOUNTANT = "Junior_Accountant"
+    PERSONNEL_MANAGER = "Personnel_Manager"
+    PROJECT_MANAGER = "Project_Manager"
+    RENT_FACTORY_FACILITY = "Rent_Factory_Facility"
+    RENT_OFFICE = "Rent_Office"
+    RENT_RESEARCH_FACILITY = "Rent_Research_Facility"
+    SECURITY_OFFICER = "Security_Officer"
+    SKILL_PLAN_MANAGER = "Skill_Plan_Manager"
+    STARBASE_DEFENSE_OPERATOR = "Starbase_Defense_Operator"
+    STARBASE_FUEL_TECHNICIAN = "Starbase_Fuel_Technician"
+    STATION_MANAGER = "Station_Manager"
+    TRADER = "Trader"
+
+
+class EsiExecutorMode(str, Enum):
+    """Where response bodies of bulk operations are parsed and validated."""
+
+    AUTO = "auto"
+    INLINE = "inline"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class EsiResultFormat(str, Enum):
+    """Shape of parsed bulk results."""
+
+    MODEL = "model"
+    DICT = "dict"
+    COLUMNS = "columns"
+
+
+class EsiRouteFlag(str, Enum):
+    """Route preference, as accepted by RoutesApi."""
+
+    SHORTEST = "shortest"
+    SECURE = "secure"
+    INSECURE = "insecure"
+
+
+class EsiIndustryActivity(str, Enum):
+    """Industry activities with a system cost index."""
+
+    MANUFACTURING = "manufacturing"
+    RESEARCHING_TIME_EFFICIENCY = "researching_time_efficiency"
+    RESEARCHING_MATERIAL_EFFICIENCY = "researching_material_efficiency"
+    COPYING = "copying"
+    INVENTION = "invention"
+    REACTION = "reaction"
+
+
+class EsiPriority(str, Enum):
+    """Request scheduler priority classes, highest first."""
+
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+    BULK = "bulk"
+
+
+class EsiMapEventType(str, Enum):
+    """Kinds of sovereignty and faction warfare map changes."""
+
+    OWNER_CHANGED = "owner_changed"
+    ADM_CHANGED = "adm_changed"
+    CAMPAIGN_STARTED = "campaign_started"
+    CAMPAIGN_ENDED = "campaign_ended"
+    OCCUPIER_CHANGED = "occupier_changed"
+    CONTESTED_THRESHOLD = "contested_threshold"
+
+
+class EsiCircuitState(str, Enum):
+    """States of a per-operation circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
@@ -4,9 +4,60 @@ pyesi-client:
 Core Modules
 """
 
+from pyesi_client.core.adaptive import EsiAdaptiveLimit
+from pyesi_client.core.cache import EsiBlobStore, EsiTtlCache
 from pyesi_client.core.metadata_manager import JWK_TTL_DEFAULT, METADATA_TTL_DEFAULT, EsiMetadataManager
-from pyesi_client.core.scope_manager import EsiScopeManager
+from pyesi_client.core.scope_manager import EsiScopeIndex, EsiScopeManager, EsiScopeSet
 from pyesi_client.core.auth import EsiAuth
+from pyesi_client.core.token_store import EsiMemoryTokenStore, EsiSqliteTokenStore, EsiTokenStore
+from pyesi_client.core.token_pool import EsiTokenPool
+from pyesi_client.core.transport import (
+    EsiRecordingTransport,
+    EsiReplayTransport,
+    EsiTransport,
+    EsiTransportArchive,
+)
+from pyesi_client.core.operations import EsiOperationIndex, get_operation_index
+from pyesi_client.core.circuit import EsiCircuitBreakers, EsiCircuitOpenError
+from pyesi_client.core.router import EsiCharacterRouter
+from pyesi_client.core.scheduler import EsiRequestScheduler, request_context
+from pyesi_client.core.compatibility import compatibility_context
+from pyesi_client.core.sharding import EsiHashRing, EsiShard, EsiShardCoordinator
+from pyesi_client.core.batch import EsiBatch
+from pyesi_client.core.executor import EsiParseExecutor
 from pyesi_client.core.client import EsiClient
 
-__all__ = ["EsiClient", "EsiAuth", "EsiScopeManager", "EsiMetadataManager", "JWK_TTL_DEFAULT", "METADATA_TTL_DEFAULT"]
+__all__ = [
+    "EsiClient",
+    "EsiAuth",
+    "EsiScopeManager",
+    "EsiScopeSet",
+    "EsiScopeIndex",
+    "EsiMetadataManager",
+    "EsiTokenPool",
+    "EsiTokenStore",
+    "EsiMemoryTokenStore",
+    "EsiSqliteTokenStore",
+    "EsiTransport",
+    "EsiTransportArchive",
+    "EsiRecordingTransport",
+    "EsiReplayTransport",
+    "EsiOperationIndex",
+    "EsiCharacterRouter",
+    "EsiRequestScheduler",
+    "EsiAdaptiveLimit",
+    "EsiCircuitBreakers",
+    "EsiCircuitOpenError",
+    "request_context",
+    "compatibility_context",
+    "EsiHashRing",
+    "EsiShard",
+    "EsiShardCoordinator",
+    "EsiBatch",
+    "EsiParseExecutor",
+    "EsiBlobStore",
+    "EsiTtlCache",
+    "get_operation_index",
+    "JWK_TTL_DEFAULT",
+    "METADATA_TTL_DEFAULT",
+]
@@ -0,0 +1,128 @@
+"""
+pyesi-client:
+
+Adaptive Concurrency
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any
+
+from pyesi_client.constants import (
+    DEFAULT_ADAPTIVE_BACKOFF,
+    DEFAULT_ADAPTIVE_COOLDOWN,
+    DEFAULT_ADAPTIVE_MAX,
+    DEFAULT_ERROR_LIMIT_FLOOR,
+    DEFAULT_LATENCY_TOLERANCE,
+    DEFAULT_MAX_CONCURRENCY,
+)
+
+# Statuses meaning ESI or its proxy is shedding load
+_OVERLOAD_STATUSES = frozenset({420, 429, 503, 504})
+# Weight of each sample in the smoothed latency
+_LATENCY_SMOOTHING = 0.1
+# Per-sample growth of the latency baseline, so it follows ESI when it gets slower for good
+_BASELINE_DRIFT = 1.001
+
+logger = logging.getLogger(__name__)
+
+
+class EsiAdaptiveLimit:
+    """
+    Concurrency limit adjusted from observed ESI responses by additive increase, multiplicative decrease.
+
+    Every healthy response grows the limit by 1/limit, about one slot per round trip of the
+    whole window. The limit is multiplied by backoff when ESI sheds load (420, 429, 503, 504),
+    when the error limit remaining drops below error_limit_floor, or when smoothed latency
+    exceeds latency_tolerance times the fastest recent latency. Decreases are at most one per
+    cooldown, so one burst of failures counts once. A Retry-After header pauses new requests.
+    """
+
+    def __init__(
+        self,
+        initial: int = DEFAULT_MAX_CONCURRENCY,
+        *,
+        min_limit: int = 1,
+        max_limit: int = DEFAULT_ADAPTIVE_MAX,
+        backoff: float = DEFAULT_ADAPTIVE_BACKOFF,
+        latency_tolerance: float = DEFAULT_LATENCY_TOLERANCE,
+        error_limit_floor: int = DEFAULT_ERROR_LIMIT_FLOOR,
+        cooldown: float = DEFAULT_ADAPTIVE_COOLDOWN,
+    ) -> None:
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= initial <= max_limit")
+        self.min_limit: int = min_limit
+        self.max_limit: int = max_limit
+        self.backoff: float = backoff
+        self.latency_tolerance: float = latency_tolerance
+        self.error_limit_floor: int = error_limit_floor
+        self.cooldown: float = cooldown
+        self.paused_until: float = 0.0
+        self._limit: float = float(initial)
+        self._baseline: float | None = None
+        self._latency: float | None = None
+        self._last_decrease: float = 0.0
+        self._decreases: int = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "latency": self._latency,
+            "latency_baseline": self._baseline,
+            "decreases": self._decreases,
+            "paused_until": self.paused_until,
+        }
+
+    def observe(self, latency: float, status: int, headers: Mapping[str, str] | None = None) -> None:
+        """Adjust the limit from one completed request; status 0 stands for a transport failure."""
+        headers = headers or {}
+        now = time.time()
+        with self._lock:
+            retry_after = _retry_after(headers)
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+            overloaded = status == 0 or status in _OVERLOAD_STATUSES
+            remain = headers.get("X-ESI-Error-Limit-Remain") or headers.get("x-esi-error-limit-remain")
+            if remain is not None and int(remain) < self.error_limit_floor:
+                overloaded = True
+            if not overloaded and 200 <= status < 500:
+                self._observe_latency(latency)
+                slow = self._latency > self.latency_tolerance * self._baseline  # type: ignore[operator]
+            else:
+                slow = False
+
+            if overloaded or slow:
+                if now - self._last_decrease >= self.cooldown:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                    self._last_decrease = now
+                    self._decreases += 1
+                    reason = f"status {status}" if overloaded else f"latency {self._latency:.3f}s"
+                    logger.info(f"Concurrency limit lowered to {self.limit} after {reason}")
+            else:
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+
+    def _observe_latency(self, latency: float) -> None:
+        if self._baseline is None or self._latency is None:
+            self._baseline = self._latency = latency
+            return
+        self._latency += _LATENCY_SMOOTHING * (latency - self._latency)
+        self._baseline = min(self._baseline * _BASELINE_DRIFT, latency)
+
+
+def _retry_after(headers: Mapping[str, str]) -> float | None:
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        # HTTP dates are not sent by ESI, treat them as unknown
+        return None
@@ -0,0 +1,88 @@
+"""
+pyesi-client:
+
+API Client
+"""
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+from pyesi_openapi import ApiClient, Configuration
+
+from pyesi_client.core.circuit import EsiCircuitBreakers
+from pyesi_client.core.scheduler import EsiRequestScheduler
+
+
+class EsiConfiguration(Configuration):
+    """
+    Configuration reading the access token from token_provider for every authenticated request.
+
+    The generated Configuration keeps one access_token field that would have to be rewritten
+    after every refresh while other threads read it; a provider such as EsiAuth.access_token
+    returns the current token, refreshing it once when expired, without shared writes.
+    """
+
+    def __init__(self, *args: Any, token_provider: Callable[[], str] | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.token_provider: Callable[[], str] | None = token_provider
+
+    def auth_settings(self) -> Any:
+        if self.token_provider is None:
+            return super().auth_settings()
+        return {
+            "OAuth2": {
+                "type": "oauth2",
+                "in": "header",
+                "key": "Authorization",
+                "value": f"Bearer {self.token_provider()}",
+            }
+        }
+
+
+class EsiApiClient(ApiClient):
+    """
+    API client passing every request through the client's scheduler and circuit breakers.
+
+    A request first checks its operation's circuit, so an open circuit fails fast without
+    waiting for a slot, then holds a scheduler slot from sending until its body is read.
+    """
+
+    def __init__(
+        self,
+        configuration: Configuration,
+        *,
+        scheduler: EsiRequestScheduler | None = None,
+        circuits: EsiCircuitBreakers | None = None,
+    ) -> None:
+        super().__init__(configuration)
+        self.scheduler: EsiRequestScheduler | None = scheduler
+        self.circuits: EsiCircuitBreakers | None = circuits
+
+    def call_api(self, method: str, url: str, *args: Any, **kwargs: Any) -> Any:
+        operation = None
+        if self.circuits:
+            operation = self.circuits.operation_for(method, url)
+            self.circuits.allow(operation)
+        if self.scheduler:
+            with self.scheduler.slot():
+                return self._call(operation, method, url, *args, **kwargs)
+        return self._call(operation, method, url, *args, **kwargs)
+
+    def _call(self, operation: str | None, method: str, url: str, *args: Any, **kwargs: Any) -> Any:
+        started = time.monotonic()
+        try:
+            response = super().call_api(method, url, *args, **kwargs)
+            # Reading here keeps slow downloads counted; generated methods reuse the read body
+            response.read()
+        except Exception:
+            self._observe(operation, time.monotonic() - started, 0, None)
+            raise
+        self._observe(operation, time.monotonic() - started, response.status, response.getheaders())
+        return response
+
+    def _observe(self, operation: str | None, latency: float, status: int, headers: Any) -> None:
+        if self.scheduler:
+            self.scheduler.observe(latency, status, headers)
+        if self.circuits and operation:
+            self.circuits.record(operation, status)
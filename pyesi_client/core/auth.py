@@ -6,23 +6,30 @@ SSO
 
 import base64
 import hashlib
+import logging
+import os
 import secrets
+import socket
+import threading
 import time
 import urllib.parse
+from pathlib import Path
 
 import jwt
-from jwt import PyJWK
 from pyesi_openapi import ApiClient, ApiException
 
 from pyesi_client.constants import (
     DEFAULT_ESI_AUDIENCE,
     DEFAULT_ESI_ENDPOINTS_URL,
     DEFAULT_ESI_JWK_KID,
+    DEFAULT_LEASE_POLL_INTERVAL,
+    DEFAULT_REFRESH_LEASE_TTL,
     EsiCodeChallengeMethod,
     EsiResponseType,
 )
 from pyesi_client.core.metadata_manager import JWK_TTL_DEFAULT, METADATA_TTL_DEFAULT, EsiMetadataManager
 from pyesi_client.core.scope_manager import EsiScopeManager
+from pyesi_client.core.token_store import EsiTokenStore
 from pyesi_client.models.auth_models import (
     EsiAuthorizationCodeRequest,
     EsiAuthorizationUrlData,
@@ -40,6 +47,8 @@ from pyesi_client.models.token_models import (
     EsiTokenSet,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class EsiAuth:
     def __init__(
@@ -54,20 +63,44 @@ class EsiAuth:
         metadata_ttl: int = METADATA_TTL_DEFAULT,
         jwks_ttl: int = JWK_TTL_DEFAULT,
         refresh_token: str | None = None,
+        metadata_manager: EsiMetadataManager | None = None,
+        metadata_cache_dir: str | Path | None = None,
+        token_store: EsiTokenStore | None = None,
+        token_key: str | None = None,
+        lease_ttl: float = DEFAULT_REFRESH_LEASE_TTL,
     ) -> None:
+        """
+        With a token_store, token sets are shared under token_key with every process using the
+        same store, and refreshes are coordinated so only one of them calls SSO. token_key
+        defaults to a hash of refresh_token, or the character id after exchange_code.
+
+        Threads share one token set: reading it never locks, and when it expires one thread
+        refreshes while the others wait for its result, so SSO sees a single refresh.
+        """
         self.api_client: ApiClient = api_client
         self.scope_manager: EsiScopeManager = scope_manager
-        self.metadata_manager: EsiMetadataManager = EsiMetadataManager(
+        self.metadata_manager: EsiMetadataManager = metadata_manager or EsiMetadataManager(
             api_client,
             metadata_endpoints_url=metadata_endpoints_url,
             metadata_ttl=metadata_ttl,
             jwks_ttl=jwks_ttl,
+            cache_dir=metadata_cache_dir,
         )
         self.redirect_uri: str = redirect_uri
         self.client_id: str = client_id
         self.client_secret: str | None = client_secret
         self._pkce: EsiPKCEResult | None = None
-        self._token_set: EsiTokenSet | None = self.refresh(refresh_token) if refresh_token else None
+        self._auth_headers: tuple[tuple[str, str | None], dict[str, str]] | None = None
+        self.token_store: EsiTokenStore | None = token_store
+        self.token_key: str | None = token_key
+        self.lease_ttl: float = lease_ttl
+        self._lease_owner: str = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        self._refresh_lock = threading.Lock()
+        self._token_set: EsiTokenSet | None = None
+        if refresh_token:
+            if token_store and not token_key:
+                self.token_key = f"refresh:{hashlib.sha256(refresh_token.encode()).hexdigest()[:32]}"
+            self._token_set = self._refresh_shared(refresh_token) if token_store else self.refresh(refresh_token)
 
     @property
     def endpoints(self) -> EsiMetadataResponseEndpoints:
@@ -79,9 +112,10 @@ class EsiAuth:
 
     @property
     def _token_expired(self) -> bool:
-        if not self._token_set:
+        token_set = self._token_set
+        if not token_set:
             raise ValueError("No token set available")
-        return int(time.time()) >= self._token_set.expires_at
+        return int(time.time()) >= token_set.expires_at
 
     @property
     def access_token(self) -> str:
@@ -118,18 +152,63 @@ class EsiAuth:
 
     def _get_auth_headers(self) -> dict[str, str]:
         """Get authentication headers for token requests."""
-        if self.client_secret:
-            return EsiRequestHeaders(
-                basic_auth_headers=EsiBasicAuthHeaders(client_id=self.client_id, client_secret=self.client_secret)
-            ).model_dump()
-        return EsiRequestHeaders().model_dump()
-
-    def _get_updated_token_set(self):
-        if not self._token_set:
+        credentials = (self.client_id, self.client_secret)
+        cached = self._auth_headers
+        if cached is None or cached[0] != credentials:
+            if self.client_secret:
+                headers = EsiRequestHeaders(
+                    basic_auth_headers=EsiBasicAuthHeaders(client_id=self.client_id, client_secret=self.client_secret)
+                ).model_dump()
+            else:
+                headers = EsiRequestHeaders().model_dump()
+            cached = self._auth_headers = (credentials, headers)
+        # Copied because the REST client may add headers to the dict it is given
+        return dict(cached[1])
+
+    def _get_updated_token_set(self) -> EsiTokenSet:
+        token_set = self._token_set
+        if not token_set:
             raise ValueError("No token set available")
-        if self._token_expired:
-            self.refresh()
-        return self._token_set
+        if int(time.time()) < token_set.expires_at:
+            return token_set
+        if self.token_store:
+            return self._refresh_shared()
+        with self._refresh_lock:
+            # Another thread may have refreshed while this one waited
+            token_set = self._token_set
+            if token_set and int(time.time()) < token_set.expires_at:
+                return token_set
+            return self.refresh()
+
+    def _refresh_shared(self, refresh_token: str | None = None) -> EsiTokenSet:
+        """Refresh through the token store, adopting a newer token set when another process refreshed first."""
+        store, key = self.token_store, self.token_key
+        assert store is not None and key is not None
+        # Threads of this process share one lease owner, so they queue here instead
+        with self._refresh_lock:
+            while True:
+                if self._token_set and int(time.time()) < self._token_set.expires_at:
+                    return self._token_set
+                stored = store.get(key)
+                if stored and int(time.time()) < stored.expires_at:
+                    self._token_set = stored
+                    return stored
+                if store.acquire(key, self._lease_owner, self.lease_ttl):
+                    break
+                time.sleep(DEFAULT_LEASE_POLL_INTERVAL)
+
+            try:
+                # The previous holder may have stored a token set just before releasing
+                stored = store.get(key) or self._token_set
+                if stored and int(time.time()) < stored.expires_at:
+                    self._token_set = stored
+                    return stored
+                token_set = self.refresh(stored.refresh_token if stored else refresh_token)
+                store.put(key, token_set)
+                logger.debug(f"Refreshed shared token {key}")
+                return token_set
+            finally:
+                store.release(key, self._lease_owner)
 
     def exchange_code(self, code: str) -> EsiTokenSet:
         """Exchange authorization code for tokens."""
@@ -140,6 +219,10 @@ class EsiAuth:
         request = EsiAuthorizationCodeRequest(code=code, pkce=pkce)
 
         self._token_set = self._request_token(request)
+        if self.token_store:
+            if not self.token_key:
+                self.token_key = f"character:{self.verify(self._token_set.access_token).character_id}"
+            self.token_store.put(self.token_key, self._token_set)
         return self._token_set
 
     def refresh(self, refresh_token: str | None = None) -> EsiTokenSet:
@@ -148,10 +231,10 @@ class EsiAuth:
         if not token:
             raise ValueError("No refresh token available")
 
+        # Local, so a refresh never replaces the verifier of an authorization flow in progress
+        pkce = None
         if not self.client_secret:
-            self._pkce = self._generate_pkce()
-
-        pkce = EsiTokenPKCE(client_id=self.client_id, code_verifier=self._pkce.verifier) if self._pkce else None
+            pkce = EsiTokenPKCE(client_id=self.client_id, code_verifier=self._generate_pkce().verifier)
         request = EsiRefreshTokenRequest(refresh_token=token, pkce=pkce)
 
         self._token_set = self._request_token(request)
@@ -163,13 +246,13 @@ class EsiAuth:
         if not token:
             raise ValueError("No access token available")
 
-        key = self.metadata_manager.get_jwk(DEFAULT_ESI_JWK_KID)
+        key = self.metadata_manager.get_signing_key(DEFAULT_ESI_JWK_KID)
         if not key:
             raise ValueError("Cannot retrieve public key")
 
         data = jwt.decode(
             jwt=token,
-            key=PyJWK(key.model_dump(), key.alg),
+            key=key,
             issuer=self.issuer,
             audience=DEFAULT_ESI_AUDIENCE,
         )
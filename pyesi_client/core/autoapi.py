@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import inspect
 from types import SimpleNamespace
 from typing import Any, Callable, Type, TypeVar, cast
@@ -29,12 +30,9 @@ def _wrap_method_with_compat(method: Callable[..., Any], compat_date_provider: C
             kwargs["x_compatibility_date"] = compat_date_provider()
         return method(*args, **kwargs)
 
-    # Preserve metadata as best-effort
-    try:
-        wrapper.__name__ = getattr(method, "__name__", wrapper.__name__)
-        wrapper.__doc__ = getattr(method, "__doc__", wrapper.__doc__)
-    except Exception:
-        pass
+    # Keep the name, docstring and signature, and the API instance so callers can find sibling operations
+    functools.update_wrapper(wrapper, method)
+    wrapper.__self__ = getattr(method, "__self__", None)  # type: ignore[attr-defined]
     return wrapper
 
 
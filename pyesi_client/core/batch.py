@@ -0,0 +1,67 @@
+"""
+pyesi-client:
+
+Batched Operation Calls
+"""
+
+import functools
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from pyesi_client.constants import DEFAULT_BATCH_CONCURRENCY
+from pyesi_client.core.scheduler import ContextThreadPoolExecutor
+from pyesi_client.models import EsiBatchResult
+
+
+def gather(
+    calls: Iterable[Callable[[], Any]], *, max_concurrency: int = DEFAULT_BATCH_CONCURRENCY
+) -> list[EsiBatchResult]:
+    """
+    Run independent calls concurrently and return their outcomes in call order.
+
+    Each call is a callable taking no arguments, such as a functools.partial of a generated
+    API method. An exception raised by one call is returned in its result and does not
+    affect the others. Calls run in copies of the caller's context, so request priorities
+    and tenants apply to them.
+    """
+    calls = list(calls)
+    if not calls:
+        return []
+    with ContextThreadPoolExecutor(min(max_concurrency, len(calls)), thread_name_prefix="pyesi-batch") as pool:
+        return list(pool.map(_run, calls))
+
+
+def _run(call: Callable[[], Any]) -> EsiBatchResult:
+    try:
+        return EsiBatchResult(value=call())
+    except Exception as e:
+        return EsiBatchResult(error=e)
+
+
+class EsiBatch:
+    """
+    Operation calls collected to run together, so a composite view costs the slowest call
+    rather than the sum of all of them.
+
+    Usage:
+        batch = client.batch()
+        batch.add(client.character.get_characters_character_id, character_id=...)
+        batch.add(client.api.skills.get_characters_character_id_skills, character_id=...)
+        info, skills = batch.run()
+    """
+
+    def __init__(self, *, max_concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> None:
+        self.max_concurrency: int = max_concurrency
+        self._calls: list[Callable[[], Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def add(self, func: Callable[..., Any], /, *args: Any, **kwargs: Any) -> int:
+        """Add a call and return the index of its result."""
+        self._calls.append(functools.partial(func, *args, **kwargs))
+        return len(self._calls) - 1
+
+    def run(self) -> list[EsiBatchResult]:
+        """Run every call added so far and return their outcomes in the order they were added."""
+        return gather(self._calls, max_concurrency=self.max_concurrency)
@@ -0,0 +1,207 @@
+"""
+pyesi-client:
+
+Blob Store
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable, Mapping
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from pyesi_client.constants import DEFAULT_TTL_CACHE_SIZE
+
+# SQLite limits bound parameters per statement, keep IN (...) lookups well below it
+_MAX_QUERY_KEYS = 500
+
+
+def expires_at_from_headers(headers: Mapping[str, str] | None, default_ttl: float) -> float:
+    """Get the expiry time of an ESI response from its Expires header, or now + default_ttl."""
+    expires = (headers or {}).get("Expires") or (headers or {}).get("expires")
+    if expires:
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return time.time() + default_ttl
+
+
+class EsiTtlCache[K: Hashable, V]:
+    """Thread-safe LRU cache whose entries expire at a given time, such as the ESI Expires header."""
+
+    def __init__(self, maxsize: int = DEFAULT_TTL_CACHE_SIZE) -> None:
+        self.maxsize: int = maxsize
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        """Get a live entry, None when missing or expired."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[K]) -> dict[K, V]:
+        """Get the live entries of several keys, omitting missing or expired ones."""
+        now = time.time()
+        found: dict[K, V] = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[1] <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry[0]
+        return found
+
+    def set(self, key: K, value: V, expires_at: float) -> None:
+        """Store an entry until expires_at, evicting the least recently used beyond maxsize."""
+        self.set_many({key: value}, expires_at)
+
+    def set_many(self, values: Mapping[K, V], expires_at: float) -> None:
+        """Store several entries sharing one expiry."""
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (value, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def partition(self, partition: Hashable) -> "EsiTtlCachePartition[K, V]":
+        """View of the entries of one partition, such as a compatibility date, sharing this cache's size limit."""
+        return EsiTtlCachePartition(self, partition)
+
+
+class EsiTtlCachePartition[K: Hashable, V]:
+    """Keys of an EsiTtlCache stored under a partition, so the same key in another partition is another entry."""
+
+    def __init__(self, cache: EsiTtlCache[tuple[Hashable, K], V], partition: Hashable) -> None:
+        self.cache: EsiTtlCache[tuple[Hashable, K], V] = cache
+        self.partition: Hashable = partition
+
+    def get(self, key: K) -> V | None:
+        return self.cache.get((self.partition, key))
+
+    def get_many(self, keys: Iterable[K]) -> dict[K, V]:
+        found = self.cache.get_many((self.partition, key) for key in keys)
+        return {key: value for (_, key), value in found.items()}
+
+    def set(self, key: K, value: V, expires_at: float) -> None:
+        self.cache.set((self.partition, key), value, expires_at)
+
+    def set_many(self, values: Mapping[K, V], expires_at: float) -> None:
+        self.cache.set_many({(self.partition, key): value for key, value in values.items()}, expires_at)
+
+    def discard(self, key: K) -> None:
+        self.cache.discard((self.partition, key))
+
+
+class EsiBlobStore:
+    """
+    Namespaced key to bytes store for raw ESI documents.
+
+    With a path the store is a SQLite database (WAL mode, one connection per thread) that can
+    be shared by several processes, otherwise entries live in memory. Entries without
+    expires_at never expire, which suits immutable documents such as killmails.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path: Path | None = Path(path) if path else None
+        self._memory: dict[tuple[str, str], tuple[bytes, int | None]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connection() as connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS blobs ("
+                    "namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, expires_at INTEGER, "
+                    "PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+                )
+
+    def get(self, namespace: str, key: str) -> bytes | None:
+        """Get a stored value, None when missing or expired."""
+        return self.get_many(namespace, [key]).get(key)
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> dict[str, bytes]:
+        """Get the stored values of several keys, omitting missing or expired ones."""
+        keys = list(keys)
+        now = int(time.time())
+        if not self.path:
+            found: dict[str, bytes] = {}
+            for key in keys:
+                entry = self._memory.get((namespace, key))
+                if entry and (entry[1] is None or entry[1] > now):
+                    found[key] = entry[0]
+            return found
+
+        connection = self._connection()
+        found = {}
+        for start in range(0, len(keys), _MAX_QUERY_KEYS):
+            chunk = keys[start : start + _MAX_QUERY_KEYS]
+            rows = connection.execute(
+                f"SELECT key, value FROM blobs WHERE namespace = ? AND key IN ({','.join('?' * len(chunk))}) "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, *chunk, now),
+            )
+            found.update(rows)
+        return found
+
+    def put(self, namespace: str, key: str, value: bytes, *, expires_at: int | None = None) -> None:
+        """Store a value, replacing any previous one."""
+        self.put_many(namespace, {key: value}, expires_at=expires_at)
+
+    def put_many(self, namespace: str, values: Mapping[str, bytes], *, expires_at: int | None = None) -> None:
+        """Store several values in one transaction."""
+        if not self.path:
+            with self._lock:
+                for key, value in values.items():
+                    self._memory[(namespace, key)] = (value, expires_at)
+            return
+        with self._connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO blobs (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                [(namespace, key, value, expires_at) for key, value in values.items()],
+            )
+
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove a value."""
+        if not self.path:
+            with self._lock:
+                self._memory.pop((namespace, key), None)
+            return
+        with self._connection() as connection:
+            connection.execute("DELETE FROM blobs WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def clear(self, namespace: str) -> None:
+        """Remove every value in a namespace."""
+        if not self.path:
+            with self._lock:
+                for entry in [entry for entry in self._memory if entry[0] == namespace]:
+                    del self._memory[entry]
+            return
+        with self._connection() as connection:
+            connection.execute("DELETE FROM blobs WHERE namespace = ?", (namespace,))
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
@@ -0,0 +1,131 @@
+"""
+pyesi-client:
+
+Circuit Breakers
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any
+from urllib.parse import urlsplit
+
+from pyesi_openapi import ApiException
+
+from pyesi_client.constants import DEFAULT_CIRCUIT_RESET_TIMEOUT, DEFAULT_CIRCUIT_THRESHOLD, EsiCircuitState
+from pyesi_client.core.operations import get_operation_index
+
+logger = logging.getLogger(__name__)
+
+
+class EsiCircuitOpenError(ApiException):
+    """Raised instead of sending a request to an operation whose circuit is open."""
+
+    def __init__(self, operation: str, retry_at: float) -> None:
+        super().__init__(status=503, reason=f"Circuit open for {operation}")
+        self.operation: str = operation
+        self.retry_at: float = retry_at
+
+
+class _Circuit:
+    __slots__ = ("failures", "opened_at", "probing", "rejected", "state")
+
+    def __init__(self) -> None:
+        self.state: EsiCircuitState = EsiCircuitState.CLOSED
+        self.failures: int = 0
+        self.opened_at: float = 0.0
+        self.probing: bool = False
+        self.rejected: int = 0
+
+
+class EsiCircuitBreakers:
+    """
+    One circuit breaker per ESI operation.
+
+    A circuit opens after failure_threshold consecutive failures (5xx or transport errors),
+    and requests to it then fail at once with EsiCircuitOpenError. After reset_timeout one
+    probe request is let through (half-open): success closes the circuit, failure opens it
+    again. 4xx responses count as success, since the route itself answered.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = DEFAULT_CIRCUIT_THRESHOLD,
+        reset_timeout: float = DEFAULT_CIRCUIT_RESET_TIMEOUT,
+        thresholds: Mapping[str, int] | None = None,
+    ) -> None:
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.thresholds: dict[str, int] = dict(thresholds or {})
+        self._circuits: dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """State of every circuit that has seen a failure or a rejection."""
+        with self._lock:
+            return {
+                operation: {"state": circuit.state.value, "failures": circuit.failures, "rejected": circuit.rejected}
+                for operation, circuit in self._circuits.items()
+                if circuit.failures or circuit.rejected or circuit.state != EsiCircuitState.CLOSED
+            }
+
+    @staticmethod
+    def operation_for(method: str, url: str) -> str:
+        """Name of the operation a request URL belongs to, or the method and path when unknown."""
+        path = urlsplit(url).path
+        operation = get_operation_index().match(method, path)
+        return operation.name if operation else f"{method.upper()} {path}"
+
+    def state(self, operation: str) -> EsiCircuitState:
+        circuit = self._circuits.get(operation)
+        return circuit.state if circuit else EsiCircuitState.CLOSED
+
+    def allow(self, operation: str) -> None:
+        """Let a request through, or raise EsiCircuitOpenError while its circuit is open."""
+        with self._lock:
+            circuit = self._circuits.get(operation)
+            if circuit is None or circuit.state == EsiCircuitState.CLOSED:
+                return
+            retry_at = circuit.opened_at + self.reset_timeout
+            if circuit.state == EsiCircuitState.OPEN and time.time() >= retry_at:
+                circuit.state = EsiCircuitState.HALF_OPEN
+            if circuit.state == EsiCircuitState.HALF_OPEN and not circuit.probing:
+                circuit.probing = True
+                return
+            circuit.rejected += 1
+        raise EsiCircuitOpenError(operation, retry_at)
+
+    def record(self, operation: str, status: int) -> None:
+        """Record the outcome of a request that was let through; status 0 stands for a transport failure."""
+        failed = status == 0 or status >= 500
+        with self._lock:
+            circuit = self._circuits.get(operation)
+            if circuit is None:
+                if not failed:
+                    return
+                circuit = self._circuits[operation] = _Circuit()
+            circuit.probing = False
+            if not failed:
+                if circuit.state != EsiCircuitState.CLOSED:
+                    logger.info(f"Circuit for {operation} closed")
+                circuit.state = EsiCircuitState.CLOSED
+                circuit.failures = 0
+                return
+            circuit.failures += 1
+            threshold = self.thresholds.get(operation, self.failure_threshold)
+            if circuit.state == EsiCircuitState.HALF_OPEN or circuit.failures >= threshold:
+                if circuit.state != EsiCircuitState.OPEN:
+                    logger.warning(f"Circuit for {operation} opened after {circuit.failures} failures")
+                circuit.state = EsiCircuitState.OPEN
+                circuit.opened_at = time.time()
+
+    def reset(self, operation: str | None = None) -> None:
+        """Close one circuit, or every circuit."""
+        with self._lock:
+            if operation is None:
+                self._circuits.clear()
+            else:
+                self._circuits.pop(operation, None)
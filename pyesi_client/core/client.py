@@ -6,7 +6,12 @@ Built on pyesi-openapi with intelligent token management, caching, and utilities
 
 import urllib3
 import logging
-from datetime import datetime
+import threading
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, TypeVar
 
 from pyesi_openapi import (
     AllianceApi,
@@ -15,7 +20,6 @@ from pyesi_openapi import (
     CalendarApi,
     CharacterApi,
     ClonesApi,
-    Configuration,
     ContactsApi,
     ContractsApi,
     CorporationApi,
@@ -51,13 +55,33 @@ from pyesi_client.constants import (
     DEFAULT_BACKOFF_MAX,
     DEFAULT_BACKOFF_FACTOR,
     DEFAULT_BACKOFF_JITTER,
+    DEFAULT_BATCH_CONCURRENCY,
+    DEFAULT_PAGE_CONCURRENCY,
+    EsiExecutorMode,
+    EsiResultFormat,
 )
+from pyesi_client.core.api_client import EsiApiClient, EsiConfiguration
 from pyesi_client.core.auth import EsiAuth
+from pyesi_client.core.autoapi import create_autocompat_instance
+from pyesi_client.core.batch import EsiBatch, gather
+from pyesi_client.core.circuit import EsiCircuitBreakers
+from pyesi_client.core.compatibility import compatibility_context, current_compatibility_date
+from pyesi_client.core.executor import EsiParseExecutor
+from pyesi_client.core.operations import EsiOperationIndex, get_operation_index
+from pyesi_client.core.pagination import fetch_pages
+from pyesi_client.core.router import EsiCharacterRouter
+from pyesi_client.core.scheduler import EsiRequestScheduler
 from pyesi_client.core.scope_manager import EsiScopeManager
-from pyesi_client.models import EsiJwtTokenData
+from pyesi_client.core.token_pool import EsiTokenPool
+from pyesi_client.core.token_store import EsiTokenStore
+from pyesi_client.core.transport import EsiTransport
+from pyesi_client.models import EsiBatchResult, EsiJwtTokenData
 
 logger = logging.getLogger(__name__)
 
+_Api = TypeVar("_Api")
+_Lazy = TypeVar("_Lazy")
+
 
 class EsiClient:
     """
@@ -89,6 +113,14 @@ class EsiClient:
             backoff_max=DEFAULT_BACKOFF_MAX,
         ),
         host: str = DEFAULT_ESI_HOST,
+        sso_cache_dir: str | Path | None = None,
+        executor_mode: EsiExecutorMode = EsiExecutorMode.AUTO,
+        executor_workers: int | None = None,
+        token_store: EsiTokenStore | None = None,
+        scheduler: EsiRequestScheduler | None = None,
+        circuit_breakers: EsiCircuitBreakers | None = None,
+        transport: EsiTransport | None = None,
+        compatibility_date: date | None = None,
     ):
         """
         Initialize ESI client.
@@ -103,12 +135,24 @@ class EsiClient:
             retries: urllib3.Retry
             host: ESI API base URL
             refresh_token: OAuth immortal refresh token
+            sso_cache_dir: Directory persisting SSO metadata and signing keys across processes
+            executor_mode: Where bulk operations parse responses (inline, threads or processes)
+            executor_workers: Maximum parse workers, defaults to the CPU count
+            token_store: Store sharing token sets and refresh leases with other processes
+            scheduler: Request scheduler capping concurrency by priority and tenant fairness
+            circuit_breakers: Per-operation circuit breakers failing fast on operations ESI keeps failing
+            transport: Transport recording or replaying every ESI and SSO exchange
+            compatibility_date: ESI compatibility date of this client, defaults to COMPATIBILITY_DATE
         """
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
 
         # Configure OpenAPI client
+        self.scheduler = scheduler
+        self.circuit_breakers = circuit_breakers
+        self.transport = transport
+        self._compatibility_date: date = compatibility_date or self.COMPATIBILITY_DATE
         self._setup_api_client(host, user_agent, timeout, retry)
 
         # Initialize scope manager
@@ -121,8 +165,12 @@ class EsiClient:
             redirect_uri=redirect_uri,
             client_id=client_id,
             client_secret=client_secret,
+            metadata_cache_dir=sso_cache_dir,
+            token_store=token_store,
         )
+        self.token_store = token_store
 
+        self._lazy_lock = threading.RLock()
         self._alliance_api: AllianceApi | None = None
         self._assets_api: AssetsApi | None = None
         self._calendar_api: CalendarApi | None = None
@@ -154,6 +202,10 @@ class EsiClient:
         self._wallet_api: WalletApi | None = None
         self._wars_api: WarsApi | None = None
 
+        self._token_pool: EsiTokenPool | None = None
+        self._router: EsiCharacterRouter | None = None
+        self.executor = EsiParseExecutor(executor_mode, max_workers=executor_workers)
+
         logger.info(f"EsiClient initialized for client_id: {client_id}")
         self._api_ns = None
 
@@ -161,7 +213,7 @@ class EsiClient:
         self, host: str, user_agent: str | None, timeout: int, retry: urllib3.Retry | int | None
     ) -> None:
         """Configure the underlying API client."""
-        self.config = Configuration(
+        self.config = EsiConfiguration(
             host=host,
             retries=retry,  # type: ignore
         )
@@ -173,16 +225,39 @@ class EsiClient:
         self.config.socket_timeout = timeout
         self.config.connection_timeout = timeout
 
-        self.api_client = ApiClient(self.config)
+        if self.scheduler or self.circuit_breakers:
+            self.api_client = EsiApiClient(self.config, scheduler=self.scheduler, circuits=self.circuit_breakers)
+        else:
+            self.api_client = ApiClient(self.config)
+        if self.transport:
+            self.transport.install(self.api_client)
+
+    def _lazy(self, attribute: str, create: Callable[[], _Lazy]) -> _Lazy:
+        """Get an attribute created on first use, creating it once even when threads race for it."""
+        value = getattr(self, attribute)
+        if value is None:
+            with self._lazy_lock:
+                value = getattr(self, attribute)
+                if value is None:
+                    value = create()
+                    setattr(self, attribute, value)
+        return value
+
+    def _create_api(self, api_class: type[_Api]) -> _Api:
+        """Create a generated API whose calls default to the current compatibility date."""
+        return create_autocompat_instance(
+            api_class, self.api_client, compat_date_provider=lambda: self.compatibility_date
+        )
 
     def _update_access_token(self) -> None:
-        """Update API client with current access token."""
+        """Send the current access token, refreshed when expired, with every authenticated request."""
         try:
-            token = self.auth.access_token
-            self.config.access_token = token
-            logger.debug("Access token updated")
+            if not self.auth.access_token:
+                raise ValueError("No access token available")
         except Exception as e:
             raise ValueError(f"Failed to get access token: {e}") from e
+        self.config.token_provider = lambda: self.auth.access_token
+        logger.debug("Access token updated")
 
     def get_auth_url(self, *, state: str | None = None) -> str:
         """Get OAuth authorization URL."""
@@ -232,7 +307,45 @@ class EsiClient:
 
     def get_required_scopes(self) -> list[str]:
         """Get list of currently required scopes."""
-        return [scope.value for scope in self.scope_manager.scopes]
+        return list(self.scope_manager.scopes.values)
+
+    def fetch_pages(
+        self,
+        func: Callable[..., Any],
+        /,
+        *,
+        result_format: EsiResultFormat = EsiResultFormat.MODEL,
+        max_concurrency: int = DEFAULT_PAGE_CONCURRENCY,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Fetch all pages of a paginated endpoint, parsing them on the client's executor.
+
+        Usage: client.fetch_pages(client.market.get_markets_region_id_orders, region_id=..., order_type="all")
+        """
+        return fetch_pages(func, self.executor, result_format=result_format, max_concurrency=max_concurrency, **kwargs)
+
+    def batch(self, *, max_concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> EsiBatch:
+        """
+        Start a batch of operation calls across API groups, run concurrently by EsiBatch.run.
+
+        Usage: batch = client.batch(); batch.add(client.api.wallet.get_characters_character_id_wallet, character_id=...)
+        """
+        return EsiBatch(max_concurrency=max_concurrency)
+
+    def gather(
+        self, *calls: Callable[[], Any], max_concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> list[EsiBatchResult]:
+        """
+        Run calls concurrently and return their results and errors in order.
+
+        Usage: client.gather(partial(client.character.get_characters_character_id, character_id=...), ...)
+        """
+        return gather(calls, max_concurrency=max_concurrency)
+
+    def close(self) -> None:
+        """Stop parse workers started by bulk operations."""
+        self.executor.shutdown()
 
     @property
     def is_authenticated(self) -> bool:
@@ -244,219 +357,204 @@ class EsiClient:
             return False
 
     @property
-    def compatibility_date(self) -> datetime:
-        """Get current ESI compatibility date."""
-        return self.COMPATIBILITY_DATE
+    def compatibility_date(self) -> date:
+        """Get current ESI compatibility date: the one of the calling context, else this client's."""
+        return current_compatibility_date() or self._compatibility_date
+
+    def compatibility(self, value: date) -> AbstractContextManager[None]:
+        """
+        Use another compatibility date for requests, cache partitions and services in this context.
+
+        Usage: with client.compatibility(date(2026, 1, 1)): graph.run(...)  # warm caches before a cutover
+        """
+        return compatibility_context(value)
+
+    def metrics(self) -> dict[str, Any]:
+        """Snapshot of request scheduling state, such as the current concurrency limit and open circuits."""
+        metrics: dict[str, Any] = {}
+        if self.scheduler:
+            metrics["scheduler"] = self.scheduler.metrics
+        if self.circuit_breakers:
+            metrics["circuits"] = self.circuit_breakers.metrics
+        return metrics
+
+    @property
+    def operations(self) -> EsiOperationIndex:
+        """Index of ESI operations with their required scopes and roles."""
+        return get_operation_index()
+
+    @property
+    def token_pool(self) -> EsiTokenPool:
+        """Pool of additional authenticated characters sharing this client's application."""
+        return self._lazy(
+            "_token_pool",
+            lambda: EsiTokenPool(
+                self.api_client,
+                self.client_id,
+                client_secret=self.client_secret,
+                redirect_uri=self.redirect_uri,
+                metadata_manager=self.auth.metadata_manager,
+                token_store=self.token_store,
+            ),
+        )
+
+    @property
+    def router(self) -> EsiCharacterRouter:
+        """Router choosing an eligible pooled character for authenticated calls.
+
+        Usage: client.router.call(client.assets.get_corporations_corporation_id_assets, corporation_id=...)
+        """
+        return self._lazy("_router", lambda: EsiCharacterRouter(self.token_pool))
 
     @property
     def alliance(self) -> AllianceApi:
         """Alliance API endpoints"""
-        if self._alliance_api is None:
-            self._alliance_api = AllianceApi(self.api_client)
-        return self._alliance_api
+        return self._lazy("_alliance_api", lambda: self._create_api(AllianceApi))
 
     @property
     def assets(self) -> AssetsApi:
         """Assets API endpoints"""
-        if self._assets_api is None:
-            self._assets_api = AssetsApi(self.api_client)
-        return self._assets_api
+        return self._lazy("_assets_api", lambda: self._create_api(AssetsApi))
 
     @property
     def calendar(self) -> CalendarApi:
         """Calendar API endpoints"""
-        if self._calendar_api is None:
-            self._calendar_api = CalendarApi(self.api_client)
-        return self._calendar_api
+        return self._lazy("_calendar_api", lambda: self._create_api(CalendarApi))
 
     @property
     def character(self) -> CharacterApi:
         """Character API endpoints"""
-        if self._character_api is None:
-            self._character_api = CharacterApi(self.api_client)
-        return self._character_api
+        return self._lazy("_character_api", lambda: self._create_api(CharacterApi))
 
     @property
     def clones(self) -> ClonesApi:
         """Clones API endpoints"""
-        if self._clones_api is None:
-            self._clones_api = ClonesApi(self.api_client)
-        return self._clones_api
+        return self._lazy("_clones_api", lambda: self._create_api(ClonesApi))
 
     @property
     def contacts(self) -> ContactsApi:
         """Contacts API endpoints"""
-        if self._contacts_api is None:
-            self._contacts_api = ContactsApi(self.api_client)
-        return self._contacts_api
+        return self._lazy("_contacts_api", lambda: self._create_api(ContactsApi))
 
     @property
     def contracts(self) -> ContractsApi:
         """Contracts API endpoints"""
-        if self._contracts_api is None:
-            self._contracts_api = ContractsApi(self.api_client)
-        return self._contracts_api
+        return self._lazy("_contracts_api", lambda: self._create_api(ContractsApi))
 
     @property
     def corporation(self) -> CorporationApi:
         """Corporation API endpoints"""
-        if self._corporation_api is None:
-            self._corporation_api = CorporationApi(self.api_client)
-        return self._corporation_api
+        return self._lazy("_corporation_api", lambda: self._create_api(CorporationApi))
 
     @property
     def dogma(self) -> DogmaApi:
         """Dogma API endpoints"""
-        if self._dogma_api is None:
-            self._dogma_api = DogmaApi(self.api_client)
-        return self._dogma_api
+        return self._lazy("_dogma_api", lambda: self._create_api(DogmaApi))
 
     @property
     def faction_warfare(self) -> FactionWarfareApi:
         """FactionWarfare API endpoints"""
-        if self._faction_warfare_api is None:
-            self._faction_warfare_api = FactionWarfareApi(self.api_client)
-        return self._faction_warfare_api
+        return self._lazy("_faction_warfare_api", lambda: self._create_api(FactionWarfareApi))
 
     @property
     def fittings(self) -> FittingsApi:
         """Fittings API endpoints"""
-        if self._fittings_api is None:
-            self._fittings_api = FittingsApi(self.api_client)
-        return self._fittings_api
+        return self._lazy("_fittings_api", lambda: self._create_api(FittingsApi))
 
     @property
     def fleets(self) -> FleetsApi:
         """Fleets API endpoints"""
-        if self._fleets_api is None:
-            self._fleets_api = FleetsApi(self.api_client)
-        return self._fleets_api
+        return self._lazy("_fleets_api", lambda: self._create_api(FleetsApi))
 
     @property
     def incursions(self) -> IncursionsApi:
         """Incursions API endpoints"""
-        if self._incursions_api is None:
-            self._incursions_api = IncursionsApi(self.api_client)
-        return self._incursions_api
+        return self._lazy("_incursions_api", lambda: self._create_api(IncursionsApi))
 
     @property
     def industry(self) -> IndustryApi:
         """Industry API endpoints"""
-        if self._industry_api is None:
-            self._industry_api = IndustryApi(self.api_client)
-        return self._industry_api
+        return self._lazy("_industry_api", lambda: self._create_api(IndustryApi))
 
     @property
     def insurance(self) -> InsuranceApi:
         """Insurance API endpoints"""
-        if self._insurance_api is None:
-            self._insurance_api = InsuranceApi(self.api_client)
-        return self._insurance_api
+        return self._lazy("_insurance_api", lambda: self._create_api(InsuranceApi))
 
     @property
     def killmails(self) -> KillmailsApi:
         """Killmails API endpoints"""
-        if self._killmails_api is None:
-            self._killmails_api = KillmailsApi(self.api_client)
-        return self._killmails_api
+        return self._lazy("_killmails_api", lambda: self._create_api(KillmailsApi))
 
     @property
     def location(self) -> LocationApi:
         """Location API endpoints"""
-        if self._location_api is None:
-            self._location_api = LocationApi(self.api_client)
-        return self._location_api
+        return self._lazy("_location_api", lambda: self._create_api(LocationApi))
 
     @property
     def loyalty(self) -> LoyaltyApi:
         """Loyalty API endpoints"""
-        if self._loyalty_api is None:
-            self._loyalty_api = LoyaltyApi(self.api_client)
-        return self._loyalty_api
+        return self._lazy("_loyalty_api", lambda: self._create_api(LoyaltyApi))
 
     @property
     def mail(self) -> MailApi:
         """Mail API endpoints"""
-        if self._mail_api is None:
-            self._mail_api = MailApi(self.api_client)
-        return self._mail_api
+        return self._lazy("_mail_api", lambda: self._create_api(MailApi))
 
     @property
     def market(self) -> MarketApi:
         """Market API endpoints"""
-        if self._market_api is None:
-            self._market_api = MarketApi(self.api_client)
-        return self._market_api
+        return self._lazy("_market_api", lambda: self._create_api(MarketApi))
 
     @property
     def planetary_interaction(self) -> PlanetaryInteractionApi:
         """PlanetaryInteraction API endpoints"""
-        if self._planetary_interaction_api is None:
-            self._planetary_interaction_api = PlanetaryInteractionApi(self.api_client)
-        return self._planetary_interaction_api
+        return self._lazy("_planetary_interaction_api", lambda: self._create_api(PlanetaryInteractionApi))
 
     @property
     def routes(self) -> RoutesApi:
         """Routes API endpoints"""
-        if self._routes_api is None:
-            self._routes_api = RoutesApi(self.api_client)
-        return self._routes_api
+        return self._lazy("_routes_api", lambda: self._create_api(RoutesApi))
 
     @property
     def search(self) -> SearchApi:
         """Search API endpoints"""
-        if self._search_api is None:
-            self._search_api = SearchApi(self.api_client)
-        return self._search_api
+        return self._lazy("_search_api", lambda: self._create_api(SearchApi))
 
     @property
     def skills(self) -> SkillsApi:
         """Skills API endpoints"""
-        if self._skills_api is None:
-            self._skills_api = SkillsApi(self.api_client)
-        return self._skills_api
+        return self._lazy("_skills_api", lambda: self._create_api(SkillsApi))
 
     @property
     def sovereignty(self) -> SovereigntyApi:
         """Sovereignty API endpoints"""
-        if self._sovereignty_api is None:
-            self._sovereignty_api = SovereigntyApi(self.api_client)
-        return self._sovereignty_api
+        return self._lazy("_sovereignty_api", lambda: self._create_api(SovereigntyApi))
 
     @property
     def status(self) -> StatusApi:
         """Status API endpoints"""
-        if self._status_api is None:
-            self._status_api = StatusApi(self.api_client)
-        return self._status_api
+        return self._lazy("_status_api", lambda: self._create_api(StatusApi))
 
     @property
     def universe(self) -> UniverseApi:
         """Universe API endpoints"""
-        if self._universe_api is None:
-            self._universe_api = UniverseApi(self.api_client)
-        return self._universe_api
+        return self._lazy("_universe_api", lambda: self._create_api(UniverseApi))
 
     @property
     def user_interface(self) -> UserInterfaceApi:
         """UserInterface API endpoints"""
-        if self._user_interface_api is None:
-            self._user_interface_api = UserInterfaceApi(self.api_client)
-        return self._user_interface_api
+        return self._lazy("_user_interface_api", lambda: self._create_api(UserInterfaceApi))
 
     @property
     def wallet(self) -> WalletApi:
         """Wallet API endpoints"""
-        if self._wallet_api is None:
-            self._wallet_api = WalletApi(self.api_client)
-        return self._wallet_api
+        return self._lazy("_wallet_api", lambda: self._create_api(WalletApi))
 
     @property
     def wars(self) -> WarsApi:
         """Wars API endpoints"""
-        if self._wars_api is None:
-            self._wars_api = WarsApi(self.api_client)
-        return self._wars_api
+        return self._lazy("_wars_api", lambda: self._create_api(WarsApi))
 
     @property
     def api(self):
@@ -464,12 +562,10 @@ class EsiClient:
 
         Usage: client.api.alliance.get_alliances()  # x_compatibility_date auto-injected
         """
-        if self._api_ns is None:
-            # Lazy import to avoid cycles
-            from pyesi_client.core.autoapi import build_api_namespace
+        # Lazy import to avoid cycles
+        from pyesi_client.core.autoapi import build_api_namespace
 
-            self._api_ns = build_api_namespace(self)
-        return self._api_ns
+        return self._lazy("_api_ns", lambda: build_api_namespace(self))
 
     def call_api(self, func):
         res = func
@@ -0,0 +1,38 @@
+"""
+pyesi-client:
+
+Compatibility Dates
+"""
+
+import contextvars
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date
+
+_compatibility_date: contextvars.ContextVar[date | None] = contextvars.ContextVar(
+    "esi_compatibility_date", default=None
+)
+
+
+@contextmanager
+def compatibility_context(value: date) -> Iterator[None]:
+    """Use another compatibility date for requests and caches of this context, such as a warm-up before a cutover."""
+    token = _compatibility_date.set(value)
+    try:
+        yield
+    finally:
+        _compatibility_date.reset(token)
+
+
+def current_compatibility_date() -> date | None:
+    return _compatibility_date.get()
+
+
+def compatibility_partition(value: date) -> str:
+    """Cache partition of a compatibility date, the same for a date and a datetime of that day."""
+    return f"{value:%Y-%m-%d}"
+
+
+def partition_namespace(namespace: str, value: date) -> str:
+    """Blob store namespace holding payloads fetched under a compatibility date."""
+    return f"{namespace}@{compatibility_partition(value)}"
@@ -0,0 +1,164 @@
+"""
+pyesi-client:
+
+Response Parse Executor
+"""
+
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cache
+from typing import Any, Self
+
+from pydantic import TypeAdapter
+
+from pyesi_client.constants import EsiExecutorMode, EsiResultFormat
+
+# Bodies below this size are parsed in the calling thread, shipping them to a worker costs more
+MIN_OFFLOAD_BYTES_DEFAULT = 32 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+@cache
+def _type_adapter(response_type: Any) -> TypeAdapter[Any]:
+    return TypeAdapter(response_type)
+
+
+def parse_response(response_type: Any, body: bytes, result_format: EsiResultFormat = EsiResultFormat.MODEL) -> Any:
+    """
+    Parse and validate a raw ESI response body.
+
+    MODEL returns the generated pydantic models, DICT their plain dict form (using the ESI field
+    names, like to_dict) and COLUMNS a dict of field name to list of values for list responses.
+    DICT and COLUMNS are much cheaper to send back from worker processes than models.
+    """
+    adapter = _type_adapter(response_type)
+    value = adapter.validate_json(body)
+    if result_format == EsiResultFormat.MODEL:
+        return value
+    data = adapter.dump_python(value, by_alias=True, exclude_none=True)
+    if result_format == EsiResultFormat.DICT:
+        return data
+    if not isinstance(data, list):
+        raise TypeError(f"Columns require a list response, got {type(data).__name__}")
+    return to_columns(data)
+
+
+def to_columns(rows: Iterable[dict[str, Any]]) -> dict[str, list[Any]]:
+    """Transpose dict rows into columns, filling fields missing from a row with None."""
+    columns: dict[str, list[Any]] = {}
+    for count, row in enumerate(rows, 1):
+        for key, value in row.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * (count - 1)
+            column.append(value)
+        for column in columns.values():
+            if len(column) < count:
+                column.append(None)
+    return columns
+
+
+def merge_results(results: Iterable[Any], result_format: EsiResultFormat) -> Any:
+    """Concatenate parsed pages of a list response."""
+    if result_format != EsiResultFormat.COLUMNS:
+        merged: list[Any] = []
+        for result in results:
+            merged.extend(result)
+        return merged
+
+    columns: dict[str, list[Any]] = {}
+    count = 0
+    for page in results:
+        for key, values in page.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * count
+            column.extend(values)
+        count += len(next(iter(page.values()), ()))
+        for column in columns.values():
+            column.extend([None] * (count - len(column)))
+    return columns
+
+
+def resolve_executor_mode(mode: EsiExecutorMode) -> EsiExecutorMode:
+    """Resolve AUTO to threads on free-threaded builds, processes on multi-core machines, else inline."""
+    if mode != EsiExecutorMode.AUTO:
+        return mode
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    if is_gil_enabled is not None and not is_gil_enabled():
+        return EsiExecutorMode.THREAD
+    if (os.cpu_count() or 1) > 1:
+        return EsiExecutorMode.PROCESS
+    return EsiExecutorMode.INLINE
+
+
+class EsiParseExecutor:
+    """
+    Offload parsing and validation of raw response bodies for bulk operations.
+
+    Validation of large ESI payloads is CPU bound and holds the GIL, so PROCESS mode parses in
+    a process pool while THREAD mode is meant for free-threaded (3.13t) builds. Workers are
+    started lazily, small bodies are always parsed inline.
+    """
+
+    def __init__(
+        self,
+        mode: EsiExecutorMode = EsiExecutorMode.AUTO,
+        *,
+        max_workers: int | None = None,
+        min_offload_bytes: int = MIN_OFFLOAD_BYTES_DEFAULT,
+    ) -> None:
+        self.mode: EsiExecutorMode = resolve_executor_mode(mode)
+        self.max_workers: int | None = max_workers
+        self.min_offload_bytes: int = min_offload_bytes
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.shutdown()
+
+    def parse(self, response_type: Any, body: bytes, result_format: EsiResultFormat = EsiResultFormat.MODEL) -> Any:
+        """Parse a response body, blocking until done."""
+        return self.submit(response_type, body, result_format).result()
+
+    def submit(
+        self, response_type: Any, body: bytes, result_format: EsiResultFormat = EsiResultFormat.MODEL
+    ) -> Future[Any]:
+        """Schedule parsing of a response body."""
+        if self.mode == EsiExecutorMode.INLINE or len(body) < self.min_offload_bytes:
+            future: Future[Any] = Future()
+            try:
+                future.set_result(parse_response(response_type, body, result_format))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self._get_executor().submit(parse_response, response_type, body, result_format)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop worker threads or processes, they are restarted on the next offloaded parse."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is not None:
+                return self._executor
+            if self.mode == EsiExecutorMode.PROCESS:
+                # Forking a process that runs urllib3 and refresh threads can deadlock workers
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context(method))
+            else:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="pyesi-parse")
+            logger.debug(f"Started {self.mode.value} parse executor")
+            return self._executor
@@ -4,18 +4,43 @@ pyesi-client:
 SSO Metadata Manager
 """
 
+import hashlib
+import json
+import logging
+import os
+import threading
 import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
 
-from pyesi_openapi import ApiClient
+from jwt import PyJWK
+from pyesi_openapi import ApiClient, ApiException
 
 from pyesi_client.constants import DEFAULT_ESI_ENDPOINTS_URL
 from pyesi_client.models import EsiJwk, EsiJwksResponse, EsiMetadataResponse, EsiMetadataResponseEndpoints
 
 METADATA_TTL_DEFAULT = 2592000  # 24 * 60 * 60 * 30
 JWK_TTL_DEFAULT = 86400  # 24 * 60 * 60
+REFRESH_RETRY_DEFAULT = 60  # seconds to keep serving stale data after a failed refresh
+
+logger = logging.getLogger(__name__)
 
 
 class EsiMetadataManager:
+    """
+    Cache of EVE SSO metadata and signing keys.
+
+    With a cache_dir, discovered documents are persisted so new processes start warm. With
+    stale_while_revalidate, expired documents keep being served while a background thread
+    refreshes them, and a failed refresh falls back to the stale copy until retried.
+
+    Endpoints, issuer and signing keys are derived once per fetched document, so reading
+    them on every token request or verification costs no model validation. Readers never
+    lock; threads that find a document missing wait for a single fetch of it, so a cold start
+    under many threads costs one request per document, with or without the GIL.
+    """
+
     def __init__(
         self,
         api_client: ApiClient,
@@ -23,16 +48,36 @@ class EsiMetadataManager:
         metadata_endpoints_url: str = DEFAULT_ESI_ENDPOINTS_URL,
         metadata_ttl: int = METADATA_TTL_DEFAULT,
         jwks_ttl: int = JWK_TTL_DEFAULT,
+        cache_dir: str | Path | None = None,
+        stale_while_revalidate: bool = True,
+        refresh_retry: int = REFRESH_RETRY_DEFAULT,
     ) -> None:
         self.api_client: ApiClient = api_client
         self.metadata_endpoints_url: str = metadata_endpoints_url
         self.metadata_ttl: int = metadata_ttl
         self.jwks_ttl: int = jwks_ttl
+        self.cache_dir: Path | None = Path(cache_dir) if cache_dir else None
+        self.stale_while_revalidate: bool = stale_while_revalidate
+        self.refresh_retry: int = refresh_retry
 
         self._metadata: EsiMetadataResponse = EsiMetadataResponse()
+        self._endpoints: EsiMetadataResponseEndpoints = self._metadata
+        self._issuer: str = self._metadata.issuer
         self._metadata_expires_at: int = 0
+        self._metadata_loaded: bool = False
         self._jwks_data: EsiJwksResponse | None = None
+        self._jwks_by_kid: dict[str, EsiJwk] = {}
+        self._signing_keys: dict[str, PyJWK] = {}
         self._jwks_expires_at: int = 0
+        self._jwks_fetched_at: int = 0
+
+        self._lock = threading.Lock()
+        # One synchronous fetch per document at a time, reentrant since a forced JWKS refetch checks expiry first
+        self._fetch_locks: dict[str, threading.RLock] = {"metadata": threading.RLock(), "jwks": threading.RLock()}
+        self._refreshing: set[str] = set()
+
+        if self.cache_dir:
+            self._load_persisted()
 
     @property
     def _metadata_expired(self) -> bool:
@@ -44,41 +89,195 @@ class EsiMetadataManager:
 
     @property
     def _jwks(self) -> dict[str, EsiJwk] | None:
-        if not self._jwks_data or self._jwks_expired:
-            self.fetch_jwks()
-        if not self._jwks_data:
-            return None
-        return {key.kid: key for key in self._jwks_data.keys if key.kid} or None
+        self.fetch_jwks()
+        return self._jwks_by_kid or None
 
     @property
     def endpoints(self) -> EsiMetadataResponseEndpoints:
-        return EsiMetadataResponseEndpoints.model_validate(self._metadata)
+        self._ensure_metadata()
+        return self._endpoints
 
     @property
     def issuer(self) -> str:
-        return EsiMetadataResponse.model_validate(self._metadata).issuer
+        self._ensure_metadata()
+        return self._issuer
+
+    def _ensure_metadata(self) -> None:
+        if not self._metadata_expired:
+            return
+        try:
+            self.discover_metadata()
+        except Exception as e:
+            # The model defaults are the published Tranquility endpoints, good enough until SSO answers
+            logger.warning(f"SSO metadata discovery failed, using default endpoints: {e}")
 
     def discover_metadata(self, force: bool = False) -> EsiMetadataResponse:
         """Discover EVE SSO OAuth metadata."""
         if not force and not self._metadata_expired:
             return self._metadata
+        if not force and self._metadata_loaded and self.stale_while_revalidate:
+            self._refresh_in_background("metadata", self._fetch_metadata)
+            return self._metadata
 
-        res = self.api_client.call_api(method="GET", url=self.metadata_endpoints_url)
-        self._metadata = EsiMetadataResponse.model_validate_json(res.read())
-        self._metadata_expires_at = int(time.time()) + self.metadata_ttl
-        return self._metadata
+        with self._fetch_locks["metadata"]:
+            # Another thread may have fetched it while this one waited
+            if not force and not self._metadata_expired:
+                return self._metadata
+            try:
+                return self._fetch_metadata()
+            except Exception as e:
+                # Back off before the next attempt either way, so an SSO outage does not stall every caller
+                self._set_retry("metadata")
+                if not self._metadata_loaded:
+                    raise
+                logger.warning(f"SSO metadata refresh failed, serving stale metadata: {e}")
+                return self._metadata
 
     def fetch_jwks(self, force: bool = False) -> EsiJwksResponse:
         """Fetch EVE SSO JWKs metadata."""
-        if not force and self._jwks_data and not self._jwks_expired:
-            return self._jwks_data
+        jwks_data = self._jwks_data
+        if not force and jwks_data and not self._jwks_expired:
+            return jwks_data
+        if not force and jwks_data and self.stale_while_revalidate:
+            self._refresh_in_background("jwks", self._fetch_jwks)
+            return jwks_data
 
-        metadata = self.discover_metadata()
-        res = self.api_client.call_api(method="GET", url=metadata.jwks_uri)
-        self._jwks_data = EsiJwksResponse.model_validate_json(res.read())
-        self._jwks_expires_at = int(time.time()) + self.jwks_ttl
-        return self._jwks_data
+        with self._fetch_locks["jwks"]:
+            jwks_data = self._jwks_data
+            if not force and jwks_data and not self._jwks_expired:
+                return jwks_data
+            try:
+                return self._fetch_jwks()
+            except Exception as e:
+                if not jwks_data:
+                    raise
+                logger.warning(f"SSO JWKS refresh failed, serving stale keys: {e}")
+                self._set_retry("jwks")
+                return jwks_data
 
     def get_jwk(self, kid: str) -> EsiJwk | None:
         """Get JWK by key ID."""
-        return self._jwks.get(kid) if self._jwks else None
+        keys = self._jwks
+        if keys and kid in keys:
+            return keys[kid]
+        # A key missing from a cached set usually means SSO rotated its keys since we fetched them
+        if self._jwks_data and int(time.time()) >= self._jwks_fetched_at + self.refresh_retry:
+            with self._fetch_locks["jwks"]:
+                # Threads missing the same key refetch once
+                if int(time.time()) >= self._jwks_fetched_at + self.refresh_retry:
+                    self.fetch_jwks(force=True)
+            return self._jwks_by_kid.get(kid)
+        return None
+
+    def get_signing_key(self, kid: str) -> PyJWK | None:
+        """Get the parsed public key for a key ID, ready for jwt.decode."""
+        jwk = self.get_jwk(kid)
+        if not jwk:
+            return None
+        signing_keys = self._signing_keys
+        key = signing_keys.get(kid)
+        if key is None:
+            key = PyJWK(jwk.model_dump(), jwk.alg)
+            signing_keys[kid] = key
+        return key
+
+    def _fetch_metadata(self) -> EsiMetadataResponse:
+        res = self.api_client.call_api(method="GET", url=self.metadata_endpoints_url)
+        if res.status != 200:
+            raise ApiException(res.status, res.data)
+        body = res.read()
+        metadata = EsiMetadataResponse.model_validate_json(body)
+        expires_at = int(time.time()) + self.metadata_ttl
+        with self._lock:
+            self._set_metadata(metadata, expires_at)
+        self._persist("metadata", body, expires_at)
+        return metadata
+
+    def _fetch_jwks(self) -> EsiJwksResponse:
+        metadata = self.discover_metadata()
+        res = self.api_client.call_api(method="GET", url=metadata.jwks_uri)
+        if res.status != 200:
+            raise ApiException(res.status, res.data)
+        body = res.read()
+        jwks_data = EsiJwksResponse.model_validate_json(body)
+        now = int(time.time())
+        expires_at = now + self.jwks_ttl
+        with self._lock:
+            self._set_jwks(jwks_data, expires_at)
+            self._jwks_fetched_at = now
+        self._persist("jwks", body, expires_at)
+        return jwks_data
+
+    def _set_metadata(self, metadata: EsiMetadataResponse, expires_at: int) -> None:
+        # EsiMetadataResponse is an EsiMetadataResponseEndpoints, so the fetched model serves as both
+        self._endpoints = metadata
+        self._issuer = metadata.issuer
+        self._metadata = metadata
+        self._metadata_expires_at = expires_at
+        self._metadata_loaded = True
+
+    def _set_jwks(self, jwks_data: EsiJwksResponse, expires_at: int) -> None:
+        # Swap in a new dict rather than clearing, readers may hold the previous one
+        self._jwks_by_kid = {key.kid: key for key in jwks_data.keys if key.kid}
+        self._signing_keys = {}
+        self._jwks_data = jwks_data
+        self._jwks_expires_at = expires_at
+
+    def _refresh_in_background(self, name: str, fetch: Callable[[], Any]) -> None:
+        with self._lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+
+        def run() -> None:
+            try:
+                fetch()
+            except Exception as e:
+                logger.warning(f"Background SSO {name} refresh failed, serving stale data: {e}")
+                self._set_retry(name)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(name)
+
+        threading.Thread(target=run, name=f"pyesi-sso-{name}-refresh", daemon=True).start()
+
+    def _set_retry(self, name: str) -> None:
+        retry_at = int(time.time()) + self.refresh_retry
+        with self._lock:
+            if name == "metadata":
+                self._metadata_expires_at = retry_at
+            else:
+                self._jwks_expires_at = retry_at
+
+    def _cache_path(self, name: str) -> Path:
+        assert self.cache_dir is not None
+        # Keyed by discovery URL so Tranquility and Singularity caches do not collide
+        url_hash = hashlib.sha256(self.metadata_endpoints_url.encode()).hexdigest()[:12]
+        return self.cache_dir / f"sso_{name}_{url_hash}.json"
+
+    def _persist(self, name: str, body: bytes, expires_at: int) -> None:
+        if not self.cache_dir:
+            return
+        path = self._cache_path(name)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps({"expires_at": expires_at, "body": json.loads(body)}))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to persist SSO {name} to {path}: {e}")
+
+    def _load_persisted(self) -> None:
+        for name in ("metadata", "jwks"):
+            path = self._cache_path(name)
+            try:
+                document = json.loads(path.read_text())
+                body = json.dumps(document["body"])
+                if name == "metadata":
+                    self._set_metadata(EsiMetadataResponse.model_validate_json(body), int(document["expires_at"]))
+                else:
+                    self._set_jwks(EsiJwksResponse.model_validate_json(body), int(document["expires_at"]))
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable SSO {name} cache {path}: {e}")
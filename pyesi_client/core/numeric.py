@@ -0,0 +1,16 @@
+"""
+pyesi-client:
+
+Optional NumPy Support
+"""
+
+from types import ModuleType
+
+
+def require_numpy(feature: str) -> ModuleType:
+    """Import numpy for a feature that needs it, explaining how to install it when missing."""
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(f"{feature} requires numpy, install it with: pip install 'pyesi-client[numpy]'") from e
+    return numpy
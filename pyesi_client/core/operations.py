@@ -0,0 +1,343 @@
+"""
+pyesi-client:
+
+ESI Operation Index
+"""
+
+import inspect
+import re
+from collections.abc import Callable, Iterator
+from functools import cache
+from typing import Any
+
+import pyesi_openapi
+from pyesi_openapi import ApiClient, Configuration
+
+from pyesi_client.constants import EsiCorporationRole, EsiScope
+from pyesi_client.core.scope_manager import EsiScopeSet
+from pyesi_client.models import EsiOperation
+
+Role = EsiCorporationRole
+
+# The generated client keeps only the OAuth2 flag per operation, so the scope and corporation
+# roles from the ESI specification (security / x-required-roles) are listed here.
+_OPERATION_SCOPES: dict[str, tuple[EsiScope, tuple[EsiCorporationRole, ...]]] = {
+    # Assets
+    "get_characters_character_id_assets": (EsiScope.ASSETS_READ_ASSETS, ()),
+    "post_characters_character_id_assets_locations": (EsiScope.ASSETS_READ_ASSETS, ()),
+    "post_characters_character_id_assets_names": (EsiScope.ASSETS_READ_ASSETS, ()),
+    "get_corporations_corporation_id_assets": (EsiScope.ASSETS_READ_CORPORATION_ASSETS, (Role.DIRECTOR,)),
+    "post_corporations_corporation_id_assets_locations": (EsiScope.ASSETS_READ_CORPORATION_ASSETS, (Role.DIRECTOR,)),
+    "post_corporations_corporation_id_assets_names": (EsiScope.ASSETS_READ_CORPORATION_ASSETS, (Role.DIRECTOR,)),
+    # Calendar
+    "get_characters_character_id_calendar": (EsiScope.CALENDAR_READ_CALENDAR_EVENTS, ()),
+    "get_characters_character_id_calendar_event_id": (EsiScope.CALENDAR_READ_CALENDAR_EVENTS, ()),
+    "get_characters_character_id_calendar_event_id_attendees": (EsiScope.CALENDAR_READ_CALENDAR_EVENTS, ()),
+    "put_characters_character_id_calendar_event_id": (EsiScope.CALENDAR_RESPOND_CALENDAR_EVENTS, ()),
+    # Character
+    "get_characters_character_id_agents_research": (EsiScope.CHARACTERS_READ_AGENTS_RESEARCH, ()),
+    "get_characters_character_id_blueprints": (EsiScope.CHARACTERS_READ_BLUEPRINTS, ()),
+    "get_characters_character_id_fatigue": (EsiScope.CHARACTERS_READ_FATIGUE, ()),
+    "get_characters_character_id_medals": (EsiScope.CHARACTERS_READ_MEDALS, ()),
+    "get_characters_character_id_notifications": (EsiScope.CHARACTERS_READ_NOTIFICATIONS, ()),
+    "get_characters_character_id_notifications_contacts": (EsiScope.CHARACTERS_READ_NOTIFICATIONS, ()),
+    "get_characters_character_id_roles": (EsiScope.CHARACTERS_READ_CORPORATION_ROLES, ()),
+    "get_characters_character_id_standings": (EsiScope.CHARACTERS_READ_STANDINGS, ()),
+    "get_characters_character_id_titles": (EsiScope.CHARACTERS_READ_TITLES, ()),
+    "post_characters_character_id_cspa": (EsiScope.CHARACTERS_READ_CONTACTS, ()),
+    # Clones
+    "get_characters_character_id_clones": (EsiScope.CLONES_READ_CLONES, ()),
+    "get_characters_character_id_implants": (EsiScope.CLONES_READ_IMPLANTS, ()),
+    # Contacts
+    "get_alliances_alliance_id_contacts": (EsiScope.ALLIANCES_READ_CONTACTS, ()),
+    "get_alliances_alliance_id_contacts_labels": (EsiScope.ALLIANCES_READ_CONTACTS, ()),
+    "get_characters_character_id_contacts": (EsiScope.CHARACTERS_READ_CONTACTS, ()),
+    "get_characters_character_id_contacts_labels": (EsiScope.CHARACTERS_READ_CONTACTS, ()),
+    "delete_characters_character_id_contacts": (EsiScope.CHARACTERS_WRITE_CONTACTS, ()),
+    "post_characters_character_id_contacts": (EsiScope.CHARACTERS_WRITE_CONTACTS, ()),
+    "put_characters_character_id_contacts": (EsiScope.CHARACTERS_WRITE_CONTACTS, ()),
+    "get_corporations_corporation_id_contacts": (EsiScope.CORPORATIONS_READ_CONTACTS, ()),
+    "get_corporations_corporation_id_contacts_labels": (EsiScope.CORPORATIONS_READ_CONTACTS, ()),
+    # Contracts
+    "get_characters_character_id_contracts": (EsiScope.CONTRACTS_READ_CHARACTER_CONTRACTS, ()),
+    "get_characters_character_id_contracts_contract_id_bids": (EsiScope.CONTRACTS_READ_CHARACTER_CONTRACTS, ()),
+    "get_characters_character_id_contracts_contract_id_items": (EsiScope.CONTRACTS_READ_CHARACTER_CONTRACTS, ()),
+    "get_corporations_corporation_id_contracts": (EsiScope.CONTRACTS_READ_CORPORATION_CONTRACTS, ()),
+    "get_corporations_corporation_id_contracts_contract_id_bids": (EsiScope.CONTRACTS_READ_CORPORATION_CONTRACTS, ()),
+    "get_corporations_corporation_id_contracts_contract_id_items": (
+        EsiScope.CONTRACTS_READ_CORPORATION_CONTRACTS,
+        (),
+    ),
+    # Corporation
+    "get_corporations_corporation_id_blueprints": (EsiScope.CORPORATIONS_READ_BLUEPRINTS, (Role.DIRECTOR,)),
+    "get_corporations_corporation_id_containers_logs": (EsiScope.CORPORATIONS_READ_CONTAINER_LOGS, (Role.DIRECTOR,)),
+    "get_corporations_corporation_id_divisions": (EsiScope.CORPORATIONS_READ_DIVISIONS, (Role.DIRECTOR,)),
+    "get_corporations_corporation_id_facilities": (EsiScope.CORPORATIONS_READ_FACILITIES, (Role.FACTORY_MANAGER,)),
+    "get_corporations_corporation_id_medals": (EsiScope.CORPORATIONS_READ_MEDALS, ()),
+    "get_corporations_corporation_id_medals_issued": (EsiScope.CORPORATIONS_READ_MEDALS, (Role.DIRECTOR,)),
+    "get_corporations_corporation_id_members": (EsiScope.CORPORATIONS_READ_CORPORATION_MEMBERSHIP, ()),
+    "get_corporations_corporation_id_members_limit": (EsiScope.CORPORATIONS_TRACK_MEMBERS, (Role.DIRECTOR,)),
+    "get_corporations_corporation_id_members_titles": (EsiScope.CORPORATIONS_READ_TITLES, (Role.DIRECTOR,)),
+    "get_corporations_corporation_id_membertracking": (EsiScope.CORPORATIONS_TRACK_MEMBERS, (Role.DIRECTOR,)),
+    "get_corporations_corporation_id_roles": (EsiScope.CORPORATIONS_READ_CORPORATION_MEMBERSHIP, ()),
+    "get_corporations_corporation_id_roles_history": (
+        EsiScope.CORPORATIONS_READ_CORPORATION_MEMBERSHIP,
+        (Role.DIRECTOR,),
+    ),
+    "get_corporations_corporation_id_shareholders": (EsiScope.WALLET_READ_CORPORATION_WALLETS, (Role.DIRECTOR,)),
+    "get_corporations_corporation_id_standings": (EsiScope.CORPORATIONS_READ_STANDINGS, ()),
+    "get_corporations_corporation_id_starbases": (EsiScope.CORPORATIONS_READ_STARBASES, (Role.DIRECTOR,)),
+    "get_corporations_corporation_id_starbases_starbase_id": (EsiScope.CORPORATIONS_READ_STARBASES, (Role.DIRECTOR,)),
+    "get_corporations_corporation_id_structures": (EsiScope.CORPORATIONS_READ_STRUCTURES, (Role.STATION_MANAGER,)),
+    "get_corporations_corporation_id_titles": (EsiScope.CORPORATIONS_READ_TITLES, (Role.DIRECTOR,)),
+    # Faction Warfare
+    "get_characters_character_id_fw_stats": (EsiScope.CHARACTERS_READ_FW_STATS, ()),
+    "get_corporations_corporation_id_fw_stats": (EsiScope.CORPORATIONS_READ_FW_STATS, ()),
+    # Fittings
+    "get_characters_character_id_fittings": (EsiScope.FITTINGS_READ_FITTINGS, ()),
+    "post_characters_character_id_fittings": (EsiScope.FITTINGS_WRITE_FITTINGS, ()),
+    "delete_characters_character_id_fittings_fitting_id": (EsiScope.FITTINGS_WRITE_FITTINGS, ()),
+    # Fleets
+    "get_characters_character_id_fleet": (EsiScope.FLEETS_READ_FLEET, ()),
+    "get_fleets_fleet_id": (EsiScope.FLEETS_READ_FLEET, ()),
+    "get_fleets_fleet_id_members": (EsiScope.FLEETS_READ_FLEET, ()),
+    "get_fleets_fleet_id_wings": (EsiScope.FLEETS_READ_FLEET, ()),
+    "put_fleets_fleet_id": (EsiScope.FLEETS_WRITE_FLEET, ()),
+    "post_fleets_fleet_id_members": (EsiScope.FLEETS_WRITE_FLEET, ()),
+    "put_fleets_fleet_id_members_member_id": (EsiScope.FLEETS_WRITE_FLEET, ()),
+    "delete_fleets_fleet_id_members_member_id": (EsiScope.FLEETS_WRITE_FLEET, ()),
+    "put_fleets_fleet_id_squads_squad_id": (EsiScope.FLEETS_WRITE_FLEET, ()),
+    "delete_fleets_fleet_id_squads_squad_id": (EsiScope.FLEETS_WRITE_FLEET, ()),
+    "post_fleets_fleet_id_wings": (EsiScope.FLEETS_WRITE_FLEET, ()),
+    "put_fleets_fleet_id_wings_wing_id": (EsiScope.FLEETS_WRITE_FLEET, ()),
+    "delete_fleets_fleet_id_wings_wing_id": (EsiScope.FLEETS_WRITE_FLEET, ()),
+    "post_fleets_fleet_id_wings_wing_id_squads": (EsiScope.FLEETS_WRITE_FLEET, ()),
+    # Industry
+    "get_characters_character_id_industry_jobs": (EsiScope.INDUSTRY_READ_CHARACTER_JOBS, ()),
+    "get_characters_character_id_mining": (EsiScope.INDUSTRY_READ_CHARACTER_MINING, ()),
+    "get_corporations_corporation_id_industry_jobs": (EsiScope.INDUSTRY_READ_CORPORATION_JOBS, (Role.FACTORY_MANAGER,)),
+    "get_corporation_corporation_id_mining_extractions": (
+        EsiScope.INDUSTRY_READ_CORPORATION_MINING,
+        (Role.STATION_MANAGER,),
+    ),
+    "get_corporation_corporation_id_mining_observers": (EsiScope.INDUSTRY_READ_CORPORATION_MINING, (Role.ACCOUNTANT,)),
+    "get_corporation_corporation_id_mining_observers_observer_id": (
+        EsiScope.INDUSTRY_READ_CORPORATION_MINING,
+        (Role.ACCOUNTANT,),
+    ),
+    # Killmails
+    "get_characters_character_id_killmails_recent": (EsiScope.KILLMAILS_READ_KILLMAILS, ()),
+    "get_corporations_corporation_id_killmails_recent": (
+        EsiScope.KILLMAILS_READ_CORPORATION_KILLMAILS,
+        (Role.DIRECTOR,),
+    ),
+    # Location
+    "get_characters_character_id_location": (EsiScope.LOCATION_READ_LOCATION, ()),
+    "get_characters_character_id_online": (EsiScope.LOCATION_READ_ONLINE, ()),
+    "get_characters_character_id_ship": (EsiScope.LOCATION_READ_SHIP_TYPE, ()),
+    # Loyalty
+    "get_characters_character_id_loyalty_points": (EsiScope.CHARACTERS_READ_LOYALTY, ()),
+    # Mail
+    "get_characters_character_id_mail": (EsiScope.MAIL_READ_MAIL, ()),
+    "get_characters_character_id_mail_labels": (EsiScope.MAIL_READ_MAIL, ()),
+    "get_characters_character_id_mail_lists": (EsiScope.MAIL_READ_MAIL, ()),
+    "get_characters_character_id_mail_mail_id": (EsiScope.MAIL_READ_MAIL, ()),
+    "post_characters_character_id_mail": (EsiScope.MAIL_SEND_MAIL, ()),
+    "post_characters_character_id_mail_labels": (EsiScope.MAIL_ORGANIZE_MAIL, ()),
+    "put_characters_character_id_mail_mail_id": (EsiScope.MAIL_ORGANIZE_MAIL, ()),
+    "delete_characters_character_id_mail_mail_id": (EsiScope.MAIL_ORGANIZE_MAIL, ()),
+    "delete_characters_character_id_mail_labels_label_id": (EsiScope.MAIL_ORGANIZE_MAIL, ()),
+    # Market
+    "get_characters_character_id_orders": (EsiScope.MARKETS_READ_CHARACTER_ORDERS, ()),
+    "get_characters_character_id_orders_history": (EsiScope.MARKETS_READ_CHARACTER_ORDERS, ()),
+    "get_corporations_corporation_id_orders": (
+        EsiScope.MARKETS_READ_CORPORATION_ORDERS,
+        (Role.ACCOUNTANT, Role.TRADER),
+    ),
+    "get_corporations_corporation_id_orders_history": (
+        EsiScope.MARKETS_READ_CORPORATION_ORDERS,
+        (Role.ACCOUNTANT, Role.TRADER),
+    ),
+    "get_markets_structures_structure_id": (EsiScope.MARKETS_STRUCTURE_MARKETS, ()),
+    # Planetary Interaction
+    "get_characters_character_id_planets": (EsiScope.PLANETS_MANAGE_PLANETS, ()),
+    "get_characters_character_id_planets_planet_id": (EsiScope.PLANETS_MANAGE_PLANETS, ()),
+    "get_corporations_corporation_id_customs_offices": (EsiScope.PLANETS_READ_CUSTOMS_OFFICES, (Role.DIRECTOR,)),
+    # Search
+    "get_characters_character_id_search": (EsiScope.SEARCH_SEARCH_STRUCTURES, ()),
+    # Skills
+    "get_characters_character_id_attributes": (EsiScope.SKILLS_READ_SKILLS, ()),
+    "get_characters_character_id_skillqueue": (EsiScope.SKILLS_READ_SKILLQUEUE, ()),
+    "get_characters_character_id_skills": (EsiScope.SKILLS_READ_SKILLS, ()),
+    # Universe
+    "get_universe_structures_structure_id": (EsiScope.UNIVERSE_READ_STRUCTURES, ()),
+    # User Interface
+    "post_ui_autopilot_waypoint": (EsiScope.UI_WRITE_WAYPOINT, ()),
+    "post_ui_openwindow_contract": (EsiScope.UI_OPEN_WINDOW, ()),
+    "post_ui_openwindow_information": (EsiScope.UI_OPEN_WINDOW, ()),
+    "post_ui_openwindow_marketdetails": (EsiScope.UI_OPEN_WINDOW, ()),
+    "post_ui_openwindow_newmail": (EsiScope.UI_OPEN_WINDOW, ()),
+    # Wallet
+    "get_characters_character_id_wallet": (EsiScope.WALLET_READ_CHARACTER_WALLET, ()),
+    "get_characters_character_id_wallet_journal": (EsiScope.WALLET_READ_CHARACTER_WALLET, ()),
+    "get_characters_character_id_wallet_transactions": (EsiScope.WALLET_READ_CHARACTER_WALLET, ()),
+    "get_corporations_corporation_id_wallets": (
+        EsiScope.WALLET_READ_CORPORATION_WALLETS,
+        (Role.ACCOUNTANT, Role.JUNIOR_ACCOUNTANT),
+    ),
+    "get_corporations_corporation_id_wallets_division_journal": (
+        EsiScope.WALLET_READ_CORPORATION_WALLETS,
+        (Role.ACCOUNTANT, Role.JUNIOR_ACCOUNTANT),
+    ),
+    "get_corporations_corporation_id_wallets_division_transactions": (
+        EsiScope.WALLET_READ_CORPORATION_WALLETS,
+        (Role.ACCOUNTANT, Role.JUNIOR_ACCOUNTANT),
+    ),
+}
+
+# Generated methods come in several flavours that share one operation id
+_OPERATION_SUFFIXES = ("_with_http_info", "_without_preload_content", "_data")
+_PATH_PARAM_PATTERN = re.compile(r"\{([^}]+)\}")
+# Passed as per-request auth while probing so the serializer reveals whether OAuth2 applies
+_AUTH_PROBE_HEADER = "X-Pyesi-Auth-Probe"
+_AUTH_PROBE = {"type": "probe", "in": "header", "key": _AUTH_PROBE_HEADER, "value": "1"}
+
+
+def operation_name(func: Callable[..., Any] | str) -> str:
+    """Get the operation id for a generated API method or method name."""
+    name = func if isinstance(func, str) else getattr(func, "__name__", "")
+    for suffix in _OPERATION_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def data_method(api: Any, name: str) -> Callable[..., Any]:
+    """Get the generated method returning deserialized data for an operation."""
+    return getattr(api, f"{name}_data", None) or getattr(api, name)
+
+
+def http_info_method(api: Any, name: str) -> Callable[..., Any]:
+    """Get the generated method returning an ApiResponse for an operation."""
+    return getattr(api, f"{name}_with_http_info", None) or getattr(api, name)
+
+
+def raw_method(api: Any, name: str) -> Callable[..., Any]:
+    """Get the generated method returning the undecoded HTTP response for an operation."""
+    return getattr(api, f"{name}_without_preload_content")
+
+
+def response_type(api: Any, name: str) -> Any:
+    """Get the type an operation's successful response deserializes to."""
+    annotation = inspect.signature(data_method(api, name)).return_annotation
+    # Without a _data variant the plain method may return ApiResponse[T]
+    generic_args = getattr(annotation, "__pydantic_generic_metadata__", {}).get("args")
+    return generic_args[0] if generic_args else annotation
+
+
+def _api_attribute(api_class_name: str) -> str:
+    # FactionWarfareApi -> faction_warfare, matching the EsiClient properties
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", api_class_name.removesuffix("Api")).lower()
+
+
+def _probe_operations(api_class: type, api_client: ApiClient) -> Iterator[EsiOperation]:
+    api = api_class(api_client)
+    host = api_client.configuration.host
+    for attribute in dir(api_class):
+        if not (attribute.startswith("_") and attribute.endswith("_serialize")) or attribute.startswith("__"):
+            continue
+        name = attribute[1 : -len("_serialize")]
+        serialize = getattr(api, attribute)
+        kwargs: dict[str, Any] = dict.fromkeys(inspect.signature(serialize).parameters)
+        kwargs["_host_index"] = 0
+        kwargs["_request_auth"] = _AUTH_PROBE
+        method, url, headers, _, _ = serialize(**kwargs)
+        path = url.removeprefix(host).split("?", 1)[0]
+        scope, roles = _OPERATION_SCOPES.get(name, (None, ()))
+        yield EsiOperation(
+            name=name,
+            api=_api_attribute(api_class.__name__),
+            method=method,
+            path=path,
+            path_params=tuple(_PATH_PARAM_PATTERN.findall(path)),
+            requires_auth=_AUTH_PROBE_HEADER in (headers or {}),
+            scope=scope,
+            roles=frozenset(roles),
+        )
+
+
+def _path_pattern(path: str) -> re.Pattern[str]:
+    # split() alternates literal segments and parameter names
+    parts = _PATH_PARAM_PATTERN.split(path)
+    return re.compile(
+        "".join(re.escape(part) if index % 2 == 0 else "[^/]+" for index, part in enumerate(parts)) + "/?$"
+    )
+
+
+class EsiOperationIndex:
+    """Precomputed index of ESI operations with their required scopes and roles."""
+
+    def __init__(self, operations: list[EsiOperation]) -> None:
+        self._operations: dict[str, EsiOperation] = {operation.name: operation for operation in operations}
+        self._required: dict[str, EsiScopeSet] = {
+            operation.name: EsiScopeSet.from_scopes((operation.scope,) if operation.scope else ())
+            for operation in operations
+        }
+        self._by_scope: dict[EsiScope, tuple[EsiOperation, ...]] = {}
+        for operation in operations:
+            if operation.scope:
+                self._by_scope[operation.scope] = (*self._by_scope.get(operation.scope, ()), operation)
+        # Literal paths such as /universe/ids/ must win over templates matching the same URL
+        self._routes: dict[str, list[tuple[re.Pattern[str], EsiOperation]]] = {}
+        for operation in sorted(operations, key=lambda operation: len(operation.path_params)):
+            pattern = _path_pattern(operation.path)
+            self._routes.setdefault(operation.method.upper(), []).append((pattern, operation))
+
+    @classmethod
+    def from_openapi(cls) -> "EsiOperationIndex":
+        """Build the index by inspecting every generated pyesi_openapi API class."""
+        api_client = ApiClient(Configuration())
+        operations: list[EsiOperation] = []
+        for export in pyesi_openapi.__all__:
+            api_class = getattr(pyesi_openapi, export, None)
+            if export.endswith("Api") and isinstance(api_class, type):
+                operations.extend(_probe_operations(api_class, api_client))
+        return cls(operations)
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    def __iter__(self) -> Iterator[EsiOperation]:
+        return iter(self._operations.values())
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._operations
+
+    def get(self, operation: Callable[..., Any] | str) -> EsiOperation:
+        """Get operation metadata by generated method or operation id."""
+        name = operation_name(operation)
+        try:
+            return self._operations[name]
+        except KeyError:
+            raise ValueError(f"Unknown ESI operation: {name}") from None
+
+    def required_scopes(self, operation: Callable[..., Any] | str) -> EsiScopeSet:
+        """Get the scopes an operation requires."""
+        return self._required.get(operation_name(operation)) or EsiScopeSet()
+
+    def match(self, method: str, path: str) -> EsiOperation | None:
+        """Get the operation serving a request, from its HTTP method and URL path without host."""
+        for pattern, operation in self._routes.get(method.upper(), ()):
+            if pattern.match(path):
+                return operation
+        return None
+
+    def for_scope(self, scope: EsiScope) -> tuple[EsiOperation, ...]:
+        """Get every operation unlocked by a scope."""
+        return self._by_scope.get(scope, ())
+
+
+@cache
+def get_operation_index() -> EsiOperationIndex:
+    """Get the shared operation index, built on first use."""
+    return EsiOperationIndex.from_openapi()
@@ -0,0 +1,68 @@
+"""
+pyesi-client:
+
+Paginated Fetches
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+from pyesi_openapi import ApiException
+
+from pyesi_client.constants import DEFAULT_PAGE_CONCURRENCY, EsiResultFormat
+from pyesi_client.core.executor import EsiParseExecutor, merge_results
+from pyesi_client.core.operations import operation_name, raw_method, response_type
+from pyesi_client.core.scheduler import ContextThreadPoolExecutor
+
+
+def fetch_pages(
+    func: Callable[..., Any],
+    executor: EsiParseExecutor,
+    /,
+    *,
+    result_format: EsiResultFormat = EsiResultFormat.MODEL,
+    max_concurrency: int = DEFAULT_PAGE_CONCURRENCY,
+    **kwargs: Any,
+) -> Any:
+    """
+    Fetch every page of a paginated operation and return the merged result.
+
+    func is a generated API method such as client.market.get_markets_region_id_orders. Pages
+    after the first (per its X-Pages header) are downloaded concurrently as raw bytes, and each
+    body is handed to the parse executor as soon as it arrives.
+    """
+    api = getattr(func, "__self__", None)
+    if api is None:
+        raise ValueError("fetch_pages requires a bound generated API method")
+    name = operation_name(func)
+    fetch = raw_method(api, name)
+    parse_type = response_type(api, name)
+
+    body, pages = _fetch_page(fetch, kwargs)
+    futures = [executor.submit(parse_type, body, result_format)]
+    if pages > 1:
+        with ContextThreadPoolExecutor(min(max_concurrency, pages - 1), thread_name_prefix="pyesi-page") as pool:
+            bodies = pool.map(lambda page: _fetch_page(fetch, {**kwargs, "page": page})[0], range(2, pages + 1))
+            futures.extend(executor.submit(parse_type, body, result_format) for body in bodies)
+
+    results = [future.result() for future in futures]
+    if len(results) == 1:
+        return results[0]
+    return merge_results(results, result_format)
+
+
+def fetch_raw(fetch: Callable[..., Any], /, **kwargs: Any) -> tuple[bytes, Any]:
+    """Call a generated *_without_preload_content method and return the body and headers of a 2xx response."""
+    response = fetch(**kwargs)
+    try:
+        body = response.data
+    finally:
+        response.release_conn()
+    if not 200 <= response.status <= 299:
+        raise ApiException(status=response.status, reason=response.reason, body=body.decode("utf-8", "replace"))
+    return body, response.headers
+
+
+def _fetch_page(fetch: Callable[..., Any], kwargs: dict[str, Any]) -> tuple[bytes, int]:
+    body, headers = fetch_raw(fetch, **kwargs)
+    return body, int(headers.get("X-Pages") or 1)
@@ -0,0 +1,134 @@
+"""
+pyesi-client:
+
+Character Router
+"""
+
+import itertools
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from pyesi_openapi import ApiException, CharacterApi
+
+from pyesi_client.constants import EsiCorporationRole, EsiScope
+from pyesi_client.core.operations import EsiOperationIndex, data_method, get_operation_index, operation_name
+from pyesi_client.core.scheduler import current_tenant, request_context
+from pyesi_client.core.token_pool import EsiTokenPool
+from pyesi_client.models import EsiOperation
+
+logger = logging.getLogger(__name__)
+
+
+class EsiCharacterRouter:
+    """
+    Route authenticated operations to characters allowed to call them.
+
+    Eligibility combines the operation's scope, its corporation roles (Directors hold every
+    role) and, for corporation endpoints, membership of the requested corporation. Calls are
+    spread round-robin over eligible characters, and characters answered with 403 are not
+    chosen again for that operation. Corporation endpoints only consider characters whose
+    corporation is known, see refresh_character and EsiTokenPool.update.
+    """
+
+    def __init__(self, pool: EsiTokenPool, *, operations: EsiOperationIndex | None = None) -> None:
+        self.pool: EsiTokenPool = pool
+        self.operations: EsiOperationIndex = operations or get_operation_index()
+        self._eligible: dict[tuple[str, int | None], tuple[int, ...]] = {}
+        self._eligible_version: int = -1
+        self._cursors: dict[tuple[str, int | None], itertools.count[int]] = {}
+        self._denied: set[tuple[str, int]] = set()
+
+    def eligible(self, operation: Callable[..., Any] | str, *, corporation_id: int | None = None) -> tuple[int, ...]:
+        """Get characters allowed to call an operation, in pool order."""
+        op = self.operations.get(operation)
+        if self._eligible_version != self.pool.version:
+            self._eligible = {}
+            self._eligible_version = self.pool.version
+        key = (op.name, corporation_id)
+        characters = self._eligible.get(key)
+        if characters is None:
+            characters = tuple(
+                character_id
+                for character_id in self.pool.scope_index.eligible(self.operations.required_scopes(op.name))
+                if (op.name, character_id) not in self._denied and self._allowed(op, character_id, corporation_id)
+            )
+            self._eligible[key] = characters
+        return characters
+
+    def select(self, operation: Callable[..., Any] | str, *, corporation_id: int | None = None) -> int:
+        """Pick the next eligible character for an operation."""
+        characters = self.eligible(operation, corporation_id=corporation_id)
+        if not characters:
+            raise ValueError(f"No character in the token pool can call {operation_name(operation)}")
+        key = (operation_name(operation), corporation_id)
+        cursor = self._cursors.get(key)
+        if cursor is None:
+            cursor = self._cursors.setdefault(key, itertools.count())
+        return characters[next(cursor) % len(characters)]
+
+    def character_for(
+        self,
+        operation: Callable[..., Any] | str,
+        *,
+        character_id: int | None = None,
+        corporation_id: int | None = None,
+    ) -> int:
+        """Pick the character to call an operation as, or check that the given one is eligible."""
+        if character_id is None:
+            return self.select(operation, corporation_id=corporation_id)
+        if character_id not in self.eligible(operation, corporation_id=corporation_id):
+            raise ValueError(f"Character {character_id} cannot call {operation_name(operation)}")
+        return character_id
+
+    def call(self, func: Callable[..., Any], /, **kwargs: Any) -> Any:
+        """
+        Call a generated API method as an eligible character.
+
+        Path parameters are taken from kwargs: corporation_id restricts the choice to members
+        of that corporation, and an explicit character_id must itself be eligible. When the
+        operation takes a character_id that was not given, the selected character is used.
+        """
+        op = self.operations.get(func)
+        if not op.requires_auth:
+            return func(**kwargs)
+
+        corporation_id = kwargs.get("corporation_id") if "corporation_id" in op.path_params else None
+        character_id = kwargs.get("character_id") if "character_id" in op.path_params else None
+        character_id = self.character_for(op.name, character_id=character_id, corporation_id=corporation_id)
+        if "character_id" in op.path_params:
+            kwargs["character_id"] = character_id
+
+        try:
+            # Requests not tagged with a tenant are queued fairly per character
+            with request_context(tenant=current_tenant() or f"character:{character_id}"):
+                return func(**kwargs, _request_auth=self.pool.request_auth(character_id))
+        except ApiException as e:
+            if e.status == 403:
+                logger.warning(f"Character {character_id} was refused {op.name}, excluding it from routing")
+                self._denied.add((op.name, character_id))
+                self._eligible = {}
+            raise
+
+    def refresh_character(self, character_id: int) -> None:
+        """Refresh a pooled character's corporation and roles from ESI."""
+        character = self.pool.character(character_id)
+        character_api = CharacterApi(self.pool.api_client)
+        public = data_method(character_api, "get_characters_character_id")(character_id=character_id)
+        roles: list[str] = []
+        if EsiScope.CHARACTERS_READ_CORPORATION_ROLES in character.scopes:
+            character_roles = data_method(character_api, "get_characters_character_id_roles")(
+                character_id=character_id, _request_auth=self.pool.request_auth(character_id)
+            )
+            roles = character_roles.roles or []
+        # Fresh roles may lift earlier 403 exclusions
+        self._denied = {entry for entry in self._denied if entry[1] != character_id}
+        self.pool.update(character_id, corporation_id=public.corporation_id, roles=roles)
+
+    def _allowed(self, op: EsiOperation, character_id: int, corporation_id: int | None) -> bool:
+        character = self.pool.character(character_id)
+        if corporation_id is not None and character.corporation_id != corporation_id:
+            return False
+        if op.roles and EsiCorporationRole.DIRECTOR not in character.roles:
+            return not op.roles.isdisjoint(character.roles)
+        return True
@@ -0,0 +1,233 @@
+"""
+pyesi-client:
+
+Request Scheduler
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any
+
+from pyesi_client.constants import DEFAULT_INTERACTIVE_RESERVED, DEFAULT_MAX_CONCURRENCY, EsiPriority
+from pyesi_client.core.adaptive import EsiAdaptiveLimit
+
+# Highest priority first
+_PRIORITIES: tuple[EsiPriority, ...] = tuple(EsiPriority)
+
+_priority: contextvars.ContextVar[EsiPriority] = contextvars.ContextVar("esi_priority", default=EsiPriority.BACKGROUND)
+_tenant: contextvars.ContextVar[str | None] = contextvars.ContextVar("esi_tenant", default=None)
+
+
+@contextmanager
+def request_context(priority: EsiPriority | None = None, tenant: str | None = None) -> Iterator[None]:
+    """Tag requests made in this context, keeping the current priority or tenant when not given."""
+    tokens = []
+    if priority is not None:
+        tokens.append((_priority, _priority.set(EsiPriority(priority))))
+    if tenant is not None:
+        tokens.append((_tenant, _tenant.set(tenant)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def current_tenant() -> str | None:
+    return _tenant.get()
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """Thread pool running every task in a copy of the submitting thread's context, so request tags follow fan-outs."""
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class _Ticket:
+    __slots__ = ("granted", "wake")
+
+    def __init__(self, wake: Callable[[], None]) -> None:
+        self.granted: bool = False
+        self.wake: Callable[[], None] = wake
+
+
+class EsiRequestScheduler:
+    """
+    Global cap on concurrent ESI requests, handing free slots out by priority and fairness.
+
+    Waiting requests are served strictly by EsiPriority, and within a priority by weighted
+    fair queuing over tenants: a tenant with weight w gets w slots for every one of a tenant
+    with weight 1, however many requests it queues. reserved slots are only used by
+    interactive requests, so they never wait for a slot held by background or bulk work.
+
+    The generated API methods are blocking, so EsiApiClient waits with acquire.
+    asyncio code waits with acquire_async or async_slot instead, without blocking its loop.
+
+    With an adaptive limit, its current limit replaces max_concurrency and a Retry-After
+    pause holds every waiting request back until it ends.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        *,
+        reserved: int = DEFAULT_INTERACTIVE_RESERVED,
+        weights: Mapping[str, float] | None = None,
+        adaptive: EsiAdaptiveLimit | None = None,
+    ) -> None:
+        if not 0 <= reserved < max_concurrency:
+            raise ValueError("reserved must leave at least one slot for background and bulk requests")
+        self.max_concurrency: int = max_concurrency
+        self.reserved: int = reserved
+        self.weights: dict[str, float] = dict(weights or {})
+        self.adaptive: EsiAdaptiveLimit | None = adaptive
+        self._resume_timer: threading.Timer | None = None
+        self._in_flight: int = 0
+        self._queues: dict[EsiPriority, list[tuple[float, int, _Ticket]]] = {priority: [] for priority in _PRIORITIES}
+        self._virtual_time: dict[EsiPriority, float] = dict.fromkeys(_PRIORITIES, 0.0)
+        self._finish_times: dict[tuple[EsiPriority, str | None], float] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def capacity(self) -> int:
+        """Current number of requests allowed in flight."""
+        return self.adaptive.limit if self.adaptive else self.max_concurrency
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        metrics: dict[str, Any] = {"capacity": self.capacity, "in_flight": self.in_flight, "waiting": self.waiting}
+        if self.adaptive:
+            metrics["adaptive"] = self.adaptive.metrics
+        return metrics
+
+    def observe(self, latency: float, status: int, headers: Mapping[str, str] | None = None) -> None:
+        """Report a completed request to the adaptive limit, if any."""
+        if self.adaptive:
+            self.adaptive.observe(latency, status, headers)
+
+    def context(self, priority: EsiPriority | None = None, tenant: str | None = None) -> Any:
+        """Tag requests made in this context, see request_context."""
+        return request_context(priority, tenant)
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Wait for a slot for a request tagged by the current context, False after timeout seconds."""
+        ready = threading.Event()
+        ticket = self._enqueue(ready.set)
+        if ready.wait(timeout):
+            return True
+        return not self._withdraw(ticket)
+
+    async def acquire_async(self) -> None:
+        """Wait for a slot without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(lambda: ready.done() or ready.set_result(None))
+
+        ticket = self._enqueue(wake)
+        try:
+            await ready
+        except asyncio.CancelledError:
+            if not self._withdraw(ticket):
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot for the duration of a request."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def async_slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of an awaited request."""
+        await self.acquire_async()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _enqueue(self, wake: Callable[[], None]) -> _Ticket:
+        priority, tenant = _priority.get(), _tenant.get()
+        ticket = _Ticket(wake)
+        with self._lock:
+            # Finish tag of this request on its tenant's virtual clock
+            tag = max(self._virtual_time[priority], self._finish_times.get((priority, tenant), 0.0))
+            tag += 1.0 / self.weights.get(tenant or "", 1.0)
+            self._finish_times[(priority, tenant)] = tag
+            heapq.heappush(self._queues[priority], (tag, next(self._sequence), ticket))
+            self._dispatch()
+        return ticket
+
+    def _withdraw(self, ticket: _Ticket) -> bool:
+        """Remove a ticket still queued, False when it was already granted a slot."""
+        with self._lock:
+            if ticket.granted:
+                return False
+            for queue in self._queues.values():
+                for index, entry in enumerate(queue):
+                    if entry[2] is ticket:
+                        queue.pop(index)
+                        heapq.heapify(queue)
+                        return True
+        return True
+
+    def _dispatch(self) -> None:
+        capacity = self.capacity
+        if self.adaptive and self.waiting:
+            pause = self.adaptive.paused_until - time.time()
+            if pause > 0:
+                if self._resume_timer is None:
+                    self._resume_timer = threading.Timer(pause, self._resume)
+                    self._resume_timer.daemon = True
+                    self._resume_timer.start()
+                return
+        for priority in _PRIORITIES:
+            queue = self._queues[priority]
+            while queue:
+                limit = capacity
+                if priority != EsiPriority.INTERACTIVE:
+                    # An adaptive limit may shrink below the reservation, keep background work moving
+                    limit = max(1, limit - self.reserved)
+                if self._in_flight >= limit:
+                    # Lower priorities have the same or a smaller limit
+                    return
+                tag, _, ticket = heapq.heappop(queue)
+                self._virtual_time[priority] = tag
+                self._in_flight += 1
+                ticket.granted = True
+                ticket.wake()
+            # Every tag of an idle priority is in the past, so its tenants start over
+            for key in [key for key in self._finish_times if key[0] == priority]:
+                del self._finish_times[key]
+
+    def _resume(self) -> None:
+        with self._lock:
+            self._resume_timer = None
+            self._dispatch()
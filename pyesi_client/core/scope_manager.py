@@ -4,39 +4,218 @@ pyesi-client:
 ESI Scope Manager
 """
 
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
 from typing import Self
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_serializer, field_validator
 
 from pyesi_client.constants import EsiScope
 
+_SCOPE_ORDER: tuple[EsiScope, ...] = tuple(EsiScope)
+_SCOPE_BITS: dict[EsiScope, int] = {scope: 1 << index for index, scope in enumerate(_SCOPE_ORDER)}
+# EsiScope is a str enum, so members and raw scope strings share the same lookup
+_SCOPE_BITS_BY_VALUE: dict[str, int] = {scope.value: bit for scope, bit in _SCOPE_BITS.items()}
+# OAuth strings are sorted by scope value, which is not necessarily the enum definition order
+_SCOPE_BITS_SORTED_BY_VALUE: tuple[tuple[int, str], ...] = tuple(
+    sorted(((bit, scope.value) for scope, bit in _SCOPE_BITS.items()), key=lambda item: item[1])
+)
+
+
+class EsiScopeSet:
+    """
+    Immutable bitset of ESI scopes.
+
+    Each EsiScope maps to one bit following the enum definition order, so membership,
+    subset and superset checks are single integer operations and the OAuth string is
+    built once per set.
+    """
+
+    __slots__ = ("_mask", "_oauth_string")
+
+    def __init__(self, mask: int = 0) -> None:
+        self._mask: int = mask
+        self._oauth_string: str | None = None
+
+    @classmethod
+    def from_scopes(cls, scopes: Iterable[EsiScope | str]) -> "EsiScopeSet":
+        """Build a scope set from EsiScope members or raw scope strings."""
+        mask = 0
+        for scope in scopes:
+            bit = _SCOPE_BITS_BY_VALUE.get(scope)
+            if bit is None:
+                raise ValueError(f"Unknown ESI scope: {scope}")
+            mask |= bit
+        return cls(mask)
+
+    @classmethod
+    def from_oauth_string(cls, value: str) -> "EsiScopeSet":
+        """Build a scope set from a space separated OAuth scope string."""
+        return _parse_oauth_string(value)
+
+    @classmethod
+    def all(cls) -> "EsiScopeSet":
+        """Scope set containing every known ESI scope."""
+        return cls((1 << len(_SCOPE_ORDER)) - 1)
+
+    @property
+    def mask(self) -> int:
+        return self._mask
+
+    @property
+    def values(self) -> tuple[str, ...]:
+        """Scope values sorted the same way as the OAuth string."""
+        mask = self._mask
+        return tuple(value for bit, value in _SCOPE_BITS_SORTED_BY_VALUE if mask & bit)
+
+    @property
+    def oauth_string(self) -> str:
+        """Space separated OAuth scope string, computed once per set."""
+        if self._oauth_string is None:
+            self._oauth_string = " ".join(self.values)
+        return self._oauth_string
+
+    def issubset(self, other: "EsiScopeSet") -> bool:
+        """Check if every scope in this set is also in other."""
+        return self._mask & ~other._mask == 0
+
+    def issuperset(self, other: "EsiScopeSet") -> bool:
+        """Check if this set contains every scope in other."""
+        return other._mask & ~self._mask == 0
+
+    def __contains__(self, scope: object) -> bool:
+        bit = _SCOPE_BITS_BY_VALUE.get(scope) if isinstance(scope, str) else None
+        return bit is not None and self._mask & bit != 0
+
+    def __iter__(self) -> Iterator[EsiScope]:
+        mask = self._mask
+        return (scope for scope in _SCOPE_ORDER if mask & _SCOPE_BITS[scope])
+
+    def __len__(self) -> int:
+        return self._mask.bit_count()
+
+    def __bool__(self) -> bool:
+        return self._mask != 0
+
+    def __or__(self, other: "EsiScopeSet") -> "EsiScopeSet":
+        return EsiScopeSet(self._mask | other._mask)
+
+    def __and__(self, other: "EsiScopeSet") -> "EsiScopeSet":
+        return EsiScopeSet(self._mask & other._mask)
+
+    def __sub__(self, other: "EsiScopeSet") -> "EsiScopeSet":
+        return EsiScopeSet(self._mask & ~other._mask)
+
+    def __le__(self, other: "EsiScopeSet") -> bool:
+        return self.issubset(other)
+
+    def __ge__(self, other: "EsiScopeSet") -> bool:
+        return self.issuperset(other)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, EsiScopeSet):
+            return self._mask == other._mask
+        if isinstance(other, (set, frozenset)):
+            try:
+                return self._mask == EsiScopeSet.from_scopes(other)._mask  # type: ignore[arg-type]
+            except ValueError:
+                return False
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._mask)
+
+    def __repr__(self) -> str:
+        return f"EsiScopeSet({[scope.name for scope in self]})"
+
+
+@lru_cache(maxsize=1024)
+def _parse_oauth_string(value: str) -> EsiScopeSet:
+    # JWT scope strings repeat for every token of the same application, so parsed sets are shared
+    return EsiScopeSet.from_scopes(value.split())
+
+
+class EsiScopeIndex:
+    """
+    Reverse index from scopes to the characters holding them.
+
+    Lookups for a given set of required scopes are memoized until the index changes, so
+    routing work to eligible characters does not allocate on the hot path.
+    """
+
+    def __init__(self) -> None:
+        self._characters: dict[int, EsiScopeSet] = {}
+        self._eligible: dict[int, tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._characters)
+
+    def __contains__(self, character_id: object) -> bool:
+        return character_id in self._characters
+
+    def set(self, character_id: int, scopes: EsiScopeSet | Iterable[EsiScope | str]) -> None:
+        """Register or replace the scopes granted to a character."""
+        scope_set = scopes if isinstance(scopes, EsiScopeSet) else EsiScopeSet.from_scopes(scopes)
+        self._characters[character_id] = scope_set
+        self._eligible = {}
+
+    def discard(self, character_id: int) -> None:
+        """Remove a character from the index."""
+        if self._characters.pop(character_id, None) is not None:
+            self._eligible = {}
+
+    def scopes_for(self, character_id: int) -> EsiScopeSet:
+        """Get the scopes granted to a character."""
+        return self._characters.get(character_id, EsiScopeSet())
+
+    def eligible(self, required: EsiScopeSet) -> tuple[int, ...]:
+        """Get characters holding every scope in required, in registration order."""
+        cache = self._eligible
+        characters = cache.get(required.mask)
+        if characters is None:
+            characters = tuple(
+                character_id for character_id, scopes in self._characters.items() if scopes.issuperset(required)
+            )
+            cache[required.mask] = characters
+        return characters
+
+    def characters_with(self, *scopes: EsiScope) -> tuple[int, ...]:
+        """Get characters holding all of the given scopes."""
+        return self.eligible(EsiScopeSet.from_scopes(scopes))
+
 
 class EsiScopeManager(BaseModel):
     """Manager for type-safe EVE SSO OAuth scopes."""
 
-    scopes: set[EsiScope] = Field(default_factory=set)
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    scopes: EsiScopeSet = Field(default_factory=EsiScopeSet)
 
     @field_validator("scopes", mode="before")
     @classmethod
-    def validate_scopes(cls, value: set[EsiScope] | list[EsiScope | str]) -> set[EsiScope]:
-        """Convert input to EsiScope set."""
-        if isinstance(value, set):
+    def validate_scopes(cls, value: EsiScopeSet | Iterable[EsiScope | str]) -> EsiScopeSet:
+        """Convert input to EsiScopeSet."""
+        if isinstance(value, EsiScopeSet):
             return value
-        return {EsiScope(scope) if isinstance(scope, str) else scope for scope in value}
+        return EsiScopeSet.from_scopes(value)
+
+    @field_serializer("scopes")
+    def serialize_scopes(self, value: EsiScopeSet) -> list[str]:
+        return list(value.values)
 
     def add(self, *scopes: EsiScope) -> Self:
         """Add one or more scopes."""
-        self.scopes.update(scopes)
+        self.scopes = self.scopes | EsiScopeSet.from_scopes(scopes)
         return self
 
     def add_from_list(self, scopes: list[EsiScope]) -> Self:
         """Add a list of scopes."""
-        self.scopes.update(scopes)
+        self.scopes = self.scopes | EsiScopeSet.from_scopes(scopes)
         return self
 
     def remove(self, scope: EsiScope) -> Self:
         """Remove a scope."""
-        self.scopes.discard(scope)
+        self.scopes = self.scopes - EsiScopeSet.from_scopes((scope,))
         return self
 
     def has(self, scope: EsiScope) -> bool:
@@ -45,13 +224,22 @@ class EsiScopeManager(BaseModel):
 
     def to_oauth_string(self) -> str:
         """Convert to OAuth string."""
-        return " ".join(sorted(scope.value for scope in self.scopes))
+        return self.scopes.oauth_string
 
-    def matches(self, jwt_scopes: list[str] | str | set[EsiScope]) -> bool:
+    def matches(self, jwt_scopes: list[str] | str | set[EsiScope] | EsiScopeSet) -> bool:
         """Check if scopes match JWT scopes."""
-        if isinstance(jwt_scopes, str):
-            jwt_scopes = jwt_scopes.split()
-        elif isinstance(jwt_scopes, set):
-            jwt_scopes = [scope.value for scope in jwt_scopes]
+        try:
+            if isinstance(jwt_scopes, str):
+                other = EsiScopeSet.from_oauth_string(jwt_scopes)
+            elif isinstance(jwt_scopes, EsiScopeSet):
+                other = jwt_scopes
+            else:
+                other = EsiScopeSet.from_scopes(jwt_scopes)
+        except ValueError:
+            # Scopes unknown to EsiScope can never match the managed set
+            return False
+        return self.scopes.mask == other.mask
 
-        return {scope.value for scope in self.scopes} == set(jwt_scopes)
+    def covered_by(self, granted: EsiScopeSet) -> bool:
+        """Check if granted scopes include every managed scope."""
+        return self.scopes.issubset(granted)
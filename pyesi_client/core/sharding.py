@@ -0,0 +1,207 @@
+"""
+pyesi-client:
+
+Sharding
+"""
+
+import bisect
+import hashlib
+import logging
+import os
+import socket
+import time
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+
+from pyesi_client.constants import DEFAULT_SHARD_REPLICAS, DEFAULT_SHARD_TTL
+from pyesi_client.core.token_pool import EsiTokenPool
+
+_HEARTBEAT_SUFFIX = ".worker"
+
+logger = logging.getLogger(__name__)
+
+
+def shard_key(kind: str, entity_id: int) -> str:
+    """Key of an entity on the hash ring, such as character:90000001 or region:10000002."""
+    return f"{kind}:{entity_id}"
+
+
+def _point(value: str) -> int:
+    # Python's hash() is salted per process, shards must agree across processes
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class EsiHashRing:
+    """
+    Consistent hash ring mapping keys to nodes.
+
+    Every node is placed at replicas points, so keys spread evenly and adding or removing a
+    node only moves the keys between it and its neighbours.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), *, replicas: int = DEFAULT_SHARD_REPLICAS) -> None:
+        self.replicas: int = replicas
+        self._nodes: set[str] = set()
+        self._points: list[int] = []
+        self._owners: list[str] = []
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._nodes
+
+    @property
+    def nodes(self) -> tuple[str, ...]:
+        return tuple(sorted(self._nodes))
+
+    def add(self, node: str) -> None:
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for replica in range(self.replicas):
+            point = _point(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: str) -> None:
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        kept = [(point, owner) for point, owner in zip(self._points, self._owners, strict=True) if owner != node]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def node_for(self, key: str) -> str:
+        """Get the node owning a key."""
+        if not self._points:
+            raise ValueError("Hash ring has no nodes")
+        index = bisect.bisect(self._points, _point(key)) % len(self._points)
+        return self._owners[index]
+
+    def assign(self, keys: Iterable[str]) -> dict[str, list[str]]:
+        """Group keys by owning node, including nodes owning none."""
+        assignment: dict[str, list[str]] = {node: [] for node in self.nodes}
+        for key in keys:
+            assignment[self.node_for(key)].append(key)
+        return assignment
+
+
+class EsiShardCoordinator:
+    """
+    Membership of the workers sharing a directory, without any external service.
+
+    Each worker keeps a heartbeat file in the directory fresh; workers whose file is older
+    than ttl are considered gone. The directory can live on any filesystem the workers share.
+    """
+
+    def __init__(self, directory: str | Path, worker_id: str | None = None, *, ttl: float = DEFAULT_SHARD_TTL) -> None:
+        self.directory: Path = Path(directory)
+        self.worker_id: str = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.ttl: float = ttl
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def _heartbeat_path(self) -> Path:
+        return self.directory / f"{self.worker_id}{_HEARTBEAT_SUFFIX}"
+
+    def heartbeat(self) -> None:
+        """Join, or stay a member of, the worker set."""
+        self._heartbeat_path.touch()
+
+    def leave(self) -> None:
+        """Leave the worker set, so the remaining workers take over this worker's keys."""
+        self._heartbeat_path.unlink(missing_ok=True)
+
+    def members(self) -> tuple[str, ...]:
+        """Get the ids of live workers."""
+        cutoff = time.time() - self.ttl
+        members = set()
+        for path in self.directory.glob(f"*{_HEARTBEAT_SUFFIX}"):
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    members.add(path.name.removesuffix(_HEARTBEAT_SUFFIX))
+            except FileNotFoundError:
+                # Left between listing and stat
+                continue
+        return tuple(sorted(members))
+
+
+class EsiShard:
+    """
+    This worker's share of characters, corporations and regions.
+
+    Keys are spread over the live workers of a coordinator with a consistent hash ring.
+    Call refresh at least every coordinator ttl: it renews this worker's heartbeat and
+    rebalances when workers joined or left. Each worker runs its own EsiClient, so its
+    connection pool and token pool only serve its own shard.
+    """
+
+    def __init__(self, coordinator: EsiShardCoordinator, *, replicas: int = DEFAULT_SHARD_REPLICAS) -> None:
+        self.coordinator: EsiShardCoordinator = coordinator
+        self.replicas: int = replicas
+        self.ring: EsiHashRing = EsiHashRing(replicas=replicas)
+        self.refresh()
+
+    @property
+    def worker_id(self) -> str:
+        return self.coordinator.worker_id
+
+    @property
+    def members(self) -> tuple[str, ...]:
+        return self.ring.nodes
+
+    def refresh(self) -> bool:
+        """Renew the heartbeat and rebuild the ring, returning whether the worker set changed."""
+        self.coordinator.heartbeat()
+        members = set(self.coordinator.members()) | {self.worker_id}
+        if members == set(self.ring.nodes):
+            return False
+        logger.info(f"Shard {self.worker_id}: rebalancing over {len(members)} workers")
+        self.ring = EsiHashRing(members, replicas=self.replicas)
+        return True
+
+    def owns(self, kind: str, entity_id: int) -> bool:
+        """Check whether an entity belongs to this worker."""
+        return self.ring.node_for(shard_key(kind, entity_id)) == self.worker_id
+
+    def select(self, kind: str, entity_ids: Iterable[int]) -> list[int]:
+        """Keep the entities belonging to this worker."""
+        return [entity_id for entity_id in entity_ids if self.owns(kind, entity_id)]
+
+    def owns_character(self, character_id: int, corporation_id: int | None = None) -> bool:
+        """Check whether a character's token belongs to this worker: with its corporation when given, else alone."""
+        if corporation_id is not None:
+            return self.owns("corporation", corporation_id)
+        return self.owns("character", character_id)
+
+    def assign_tokens(
+        self,
+        pool: EsiTokenPool,
+        refresh_tokens: Mapping[int, str],
+        *,
+        corporation_ids: Mapping[int, int] | None = None,
+    ) -> None:
+        """
+        Keep pool holding the characters of this shard and drop the others.
+
+        refresh_tokens maps character ids to refresh tokens. With corporation_ids (character id
+        to corporation id), characters are placed with their corporation, so the shard owning a
+        corporation holds its members for corporation endpoints. Either way each character has
+        exactly one shard, so no two workers refresh the same rotating refresh token.
+        """
+        corporation_ids = corporation_ids or {}
+        wanted = {
+            character_id
+            for character_id in refresh_tokens
+            if self.owns_character(character_id, corporation_ids.get(character_id))
+        }
+        for character in pool.characters:
+            if character.character_id not in wanted:
+                pool.remove(character.character_id)
+        for character_id in sorted(wanted):
+            if character_id not in pool:
+                pool.add_refresh_token(refresh_tokens[character_id], corporation_id=corporation_ids.get(character_id))
@@ -0,0 +1,63 @@
+"""
+pyesi-client:
+
+Columnar Files
+"""
+
+import json
+import os
+import struct
+import sys
+import threading
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+def write_columns(path: str | Path, magic: bytes, header: Mapping[str, Any], columns: Mapping[str, array]) -> None:
+    """
+    Write array columns to a binary file, replacing it atomically.
+
+    The file holds the magic bytes, a JSON header and the raw column data, so loading is a
+    handful of reads with no per-item parsing.
+    """
+    path = Path(path)
+    encoded = json.dumps(
+        {
+            **header,
+            "byteorder": sys.byteorder,
+            "columns": [[name, column.typecode, len(column)] for name, column in columns.items()],
+        }
+    ).encode()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with tmp_path.open("wb") as file:
+            file.write(magic)
+            file.write(_HEADER_LENGTH.pack(len(encoded)))
+            file.write(encoded)
+            for column in columns.values():
+                column.tofile(file)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def read_columns(path: str | Path, magic: bytes) -> tuple[dict[str, Any], dict[str, array]]:
+    """Read the header and columns of a file written by write_columns."""
+    with Path(path).open("rb") as file:
+        if file.read(len(magic)) != magic:
+            raise ValueError(f"{path} is not a {magic.decode(errors='replace')} file")
+        (header_length,) = _HEADER_LENGTH.unpack(file.read(_HEADER_LENGTH.size))
+        header = json.loads(file.read(header_length))
+        columns: dict[str, array] = {}
+        for name, typecode, length in header.pop("columns"):
+            column = array(typecode)
+            column.fromfile(file, length)
+            if header["byteorder"] != sys.byteorder:
+                column.byteswap()
+            columns[name] = column
+    return header, columns
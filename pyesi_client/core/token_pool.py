@@ -0,0 +1,169 @@
+"""
+pyesi-client:
+
+Token Pool
+"""
+
+import logging
+import threading
+from collections.abc import Iterable
+
+from pyesi_openapi import ApiClient
+
+from pyesi_client.constants import EsiCorporationRole, EsiScope
+from pyesi_client.core.auth import EsiAuth
+from pyesi_client.core.metadata_manager import EsiMetadataManager
+from pyesi_client.core.scope_manager import EsiScopeIndex, EsiScopeManager
+from pyesi_client.core.token_store import EsiTokenStore
+from pyesi_client.models import EsiPoolCharacter
+
+logger = logging.getLogger(__name__)
+
+
+class EsiTokenPool:
+    """
+    Pool of authenticated characters for one EVE application.
+
+    Every character gets its own EsiAuth sharing the API client and SSO metadata, and is
+    registered in a scope index so callers can find characters allowed to call an endpoint.
+    With a token_store, pools in several processes share token sets and refresh each
+    character only once.
+    """
+
+    def __init__(
+        self,
+        api_client: ApiClient,
+        client_id: str,
+        *,
+        client_secret: str | None = None,
+        redirect_uri: str = "http://localhost",
+        metadata_manager: EsiMetadataManager | None = None,
+        token_store: EsiTokenStore | None = None,
+    ) -> None:
+        self.api_client: ApiClient = api_client
+        self.client_id: str = client_id
+        self.client_secret: str | None = client_secret
+        self.redirect_uri: str = redirect_uri
+        self.metadata_manager: EsiMetadataManager = metadata_manager or EsiMetadataManager(api_client)
+        self.scope_index: EsiScopeIndex = EsiScopeIndex()
+        self.token_store: EsiTokenStore | None = token_store
+
+        self._auths: dict[int, EsiAuth] = {}
+        self._characters: dict[int, EsiPoolCharacter] = {}
+        self._lock = threading.Lock()
+        self._version: int = 0
+
+    def __len__(self) -> int:
+        return len(self._characters)
+
+    def __contains__(self, character_id: object) -> bool:
+        return character_id in self._characters
+
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever characters are added, updated or removed."""
+        return self._version
+
+    @property
+    def characters(self) -> tuple[EsiPoolCharacter, ...]:
+        return tuple(self._characters.values())
+
+    def add_refresh_token(
+        self,
+        refresh_token: str,
+        *,
+        corporation_id: int | None = None,
+        roles: Iterable[EsiCorporationRole | str] = (),
+        token_key: str | None = None,
+    ) -> EsiPoolCharacter:
+        """Authenticate a character from a refresh token and add it to the pool."""
+        auth = EsiAuth(
+            api_client=self.api_client,
+            scope_manager=EsiScopeManager(),
+            redirect_uri=self.redirect_uri,
+            client_id=self.client_id,
+            client_secret=self.client_secret,
+            refresh_token=refresh_token,
+            metadata_manager=self.metadata_manager,
+            token_store=self.token_store,
+            token_key=token_key,
+        )
+        return self.add(auth, corporation_id=corporation_id, roles=roles)
+
+    def add(
+        self,
+        auth: EsiAuth,
+        *,
+        corporation_id: int | None = None,
+        roles: Iterable[EsiCorporationRole | str] = (),
+    ) -> EsiPoolCharacter:
+        """Add an authenticated character, reading its identity and scopes from the verified token."""
+        token = auth.verify()
+        character = EsiPoolCharacter(
+            character_id=token.character_id,
+            character_name=token.character_name,
+            corporation_id=corporation_id,
+            # Scopes unknown to EsiScope are kept as raw strings by the token model
+            scopes=frozenset(scope for scope in token.scp if isinstance(scope, EsiScope)),
+            roles=frozenset(EsiCorporationRole(role) for role in roles),
+        )
+        with self._lock:
+            self._auths[character.character_id] = auth
+            self._register(character)
+        logger.info(f"Added character {character.character_name} ({character.character_id}) to token pool")
+        return character
+
+    def update(
+        self,
+        character_id: int,
+        *,
+        corporation_id: int | None = None,
+        roles: Iterable[EsiCorporationRole | str] | None = None,
+    ) -> EsiPoolCharacter:
+        """Update the corporation or roles of a pooled character."""
+        with self._lock:
+            character = self.character(character_id)
+            changes: dict[str, object] = {}
+            if corporation_id is not None:
+                changes["corporation_id"] = corporation_id
+            if roles is not None:
+                changes["roles"] = frozenset(EsiCorporationRole(role) for role in roles)
+            character = character.model_copy(update=changes)
+            self._register(character)
+        return character
+
+    def remove(self, character_id: int) -> None:
+        """Remove a character from the pool."""
+        with self._lock:
+            self._auths.pop(character_id, None)
+            if self._characters.pop(character_id, None) is not None:
+                self.scope_index.discard(character_id)
+                self._version += 1
+
+    def character(self, character_id: int) -> EsiPoolCharacter:
+        """Get a pooled character."""
+        try:
+            return self._characters[character_id]
+        except KeyError:
+            raise ValueError(f"Character {character_id} is not in the token pool") from None
+
+    def auth(self, character_id: int) -> EsiAuth:
+        """Get the auth handler of a pooled character."""
+        try:
+            return self._auths[character_id]
+        except KeyError:
+            raise ValueError(f"Character {character_id} is not in the token pool") from None
+
+    def request_auth(self, character_id: int) -> dict[str, str]:
+        """Get per-request auth settings carrying the character's access token."""
+        return {
+            "type": "oauth2",
+            "in": "header",
+            "key": "Authorization",
+            "value": f"Bearer {self.auth(character_id).access_token}",
+        }
+
+    def _register(self, character: EsiPoolCharacter) -> None:
+        self._characters[character.character_id] = character
+        self.scope_index.set(character.character_id, character.scopes)
+        self._version += 1
@@ -0,0 +1,138 @@
+"""
+pyesi-client:
+
+Token Store
+"""
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from pyesi_client.models.token_models import EsiTokenSet
+
+
+class EsiTokenStore(ABC):
+    """
+    Token sets shared by every process authenticating the same characters.
+
+    EVE SSO rotates refresh tokens, so when several processes refresh one character the
+    losers are left with invalidated tokens. A store holds the latest token set per key and
+    short leases: only the lease holder refreshes, and everyone else reads its result.
+
+    A Redis-like backend maps acquire to SET key owner NX PX ttl and release to a
+    compare-and-delete script.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> EsiTokenSet | None:
+        """Get the latest token set stored under key."""
+
+    @abstractmethod
+    def put(self, key: str, token_set: EsiTokenSet) -> None:
+        """Store a token set, replacing the previous one."""
+
+    @abstractmethod
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        """Take the refresh lease of key for ttl seconds, False while another owner holds it."""
+
+    @abstractmethod
+    def release(self, key: str, owner: str) -> None:
+        """Give up a lease, ignored when owner no longer holds it."""
+
+
+class EsiMemoryTokenStore(EsiTokenStore):
+    """Token store shared by the threads of one process."""
+
+    def __init__(self) -> None:
+        self._tokens: dict[str, EsiTokenSet] = {}
+        self._leases: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> EsiTokenSet | None:
+        return self._tokens.get(key)
+
+    def put(self, key: str, token_set: EsiTokenSet) -> None:
+        with self._lock:
+            self._tokens[key] = token_set
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease and lease[0] != owner and lease[1] > now:
+                return False
+            self._leases[key] = (owner, now + ttl)
+            return True
+
+    def release(self, key: str, owner: str) -> None:
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease and lease[0] == owner:
+                del self._leases[key]
+
+
+class EsiSqliteTokenStore(EsiTokenStore):
+    """
+    Token store in a SQLite database shared by the processes of one host.
+
+    Leases are taken inside BEGIN IMMEDIATE transactions, so SQLite's file lock makes them
+    exclusive across processes. Network filesystems do not lock reliably, so workers spread
+    over several nodes need a networked backend instead. The file holds refresh tokens and
+    is created readable by its owner only.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path: Path = Path(path)
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            self.path.touch(mode=0o600)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS tokens (key TEXT PRIMARY KEY, token_set TEXT NOT NULL) WITHOUT ROWID"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL) "
+            "WITHOUT ROWID"
+        )
+
+    def get(self, key: str) -> EsiTokenSet | None:
+        row = self._connection().execute("SELECT token_set FROM tokens WHERE key = ?", (key,)).fetchone()
+        return EsiTokenSet.model_validate_json(row[0]) if row else None
+
+    def put(self, key: str, token_set: EsiTokenSet) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO tokens (key, token_set) VALUES (?, ?)", (key, token_set.model_dump_json())
+        )
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        connection = self._connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT owner, expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+            if row and row[0] != owner and row[1] > now:
+                connection.execute("ROLLBACK")
+                return False
+            connection.execute(
+                "INSERT OR REPLACE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)", (key, owner, now + ttl)
+            )
+            connection.execute("COMMIT")
+            return True
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def release(self, key: str, owner: str) -> None:
+        self._connection().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit, so every statement outside acquire is its own short transaction
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
@@ -0,0 +1,188 @@
+"""
+pyesi-client:
+
+Record and Replay Transport
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+import urllib3
+from pyesi_openapi import ApiClient, ApiException
+from pyesi_openapi.rest import RESTResponse
+
+from pyesi_client.models import EsiExchange
+
+
+def _body_digest(body: Any, post_params: Any) -> str | None:
+    payload = body if body is not None else post_params
+    if not payload:
+        return None
+    if not isinstance(payload, bytes):
+        payload = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EsiTransportArchive:
+    """Recorded exchanges, saved as gzipped JSON lines."""
+
+    def __init__(self, exchanges: Iterable[EsiExchange] = ()) -> None:
+        self.exchanges: list[EsiExchange] = list(exchanges)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.exchanges)
+
+    def __iter__(self) -> Iterator[EsiExchange]:
+        return iter(self.exchanges)
+
+    def append(self, exchange: EsiExchange) -> None:
+        with self._lock:
+            self.exchanges.append(exchange)
+
+    def save(self, path: str | Path) -> None:
+        with self._lock, gzip.open(path, "wt", encoding="utf-8") as file:
+            for exchange in self.exchanges:
+                file.write(exchange.model_dump_json(exclude_defaults=True) + "\n")
+
+    @classmethod
+    def load(cls, path: str | Path) -> "EsiTransportArchive":
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            return cls(EsiExchange.model_validate_json(line) for line in file if line.strip())
+
+
+class EsiTransport(ABC):
+    """Replacement for the generated REST client under an ApiClient."""
+
+    def install(self, api_client: ApiClient) -> None:
+        """Send every request of api_client, including SSO token and discovery requests, through this transport."""
+        api_client.rest_client = self
+
+    @abstractmethod
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None = None,
+        body: Any = None,
+        post_params: Any = None,
+        _request_timeout: Any = None,
+    ) -> RESTResponse: ...
+
+
+class EsiRecordingTransport(EsiTransport):
+    """
+    Transport passing requests to the network and recording every exchange in an archive.
+
+    Response headers, bodies and timing are kept; request bodies are only kept as a digest,
+    so authorization codes and refresh tokens never reach the archive.
+    """
+
+    def __init__(self, archive: EsiTransportArchive | None = None) -> None:
+        self.archive: EsiTransportArchive = archive if archive is not None else EsiTransportArchive()
+        self._inner: Any = None
+        self._started: float = time.monotonic()
+
+    def install(self, api_client: ApiClient) -> None:
+        self._inner = api_client.rest_client
+        super().install(api_client)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None = None,
+        body: Any = None,
+        post_params: Any = None,
+        _request_timeout: Any = None,
+    ) -> RESTResponse:
+        if self._inner is None:
+            raise ValueError("Recording transport is not installed on an API client")
+        digest = _body_digest(body, post_params)
+        started = time.monotonic()
+        response = self._inner.request(method, url, headers, body, post_params, _request_timeout)
+        data = response.read()
+        duration = time.monotonic() - started
+        try:
+            text, encoded = data.decode(), False
+        except UnicodeDecodeError:
+            text, encoded = base64.b64encode(data).decode(), True
+        self.archive.append(
+            EsiExchange(
+                method=method.upper(),
+                url=url,
+                body_digest=digest,
+                status=response.status,
+                reason=response.reason,
+                headers=dict(response.getheaders()),
+                body=text,
+                body_base64=encoded,
+                offset=started - self._started,
+                duration=duration,
+            )
+        )
+        return response
+
+
+class EsiReplayTransport(EsiTransport):
+    """
+    Transport answering requests from an archive, without network.
+
+    Requests are matched on method, URL and body digest, falling back to method and URL so
+    token requests replay with other tokens. Repeated requests get the recorded responses in
+    order, then the last one again, so pagination and polling replay as recorded. With speed,
+    each response waits its recorded duration divided by speed; without, responses are
+    immediate. Requests that were never recorded raise ApiException with status 0.
+    """
+
+    def __init__(self, archive: EsiTransportArchive | str | Path, *, speed: float | None = None) -> None:
+        if not isinstance(archive, EsiTransportArchive):
+            archive = EsiTransportArchive.load(archive)
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive")
+        self.archive: EsiTransportArchive = archive
+        self.speed: float | None = speed
+        self.served: int = 0
+        self._exact: dict[tuple[str, str, str | None], deque[EsiExchange]] = {}
+        self._loose: dict[tuple[str, str], deque[EsiExchange]] = {}
+        for exchange in archive:
+            self._exact.setdefault((exchange.method, exchange.url, exchange.body_digest), deque()).append(exchange)
+            self._loose.setdefault((exchange.method, exchange.url), deque()).append(exchange)
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None = None,
+        body: Any = None,
+        post_params: Any = None,
+        _request_timeout: Any = None,
+    ) -> RESTResponse:
+        method = method.upper()
+        with self._lock:
+            queue = self._exact.get((method, url, _body_digest(body, post_params))) or self._loose.get((method, url))
+            if not queue:
+                raise ApiException(status=0, reason=f"No recorded response for {method} {url}")
+            exchange = queue.popleft() if len(queue) > 1 else queue[0]
+            self.served += 1
+        if self.speed:
+            time.sleep(exchange.duration / self.speed)
+        data = base64.b64decode(exchange.body) if exchange.body_base64 else exchange.body.encode()
+        response = urllib3.HTTPResponse(
+            body=data,
+            headers=exchange.headers,
+            status=exchange.status,
+            reason=exchange.reason,
+            preload_content=False,
+        )
+        return RESTResponse(response)
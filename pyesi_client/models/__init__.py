@@ -28,6 +28,13 @@ from pyesi_client.models.jwk_models import (
     EsiMetadataResponse,
     EsiMetadataResponseEndpoints,
 )
+from pyesi_client.models.asset_models import EsiAssetDiff, EsiAssetItem
+from pyesi_client.models.contract_models import EsiContractUpdate
+from pyesi_client.models.entity_models import EsiCharacterInfo
+from pyesi_client.models.map_models import EsiMapEvent, EsiSystemState
+from pyesi_client.models.operation_models import EsiBatchResult, EsiFetchResult, EsiOperation, EsiPoolCharacter
+from pyesi_client.models.transport_models import EsiExchange
+from pyesi_client.models.wallet_models import EsiWalletCursor
 
 __all__ = [
     "EsiMetadataResponseEndpoints",
@@ -48,4 +55,16 @@ __all__ = [
     "EsiBasicAuthHeaders",
     "EsiRequestHeaders",
     "EsiJwtTokenData",
+    "EsiOperation",
+    "EsiPoolCharacter",
+    "EsiBatchResult",
+    "EsiFetchResult",
+    "EsiCharacterInfo",
+    "EsiWalletCursor",
+    "EsiExchange",
+    "EsiAssetItem",
+    "EsiAssetDiff",
+    "EsiContractUpdate",
+    "EsiSystemState",
+    "EsiMapEvent",
 ]
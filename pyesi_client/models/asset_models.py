@@ -0,0 +1,33 @@
+"""Asset tree models."""
+
+from pydantic import BaseModel, ConfigDict
+
+
+class EsiAssetItem(BaseModel):
+    """Single asset from an asset tree."""
+
+    model_config = ConfigDict(frozen=True)
+
+    item_id: int
+    type_id: int
+    location_id: int
+    location_flag: str
+    location_type: str
+    quantity: int
+    is_singleton: bool
+    is_blueprint_copy: bool | None = None
+    name: str | None = None
+
+
+class EsiAssetDiff(BaseModel):
+    """Item ids that changed between two asset snapshots."""
+
+    model_config = ConfigDict(frozen=True)
+
+    added: tuple[int, ...] = ()
+    removed: tuple[int, ...] = ()
+    moved: tuple[int, ...] = ()  # location_id or location_flag changed
+    quantity_changed: tuple[int, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.moved or self.quantity_changed)
@@ -0,0 +1,16 @@
+"""Public contract crawl models."""
+
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+
+class EsiContractUpdate(BaseModel):
+    """Public contracts of a region after a crawl, with the changes since the previous one."""
+
+    model_config = ConfigDict(frozen=True)
+
+    region_id: int
+    contracts: Any  # every listed contract, in the requested result format
+    new: tuple[int, ...] = ()  # contract ids not listed in the previous crawl
+    expired: tuple[int, ...] = ()  # contract ids no longer listed
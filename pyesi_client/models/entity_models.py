@@ -0,0 +1,19 @@
+"""Public entity info models."""
+
+from pydantic import BaseModel, ConfigDict
+
+
+class EsiCharacterInfo(BaseModel):
+    """Public info of a character with its corporation and alliance."""
+
+    model_config = ConfigDict(frozen=True)
+
+    character_id: int
+    character_name: str | None = None
+    corporation_id: int
+    corporation_name: str | None = None
+    corporation_ticker: str | None = None
+    alliance_id: int | None = None
+    alliance_name: str | None = None
+    alliance_ticker: str | None = None
+    faction_id: int | None = None
@@ -0,0 +1,39 @@
+"""Sovereignty and faction warfare map models."""
+
+from pydantic import BaseModel, ConfigDict
+
+from pyesi_client.constants import EsiMapEventType
+
+
+class EsiSystemState(BaseModel):
+    """Sovereignty and faction warfare state of a solar system."""
+
+    model_config = ConfigDict(frozen=True)
+
+    system_id: int
+    alliance_id: int | None = None
+    corporation_id: int | None = None
+    faction_id: int | None = None
+    adm: float | None = None  # highest vulnerability occupancy level of sovereignty structures
+    campaign_ids: frozenset[int] = frozenset()
+    fw_owner_faction_id: int | None = None
+    fw_occupier_faction_id: int | None = None
+    fw_contested: str | None = None
+    fw_progress: float | None = None  # victory points / victory point threshold
+
+    @property
+    def owner_id(self) -> int | None:
+        """Alliance holding sovereignty, or the faction for NPC space."""
+        return self.alliance_id or self.faction_id
+
+
+class EsiMapEvent(BaseModel):
+    """Change of a system between two map snapshots."""
+
+    model_config = ConfigDict(frozen=True)
+
+    type: EsiMapEventType
+    system_id: int
+    previous: EsiSystemState | None = None
+    current: EsiSystemState | None = None
+    value: int | float | None = None  # campaign id, or the contested threshold crossed
@@ -0,0 +1,62 @@
+"""Operation metadata and token pool models."""
+
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+from pyesi_client.constants import EsiCorporationRole, EsiScope
+
+
+class EsiOperation(BaseModel):
+    """Metadata for a generated ESI API operation."""
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str  # operation id, e.g. get_corporations_corporation_id_assets
+    api: str  # API group attribute on EsiClient, e.g. assets
+    method: str  # HTTP method
+    path: str  # resource path template, e.g. /corporations/{corporation_id}/assets
+    path_params: tuple[str, ...] = ()
+    requires_auth: bool = False
+    scope: EsiScope | None = None
+    roles: frozenset[EsiCorporationRole] = frozenset()  # any one of these roles grants access
+
+
+class EsiPoolCharacter(BaseModel):
+    """Character registered in a token pool."""
+
+    model_config = ConfigDict(frozen=True)
+
+    character_id: int
+    character_name: str
+    corporation_id: int | None = None
+    scopes: frozenset[EsiScope] = frozenset()
+    roles: frozenset[EsiCorporationRole] = frozenset()
+
+
+class EsiBatchResult(BaseModel):
+    """Outcome of one call of a batch: its value, or the exception it raised."""
+
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+
+    value: Any = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> Any:
+        """Return the value, or raise the call's exception."""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class EsiFetchResult(BaseModel):
+    """Values fetched by a fetch graph run and the errors of keys that failed, by node name and key."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    data: dict[str, dict[Any, Any]] = {}
+    errors: dict[str, dict[Any, Exception]] = {}
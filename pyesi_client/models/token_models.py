@@ -7,6 +7,8 @@ from pydantic import BaseModel, computed_field, field_validator
 
 from pyesi_client.constants import EsiScope
 
+_SCOPES_BY_VALUE: dict[str, EsiScope] = {scope.value: scope for scope in EsiScope}
+
 
 class EsiTokenResponse(BaseModel):
     """OAuth token response."""
@@ -74,16 +76,5 @@ class EsiJwtTokenData(BaseModel):
     def validate_scopes(cls, v: Any) -> list[EsiScope]:
         """Convert scope strings to EsiScope enum values."""
         if isinstance(v, list):
-            scopes = []
-            for scope in v:
-                if isinstance(scope, str):
-                    for esi_scope in EsiScope:
-                        if esi_scope.value == scope:
-                            scopes.append(esi_scope)
-                            break
-                    else:
-                        scopes.append(scope)
-                else:
-                    scopes.append(scope)
-            return scopes
+            return [_SCOPES_BY_VALUE.get(scope, scope) if isinstance(scope, str) else scope for scope in v]
         return v
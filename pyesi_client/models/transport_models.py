@@ -0,0 +1,20 @@
+"""Recorded HTTP exchange models."""
+
+from pydantic import BaseModel, ConfigDict
+
+
+class EsiExchange(BaseModel):
+    """One recorded request and its response."""
+
+    model_config = ConfigDict(frozen=True)
+
+    method: str
+    url: str
+    body_digest: str | None = None  # sha256 of the request body, which may hold tokens or codes
+    status: int
+    reason: str | None = None
+    headers: dict[str, str] = {}
+    body: str = ""
+    body_base64: bool = False
+    offset: float = 0.0  # seconds from the start of the recording to the request
+    duration: float = 0.0  # seconds until the response body was read
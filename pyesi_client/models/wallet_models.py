@@ -0,0 +1,10 @@
+"""Wallet sync models."""
+
+from pydantic import BaseModel
+
+
+class EsiWalletCursor(BaseModel):
+    """Position of an incremental wallet sync, persisted between runs."""
+
+    last_id: int | None = None  # newest journal ref_id or transaction_id already emitted
+    etags: dict[int, str] = {}  # ETag per page, page 1 for from_id keyed requests
@@ -0,0 +1,34 @@
+"""
+pyesi-client:
+
+Services built on the core client
+"""
+
+from pyesi_client.services.assets import EsiAssetEngine, EsiAssetTree
+from pyesi_client.services.contracts import EsiContractCrawler
+from pyesi_client.services.entities import EsiEntityResolver
+from pyesi_client.services.fetch_graph import EsiFetchGraph
+from pyesi_client.services.industry import EsiIndustryFeed
+from pyesi_client.services.killmails import EsiKillmailPipeline
+from pyesi_client.services.map_state import EsiMapState
+from pyesi_client.services.market_history import EsiMarketHistory, EsiMarketHistoryLoader
+from pyesi_client.services.routes import EsiRouteEngine
+from pyesi_client.services.universe import EsiUniversePreloader, EsiUniverseTables
+from pyesi_client.services.wallet import EsiWalletSync
+
+__all__ = [
+    "EsiAssetEngine",
+    "EsiAssetTree",
+    "EsiContractCrawler",
+    "EsiEntityResolver",
+    "EsiFetchGraph",
+    "EsiIndustryFeed",
+    "EsiKillmailPipeline",
+    "EsiMapState",
+    "EsiMarketHistory",
+    "EsiMarketHistoryLoader",
+    "EsiRouteEngine",
+    "EsiUniversePreloader",
+    "EsiUniverseTables",
+    "EsiWalletSync",
+]
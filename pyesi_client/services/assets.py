@@ -0,0 +1,408 @@
+"""
+pyesi-client:
+
+Asset Trees
+"""
+
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Self
+
+from pyesi_client.constants import DEFAULT_ASSET_CONCURRENCY, MAX_BULK_IDS, EsiResultFormat
+from pyesi_client.core.operations import data_method
+from pyesi_client.core.scheduler import ContextThreadPoolExecutor
+from pyesi_client.core.storage import read_columns, write_columns
+from pyesi_client.models import EsiAssetDiff, EsiAssetItem
+
+if TYPE_CHECKING:
+    from pyesi_client.core.client import EsiClient
+
+_MAGIC = b"PYESIAT1"
+
+# name -> array typecode, in file order
+_COLUMNS: dict[str, str] = {
+    "item_ids": "q",
+    "type_ids": "q",
+    "location_ids": "q",
+    "quantities": "q",
+    "location_flags": "H",
+    "location_types": "H",
+    "flags": "B",
+    "parent_rows": "q",
+    "child_offsets": "q",
+    "child_rows": "q",
+    "location_rows": "q",
+    "location_keys": "q",
+}
+
+# Bits of the flags column
+_SINGLETON = 1
+_BLUEPRINT_COPY = 2
+_BLUEPRINT_COPY_KNOWN = 4
+
+logger = logging.getLogger(__name__)
+
+
+class EsiAssetTree:
+    """
+    Compact containment tree of an asset list.
+
+    Items are rows of array columns sorted by item_id. Each row knows the row of the item it is
+    in (parent_rows, -1 at the top), children are stored in CSR form (child_offsets index into
+    child_rows), and location_keys holds location ids in sorted order with the matching rows in
+    location_rows. Location flags and types are codes into a shared string table. Custom names
+    and positions in space are kept in small dicts, as only containers and ships have them.
+    """
+
+    def __init__(
+        self,
+        owner: str,
+        columns: dict[str, array],
+        strings: Sequence[str],
+        *,
+        names: Mapping[int, str] | None = None,
+        positions: Mapping[int, tuple[float, float, float]] | None = None,
+    ) -> None:
+        missing = _COLUMNS.keys() - columns.keys()
+        if missing:
+            raise ValueError(f"Missing asset tree columns: {sorted(missing)}")
+        self.owner: str = owner
+        self.item_ids: array = columns["item_ids"]
+        self.type_ids: array = columns["type_ids"]
+        self.location_ids: array = columns["location_ids"]
+        self.quantities: array = columns["quantities"]
+        self.location_flags: array = columns["location_flags"]
+        self.location_types: array = columns["location_types"]
+        self.flags: array = columns["flags"]
+        self.parent_rows: array = columns["parent_rows"]
+        self.child_offsets: array = columns["child_offsets"]
+        self.child_rows: array = columns["child_rows"]
+        self.location_rows: array = columns["location_rows"]
+        self.location_keys: array = columns["location_keys"]
+        self.strings: list[str] = list(strings)
+        self.names: dict[int, str] = dict(names or {})
+        self.positions: dict[int, tuple[float, float, float]] = dict(positions or {})
+
+    @classmethod
+    def build(
+        cls,
+        owner: str,
+        columns: Mapping[str, Sequence[Any]],
+        *,
+        names: Mapping[int, str] | None = None,
+        positions: Mapping[int, tuple[float, float, float]] | None = None,
+    ) -> Self:
+        """Build a tree from asset columns as returned by fetch_pages with EsiResultFormat.COLUMNS."""
+        source_ids = columns.get("item_id") or []
+        size = len(source_ids)
+        order = sorted(range(size), key=source_ids.__getitem__)
+
+        def column(name: str, typecode: str) -> array:
+            values = columns.get(name) or [0] * size
+            return array(typecode, (values[row] or 0 for row in order))
+
+        strings: list[str] = []
+        codes: dict[str, int] = {}
+
+        def encode(name: str) -> array:
+            values = columns.get(name) or [""] * size
+            encoded = array("H")
+            for row in order:
+                value = getattr(values[row], "value", values[row]) or ""
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(strings)
+                    strings.append(value)
+                encoded.append(code)
+            return encoded
+
+        singletons = columns.get("is_singleton") or [False] * size
+        copies = columns.get("is_blueprint_copy") or [None] * size
+        flags = array(
+            "B",
+            (
+                (_SINGLETON if singletons[row] else 0)
+                | (0 if copies[row] is None else _BLUEPRINT_COPY_KNOWN | (_BLUEPRINT_COPY if copies[row] else 0))
+                for row in order
+            ),
+        )
+
+        item_ids = column("item_id", "q")
+        location_ids = column("location_id", "q")
+        index = {item_id: row for row, item_id in enumerate(item_ids)}
+        parent_rows = array("q", (index.get(location_id, -1) for location_id in location_ids))
+
+        # Counting sort of rows by parent keeps each child list in item_id order
+        child_offsets = array("q", [0]) * (size + 1)
+        for parent in parent_rows:
+            if parent >= 0:
+                child_offsets[parent + 1] += 1
+        for row in range(size):
+            child_offsets[row + 1] += child_offsets[row]
+        child_rows = array("q", [0]) * child_offsets[size]
+        fill = array("q", child_offsets[:size])
+        for row, parent in enumerate(parent_rows):
+            if parent >= 0:
+                child_rows[fill[parent]] = row
+                fill[parent] += 1
+
+        location_rows = array("q", sorted(range(size), key=location_ids.__getitem__))
+        tree_columns = {
+            "item_ids": item_ids,
+            "type_ids": column("type_id", "q"),
+            "location_ids": location_ids,
+            "quantities": column("quantity", "q"),
+            "location_flags": encode("location_flag"),
+            "location_types": encode("location_type"),
+            "flags": flags,
+            "parent_rows": parent_rows,
+            "child_offsets": child_offsets,
+            "child_rows": child_rows,
+            "location_rows": location_rows,
+            "location_keys": array("q", (location_ids[row] for row in location_rows)),
+        }
+        return cls(owner, tree_columns, strings, names=names, positions=positions)
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def __contains__(self, item_id: object) -> bool:
+        row = bisect_left(self.item_ids, item_id)
+        return row < len(self.item_ids) and self.item_ids[row] == item_id
+
+    def item_index(self, item_id: int) -> int:
+        """Get the row of an item, raising KeyError for unknown items."""
+        row = bisect_left(self.item_ids, item_id)
+        if row == len(self.item_ids) or self.item_ids[row] != item_id:
+            raise KeyError(item_id)
+        return row
+
+    def item(self, item_id: int) -> EsiAssetItem:
+        row = self.item_index(item_id)
+        flags = self.flags[row]
+        return EsiAssetItem(
+            item_id=item_id,
+            type_id=self.type_ids[row],
+            location_id=self.location_ids[row],
+            location_flag=self.strings[self.location_flags[row]],
+            location_type=self.strings[self.location_types[row]],
+            quantity=self.quantities[row],
+            is_singleton=bool(flags & _SINGLETON),
+            is_blueprint_copy=bool(flags & _BLUEPRINT_COPY) if flags & _BLUEPRINT_COPY_KNOWN else None,
+            name=self.names.get(item_id),
+        )
+
+    def children(self, item_id: int) -> tuple[int, ...]:
+        """Get the items directly inside an item."""
+        row = self.item_index(item_id)
+        rows = self.child_rows[self.child_offsets[row] : self.child_offsets[row + 1]]
+        return tuple(self.item_ids[child] for child in rows)
+
+    def descendants(self, item_id: int) -> Iterator[int]:
+        """Iterate over every item inside an item, depth first."""
+        stack = [self.item_index(item_id)]
+        while stack:
+            row = stack.pop()
+            rows = self.child_rows[self.child_offsets[row] : self.child_offsets[row + 1]]
+            for child in reversed(rows):
+                yield self.item_ids[child]
+                stack.append(child)
+
+    def items_at(self, location_id: int) -> tuple[int, ...]:
+        """Get the items whose location_id is a station, structure, system or item."""
+        start = bisect_left(self.location_keys, location_id)
+        end = bisect_right(self.location_keys, location_id, lo=start)
+        return tuple(sorted(self.item_ids[row] for row in self.location_rows[start:end]))
+
+    def roots(self) -> Iterator[int]:
+        """Iterate over items that are not inside another item."""
+        for row, parent in enumerate(self.parent_rows):
+            if parent < 0:
+                yield self.item_ids[row]
+
+    def root_location(self, item_id: int) -> tuple[int, str]:
+        """Get the (location_id, location_type) of the outermost item holding an item."""
+        row = self.item_index(item_id)
+        while self.parent_rows[row] >= 0:
+            row = self.parent_rows[row]
+        return self.location_ids[row], self.strings[self.location_types[row]]
+
+    def diff(self, previous: "EsiAssetTree") -> EsiAssetDiff:
+        """Compare with an earlier tree of the same owner."""
+        added: list[int] = []
+        removed: list[int] = []
+        moved: list[int] = []
+        quantity_changed: list[int] = []
+        row, previous_row = 0, 0
+        size, previous_size = len(self), len(previous)
+        # Both trees are sorted by item_id, so one merge pass lines up the common items
+        while row < size or previous_row < previous_size:
+            item_id = self.item_ids[row] if row < size else None
+            previous_id = previous.item_ids[previous_row] if previous_row < previous_size else None
+            if previous_id is None or (item_id is not None and item_id < previous_id):
+                added.append(item_id)
+                row += 1
+            elif item_id is None or previous_id < item_id:
+                removed.append(previous_id)
+                previous_row += 1
+            else:
+                if self.location_ids[row] != previous.location_ids[previous_row] or (
+                    self.strings[self.location_flags[row]] != previous.strings[previous.location_flags[previous_row]]
+                ):
+                    moved.append(item_id)
+                if self.quantities[row] != previous.quantities[previous_row]:
+                    quantity_changed.append(item_id)
+                row += 1
+                previous_row += 1
+        return EsiAssetDiff(
+            added=tuple(added), removed=tuple(removed), moved=tuple(moved), quantity_changed=tuple(quantity_changed)
+        )
+
+    def save(self, path: str | Path) -> None:
+        """Write the tree to a binary file, replacing it atomically."""
+        header = {
+            "owner": self.owner,
+            "strings": self.strings,
+            "names": [[item_id, name] for item_id, name in self.names.items()],
+            "positions": [[item_id, *position] for item_id, position in self.positions.items()],
+        }
+        write_columns(path, _MAGIC, header, {name: getattr(self, name) for name in _COLUMNS})
+
+    @classmethod
+    def load(cls, path: str | Path) -> Self:
+        """Read a tree written by save."""
+        header, columns = read_columns(path, _MAGIC)
+        return cls(
+            header["owner"],
+            columns,
+            header["strings"],
+            names=dict(header["names"]),
+            positions={item_id: (x, y, z) for item_id, x, y, z in header["positions"]},
+        )
+
+
+class EsiAssetEngine:
+    """
+    Fetch character and corporation assets into EsiAssetTree.
+
+    Pages are downloaded in parallel and parsed into columns on the client's executor. Names are
+    resolved for containers and ships (singleton items that hold items or sit directly in a
+    station, structure or system) and positions for items in space, 1000 ids per request. Calls
+    are made as characters of the client's token pool. With a snapshot_dir each owner's last
+    tree is kept, and changes diffs a new tree against it.
+    """
+
+    def __init__(
+        self,
+        client: "EsiClient",
+        *,
+        snapshot_dir: str | Path | None = None,
+        max_concurrency: int = DEFAULT_ASSET_CONCURRENCY,
+    ) -> None:
+        self.client: EsiClient = client
+        self.snapshot_dir: Path | None = Path(snapshot_dir) if snapshot_dir else None
+        self.max_concurrency: int = max_concurrency
+
+    def character_assets(
+        self, character_id: int, *, resolve_names: bool = True, resolve_locations: bool = True
+    ) -> EsiAssetTree:
+        """Fetch a character's assets."""
+        return self._fetch(
+            f"character:{character_id}",
+            "characters_character_id",
+            {"character_id": character_id},
+            resolve_names=resolve_names,
+            resolve_locations=resolve_locations,
+        )
+
+    def corporation_assets(
+        self, corporation_id: int, *, resolve_names: bool = True, resolve_locations: bool = True
+    ) -> EsiAssetTree:
+        """Fetch a corporation's assets as a member with the Director role."""
+        return self._fetch(
+            f"corporation:{corporation_id}",
+            "corporations_corporation_id",
+            {"corporation_id": corporation_id},
+            resolve_names=resolve_names,
+            resolve_locations=resolve_locations,
+        )
+
+    def snapshot(self, owner: str) -> EsiAssetTree | None:
+        """Get the last stored tree of an owner, e.g. corporation:<id>."""
+        path = self._snapshot_path(owner)
+        return EsiAssetTree.load(path) if path.exists() else None
+
+    def changes(self, tree: EsiAssetTree) -> EsiAssetDiff:
+        """Diff a tree against its owner's last snapshot, then store it as the new snapshot."""
+        previous = self.snapshot(tree.owner)
+        diff = tree.diff(previous) if previous is not None else EsiAssetDiff(added=tuple(tree.item_ids))
+        tree.save(self._snapshot_path(tree.owner))
+        return diff
+
+    def _snapshot_path(self, owner: str) -> Path:
+        if self.snapshot_dir is None:
+            raise ValueError("Asset engine has no snapshot_dir")
+        return self.snapshot_dir / f"{owner.replace(':', '_')}.assets"
+
+    def _fetch(
+        self,
+        owner: str,
+        path: str,
+        owner_kwargs: dict[str, int],
+        *,
+        resolve_names: bool,
+        resolve_locations: bool,
+    ) -> EsiAssetTree:
+        api = self.client.assets
+        operation = f"get_{path}_assets"
+        character_id = self.client.router.character_for(
+            operation,
+            character_id=owner_kwargs.get("character_id"),
+            corporation_id=owner_kwargs.get("corporation_id"),
+        )
+        columns = self.client.fetch_pages(
+            getattr(api, operation),
+            result_format=EsiResultFormat.COLUMNS,
+            max_concurrency=self.max_concurrency,
+            _request_auth=self.client.router.pool.request_auth(character_id),
+            **owner_kwargs,
+        )
+        tree = EsiAssetTree.build(owner, columns)
+        logger.debug(f"{owner}: {len(tree)} assets")
+
+        if resolve_names:
+            names = self._bulk(data_method(api, f"post_{path}_assets_names"), self._nameable(tree), owner_kwargs)
+            tree.names = {item.item_id: item.name for item in names if item.name and item.name != "None"}
+        if resolve_locations:
+            in_space = [
+                tree.item_ids[row]
+                for row, code in enumerate(tree.location_types)
+                if tree.strings[code] == "solar_system"
+            ]
+            locations = self._bulk(data_method(api, f"post_{path}_assets_locations"), in_space, owner_kwargs)
+            tree.positions = {item.item_id: (item.position.x, item.position.y, item.position.z) for item in locations}
+        return tree
+
+    def _nameable(self, tree: EsiAssetTree) -> list[int]:
+        return [
+            tree.item_ids[row]
+            for row in range(len(tree))
+            if tree.flags[row] & _SINGLETON
+            and (tree.parent_rows[row] < 0 or tree.child_offsets[row + 1] > tree.child_offsets[row])
+        ]
+
+    def _bulk(self, func: Callable[..., Any], item_ids: list[int], owner_kwargs: dict[str, int]) -> list[Any]:
+        batches = [item_ids[start : start + MAX_BULK_IDS] for start in range(0, len(item_ids), MAX_BULK_IDS)]
+        if not batches:
+            return []
+
+        def call(batch: list[int]) -> list[Any]:
+            return self.client.router.call(func, request_body=batch, **owner_kwargs) or []
+
+        with ContextThreadPoolExecutor(
+            min(self.max_concurrency, len(batches)), thread_name_prefix="pyesi-asset"
+        ) as pool:
+            return [item for result in pool.map(call, batches) for item in result]
@@ -0,0 +1,189 @@
+"""
+pyesi-client:
+
+Public Contract Crawler
+"""
+
+import json
+import logging
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+
+from pyesi_openapi import ApiException
+
+from pyesi_client.constants import DEFAULT_CONTRACT_CONCURRENCY, EsiResultFormat
+from pyesi_client.core.cache import EsiBlobStore
+from pyesi_client.core.compatibility import partition_namespace
+from pyesi_client.core.operations import raw_method, response_type
+from pyesi_client.core.pagination import fetch_raw
+from pyesi_client.core.scheduler import ContextThreadPoolExecutor
+from pyesi_client.models import EsiContractUpdate
+
+if TYPE_CHECKING:
+    from pyesi_client.core.client import EsiClient
+
+CONTRACT_ITEMS_NAMESPACE = "contract_items"
+CONTRACT_LISTINGS_NAMESPACE = "contract_listings"
+_ITEMS_OPERATION = "get_contracts_public_items_contract_id"
+_ITEM_CONTRACT_TYPES = frozenset({"item_exchange", "auction"})  # couriers carry no item list
+
+logger = logging.getLogger(__name__)
+
+
+class EsiContractCrawler:
+    """
+    Crawl public contracts of many regions, fetching each contract's items only once.
+
+    Regions are paged in parallel, and the contract ids listed in each are kept in the blob
+    store, so every crawl reports new and expired contracts. Contract items never change, so
+    their raw bodies are stored when a contract first appears and dropped once it expires.
+    Contracts whose items ESI refuses (accepted or deleted since listed) get an empty list,
+    so they are not requested again on every crawl while they stay listed.
+    Items are stored per compatibility date of the client, listings are shared by all dates.
+    """
+
+    def __init__(
+        self,
+        client: "EsiClient",
+        *,
+        store: EsiBlobStore | None = None,
+        max_concurrency: int = DEFAULT_CONTRACT_CONCURRENCY,
+    ) -> None:
+        self.client: EsiClient = client
+        self.store: EsiBlobStore = store or EsiBlobStore()
+        self.max_concurrency: int = max_concurrency
+
+    @property
+    def _items_namespace(self) -> str:
+        return partition_namespace(CONTRACT_ITEMS_NAMESPACE, self.client.compatibility_date)
+
+    def crawl(
+        self,
+        region_ids: Iterable[int],
+        *,
+        fetch_items: bool = True,
+        result_format: EsiResultFormat = EsiResultFormat.MODEL,
+        errors: dict[int, Exception] | None = None,
+    ) -> dict[int, EsiContractUpdate]:
+        """
+        List public contracts of regions in parallel and, optionally, download items of new contracts.
+
+        Regions that fail to list and contracts whose items fail to download are logged and
+        skipped, and their errors are added to errors, by region or contract id, when given.
+        A failed region keeps its previous listing, so its changes are reported by the next
+        crawl, and failed items are requested again by the next crawl.
+        """
+        region_ids = list(dict.fromkeys(region_ids))
+        if not region_ids:
+            return {}
+        failed = errors if errors is not None else {}
+        with ContextThreadPoolExecutor(
+            min(self.max_concurrency, len(region_ids)), thread_name_prefix="pyesi-contract"
+        ) as pool:
+            results = pool.map(lambda region_id: self._crawl_region(region_id, result_format), region_ids)
+            crawled = []
+            for region_id, result in zip(region_ids, results, strict=True):
+                if isinstance(result, Exception):
+                    _failed(failed, "Region", region_id, result)
+                else:
+                    crawled.append(result)
+            if fetch_items:
+                # Any listed contract without stored items, so failed downloads are retried next crawl
+                wanted = [contract_id for _, with_items, _ in crawled for contract_id in with_items]
+                stored = self.store.get_many(self._items_namespace, map(str, wanted)).keys()
+                missing = [contract_id for contract_id in wanted if str(contract_id) not in stored]
+                if missing:
+                    logger.debug(f"Fetching items of {len(missing)} contracts")
+                for contract_id, error in zip(missing, pool.map(self._download_items, missing), strict=True):
+                    if error is not None:
+                        _failed(failed, "Contract", contract_id, error)
+        # Listings are only saved with an update to return, so no crawl's changes are lost
+        for update, _, listed_ids in crawled:
+            self._save_listing(update, listed_ids)
+        return {update.region_id: update for update, _, _ in crawled}
+
+    def items(
+        self, contract_id: int, *, result_format: EsiResultFormat = EsiResultFormat.MODEL
+    ) -> list[Any] | dict[str, list[Any]] | None:
+        """
+        Get the stored items of a contract, None when they were never fetched or the contract expired.
+
+        Contracts whose items ESI no longer exposes have an empty list.
+        """
+        body = self.store.get(self._items_namespace, str(contract_id))
+        if body is None:
+            return None
+        parse_type = response_type(self.client.contracts, _ITEMS_OPERATION)
+        return self.client.executor.parse(parse_type, body, result_format)
+
+    def _crawl_region(
+        self, region_id: int, result_format: EsiResultFormat
+    ) -> tuple[EsiContractUpdate, list[int], set[int]] | Exception:
+        try:
+            contracts = self.client.fetch_pages(
+                self.client.contracts.get_contracts_public_region_id, result_format=result_format, region_id=region_id
+            )
+        except Exception as e:
+            return e
+        listed = _column(contracts, "contract_id", result_format)
+        types = _column(contracts, "type", result_format)
+        previous = self.store.get(CONTRACT_LISTINGS_NAMESPACE, _listing_key(region_id))
+        previous_ids = set(json.loads(previous)) if previous else set()
+        listed_ids = set(listed)
+        update = EsiContractUpdate(
+            region_id=region_id,
+            contracts=contracts,
+            new=tuple(sorted(listed_ids - previous_ids)),
+            expired=tuple(sorted(previous_ids - listed_ids)),
+        )
+        with_items = [
+            contract_id
+            for contract_id, kind in zip(listed, types, strict=True)
+            if getattr(kind, "value", kind) in _ITEM_CONTRACT_TYPES
+        ]
+        return update, with_items, listed_ids
+
+    def _save_listing(self, update: EsiContractUpdate, listed_ids: set[int]) -> None:
+        for contract_id in update.expired:
+            self.store.delete(self._items_namespace, str(contract_id))
+        key = _listing_key(update.region_id)
+        self.store.put(CONTRACT_LISTINGS_NAMESPACE, key, json.dumps(sorted(listed_ids)).encode())
+
+    def _download_items(self, contract_id: int) -> Exception | None:
+        fetch = raw_method(self.client.contracts, _ITEMS_OPERATION)
+        try:
+            body, headers = fetch_raw(fetch, contract_id=contract_id)
+            pages = int(headers.get("X-Pages") or 1)
+            if pages > 1:
+                rows = json.loads(body)
+                for page in range(2, pages + 1):
+                    rows.extend(json.loads(fetch_raw(fetch, contract_id=contract_id, page=page)[0]))
+                body = json.dumps(rows).encode()
+        except ApiException as e:
+            # Contracts accepted or deleted since the listing no longer expose items, remember that
+            # until the contract leaves the listing instead of spending the error limit every crawl
+            if e.status not in (403, 404):
+                return e
+            logger.debug(f"Contract {contract_id} is gone: {e.status}")
+            body = b""
+        except Exception as e:
+            return e
+        self.store.put(self._items_namespace, str(contract_id), body or b"[]")
+        return None
+
+
+def _failed(errors: dict[int, Exception], kind: str, key: int, error: Exception) -> None:
+    logger.warning(f"{kind} {key} failed: {error}")
+    errors[key] = error
+
+
+def _listing_key(region_id: int) -> str:
+    return f"region:{region_id}"
+
+
+def _column(contracts: Any, field: str, result_format: EsiResultFormat) -> list[Any]:
+    if result_format == EsiResultFormat.COLUMNS:
+        return list(contracts.get(field) or [])
+    if result_format == EsiResultFormat.DICT:
+        return [contract[field] for contract in contracts]
+    return [getattr(contract, field) for contract in contracts]
@@ -0,0 +1,194 @@
+"""
+pyesi-client:
+
+Entity Resolver
+"""
+
+import logging
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
+
+from pyesi_openapi import ApiException
+
+from pyesi_client.constants import (
+    DEFAULT_ENTITY_CONCURRENCY,
+    DEFAULT_ENTITY_TTL,
+    DEFAULT_TTL_CACHE_SIZE,
+    MAX_BULK_IDS,
+)
+from pyesi_client.core.cache import EsiTtlCache, EsiTtlCachePartition, expires_at_from_headers
+from pyesi_client.core.compatibility import compatibility_partition
+from pyesi_client.core.operations import http_info_method
+from pyesi_client.core.scheduler import ContextThreadPoolExecutor
+from pyesi_client.models import EsiCharacterInfo
+
+if TYPE_CHECKING:
+    from pyesi_client.core.client import EsiClient
+
+logger = logging.getLogger(__name__)
+
+
+class EsiEntityResolver:
+    """
+    Resolve public info for many characters, corporations and alliances with few requests.
+
+    Affiliations and names are looked up 1000 ids per request, and corporation and alliance
+    details are fetched in parallel once per distinct id. Every response is cached until its
+    Expires header. ESI rejects a whole batch when it contains an invalid id, so failing
+    batches are split until the invalid ids are isolated and left out of the results. Caches
+    are partitioned by the client's compatibility date, so a date bump never mixes formats.
+    """
+
+    def __init__(
+        self,
+        client: "EsiClient",
+        *,
+        cache_size: int = DEFAULT_TTL_CACHE_SIZE,
+        default_ttl: float = DEFAULT_ENTITY_TTL,
+        max_concurrency: int = DEFAULT_ENTITY_CONCURRENCY,
+    ) -> None:
+        self.client: EsiClient = client
+        self.default_ttl: float = default_ttl
+        self.max_concurrency: int = max_concurrency
+        self._affiliations: EsiTtlCache[Any, Any] = EsiTtlCache(cache_size)
+        self._names: EsiTtlCache[Any, Any] = EsiTtlCache(cache_size)
+        self._corporations: EsiTtlCache[Any, Any] = EsiTtlCache(cache_size)
+        self._alliances: EsiTtlCache[Any, Any] = EsiTtlCache(cache_size)
+
+    def affiliations(self, character_ids: Iterable[int]) -> dict[int, Any]:
+        """Get the corporation, alliance and faction of characters by character id."""
+        func = http_info_method(self.client.character, "post_characters_affiliation")
+        return self._bulk(self._partition(self._affiliations), func, character_ids, key=lambda item: item.character_id)
+
+    def names(self, ids: Iterable[int]) -> dict[int, Any]:
+        """Get the name and category of any entities by id."""
+        func = http_info_method(self.client.universe, "post_universe_names")
+        return self._bulk(self._partition(self._names), func, ids, key=lambda item: item.id)
+
+    def corporations(self, corporation_ids: Iterable[int]) -> dict[int, Any]:
+        """Get public corporation details by corporation id."""
+        func = http_info_method(self.client.corporation, "get_corporations_corporation_id")
+        return self._details(self._partition(self._corporations), func, "corporation_id", corporation_ids)
+
+    def alliances(self, alliance_ids: Iterable[int]) -> dict[int, Any]:
+        """Get public alliance details by alliance id."""
+        func = http_info_method(self.client.alliance, "get_alliances_alliance_id")
+        return self._details(self._partition(self._alliances), func, "alliance_id", alliance_ids)
+
+    def resolve(self, character_ids: Iterable[int]) -> dict[int, EsiCharacterInfo]:
+        """Get characters with their corporation and alliance names and tickers, omitting invalid ids."""
+        character_ids = list(dict.fromkeys(character_ids))
+        with ContextThreadPoolExecutor(2, thread_name_prefix="pyesi-entity") as pool:
+            # Character names do not depend on affiliations, so both lookups run together
+            names_future = pool.submit(self.names, character_ids)
+            affiliations = self.affiliations(character_ids)
+            corporations_future = pool.submit(
+                self.corporations, {item.corporation_id for item in affiliations.values()}
+            )
+            alliances = self.alliances({item.alliance_id for item in affiliations.values() if item.alliance_id})
+            corporations = corporations_future.result()
+            names = names_future.result()
+
+        resolved: dict[int, EsiCharacterInfo] = {}
+        for character_id, affiliation in affiliations.items():
+            corporation = corporations.get(affiliation.corporation_id)
+            alliance = alliances.get(affiliation.alliance_id) if affiliation.alliance_id else None
+            name = names.get(character_id)
+            resolved[character_id] = EsiCharacterInfo(
+                character_id=character_id,
+                character_name=name.name if name else None,
+                corporation_id=affiliation.corporation_id,
+                corporation_name=corporation.name if corporation else None,
+                corporation_ticker=corporation.ticker if corporation else None,
+                alliance_id=affiliation.alliance_id,
+                alliance_name=alliance.name if alliance else None,
+                alliance_ticker=alliance.ticker if alliance else None,
+                faction_id=affiliation.faction_id,
+            )
+        return resolved
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        for cache in (self._affiliations, self._names, self._corporations, self._alliances):
+            cache.clear()
+
+    def _partition(self, cache: EsiTtlCache[Any, Any]) -> EsiTtlCachePartition[int, Any]:
+        return cache.partition(compatibility_partition(self.client.compatibility_date))
+
+    def _bulk(
+        self,
+        cache: EsiTtlCachePartition[int, Any],
+        func: Callable[..., Any],
+        ids: Iterable[int],
+        *,
+        key: Callable[[Any], int],
+    ) -> dict[int, Any]:
+        ids = list(dict.fromkeys(ids))
+        found = cache.get_many(ids)
+        missing = [entity_id for entity_id in ids if entity_id not in found]
+        batches = [missing[start : start + MAX_BULK_IDS] for start in range(0, len(missing), MAX_BULK_IDS)]
+        if len(batches) > 1:
+            with ContextThreadPoolExecutor(
+                min(self.max_concurrency, len(batches)), thread_name_prefix="pyesi-entity"
+            ) as pool:
+                results = list(pool.map(lambda batch: self._fetch_batch(cache, func, batch, key), batches))
+        else:
+            results = [self._fetch_batch(cache, func, batch, key) for batch in batches]
+        for result in results:
+            found.update(result)
+        return found
+
+    def _fetch_batch(
+        self,
+        cache: EsiTtlCachePartition[int, Any],
+        func: Callable[..., Any],
+        batch: list[int],
+        key: Callable[[Any], int],
+    ) -> dict[int, Any]:
+        try:
+            response = func(request_body=batch)
+        except ApiException as e:
+            if e.status not in (400, 404):
+                raise
+            if len(batch) == 1:
+                logger.debug(f"Skipping invalid id {batch[0]}: {e.status}")
+                return {}
+            middle = len(batch) // 2
+            return self._fetch_batch(cache, func, batch[:middle], key) | self._fetch_batch(
+                cache, func, batch[middle:], key
+            )
+        fetched = {key(item): item for item in response.data or []}
+        cache.set_many(fetched, expires_at_from_headers(response.headers, self.default_ttl))
+        return fetched
+
+    def _details(
+        self,
+        cache: EsiTtlCachePartition[int, Any],
+        func: Callable[..., Any],
+        parameter: str,
+        ids: Iterable[int],
+    ) -> dict[int, Any]:
+        ids = list(dict.fromkeys(ids))
+        found = cache.get_many(ids)
+        missing = [entity_id for entity_id in ids if entity_id not in found]
+        if not missing:
+            return found
+
+        def fetch(entity_id: int) -> tuple[int, Any]:
+            try:
+                response = func(**{parameter: entity_id})
+            except ApiException as e:
+                if e.status != 404:
+                    raise
+                logger.debug(f"Skipping unknown {parameter} {entity_id}")
+                return entity_id, None
+            cache.set(entity_id, response.data, expires_at_from_headers(response.headers, self.default_ttl))
+            return entity_id, response.data
+
+        with ContextThreadPoolExecutor(
+            min(self.max_concurrency, len(missing)), thread_name_prefix="pyesi-entity"
+        ) as pool:
+            for entity_id, data in pool.map(fetch, missing):
+                if data is not None:
+                    found[entity_id] = data
+        return found
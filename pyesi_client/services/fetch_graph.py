@@ -0,0 +1,265 @@
+"""
+pyesi-client:
+
+Fetch Graph
+"""
+
+import functools
+import logging
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import TYPE_CHECKING, Any
+
+from pyesi_openapi import ApiException
+
+from pyesi_client.constants import DEFAULT_ENTITY_TTL, DEFAULT_GRAPH_CONCURRENCY, DEFAULT_TTL_CACHE_SIZE, MAX_BULK_IDS
+from pyesi_client.core.cache import EsiTtlCache, EsiTtlCachePartition, expires_at_from_headers
+from pyesi_client.core.compatibility import compatibility_partition
+from pyesi_client.core.operations import get_operation_index, http_info_method, operation_name
+from pyesi_client.core.scheduler import ContextThreadPoolExecutor
+from pyesi_client.models import EsiFetchResult
+
+if TYPE_CHECKING:
+    from pyesi_client.core.client import EsiClient
+
+logger = logging.getLogger(__name__)
+
+_Fetched = tuple[dict[Any, Any], dict[Any, Exception]]
+
+
+def _keyword(parameter: str, key: Any) -> Mapping[str, Any]:
+    return {parameter: key}
+
+
+class _Node:
+    __slots__ = ("batch_size", "cache", "edges", "func", "key", "name", "params")
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        cache: EsiTtlCache[Any, Any],
+        *,
+        params: Callable[[Any], Mapping[str, Any]] | None = None,
+        key: Callable[[Any], Any] | None = None,
+        batch_size: int = 1,
+    ) -> None:
+        self.name: str = name
+        self.func: Callable[..., Any] = func
+        self.cache: EsiTtlCache[Any, Any] = cache
+        self.params: Callable[[Any], Mapping[str, Any]] | None = params
+        self.key: Callable[[Any], Any] | None = key
+        self.batch_size: int = batch_size
+        self.edges: list[tuple[str, Callable[[Any], Iterable[Any]]]] = []
+
+    @property
+    def bulk(self) -> bool:
+        return self.key is not None
+
+
+class EsiFetchGraph:
+    """
+    Declarative graph of ESI operations, where edges pass ids extracted from one node's
+    results to another node, such as killmails -> affiliations -> names.
+
+    Nodes fetch either one request per key (each) or up to batch_size keys per request (bulk).
+    Keys are deduplicated per run and against each node's cache, which keeps responses until
+    their Expires header and is partitioned by the client's compatibility date, so repeated
+    runs over a stream only fetch new ids. Levels are
+    pipelined: a result is passed downstream as soon as it arrives, and a bulk node sends a
+    batch once it is full or once every node upstream of it has finished, so ids from all
+    inputs share requests without waiting for whole stages.
+
+    Usage:
+        graph = EsiFetchGraph(client)
+        graph.each("killmails", client.killmails.get_killmails_killmail_id_killmail_hash,
+                   lambda ref: {"killmail_id": ref[0], "killmail_hash": ref[1]})
+        graph.bulk("affiliations", client.character.post_characters_affiliation, key=lambda a: a.character_id)
+        graph.edge("killmails", "affiliations", lambda km: [km.victim.character_id])
+        result = graph.run({"killmails": refs})
+    """
+
+    def __init__(
+        self,
+        client: "EsiClient",
+        *,
+        max_concurrency: int = DEFAULT_GRAPH_CONCURRENCY,
+        default_ttl: float = DEFAULT_ENTITY_TTL,
+        cache_size: int = DEFAULT_TTL_CACHE_SIZE,
+    ) -> None:
+        self.client: EsiClient = client
+        self.max_concurrency: int = max_concurrency
+        self.default_ttl: float = default_ttl
+        self.cache_size: int = cache_size
+        self._nodes: dict[str, _Node] = {}
+
+    @property
+    def nodes(self) -> tuple[str, ...]:
+        return tuple(self._nodes)
+
+    def each(
+        self,
+        name: str,
+        func: Callable[..., Any] | str,
+        params: str | Callable[[Any], Mapping[str, Any]],
+        *,
+        cache: EsiTtlCache[Any, Any] | None = None,
+    ) -> "EsiFetchGraph":
+        """
+        Add a node fetching one request per key.
+
+        params is the parameter name receiving the key, or a function mapping a key to the
+        call's keyword arguments. func is a generated API method or an operation id.
+        """
+        if isinstance(params, str):
+            params = functools.partial(_keyword, params)
+        return self._add(_Node(name, self._resolve(func), cache or EsiTtlCache(self.cache_size), params=params))
+
+    def bulk(
+        self,
+        name: str,
+        func: Callable[..., Any] | str,
+        key: Callable[[Any], Any],
+        *,
+        batch_size: int = MAX_BULK_IDS,
+        cache: EsiTtlCache[Any, Any] | None = None,
+    ) -> "EsiFetchGraph":
+        """Add a node posting up to batch_size keys per request, key mapping each returned item to its key."""
+        node = _Node(name, self._resolve(func), cache or EsiTtlCache(self.cache_size), key=key, batch_size=batch_size)
+        return self._add(node)
+
+    def edge(self, source: str, target: str, extract: Callable[[Any], Iterable[Any]]) -> "EsiFetchGraph":
+        """Pass the keys extracted from every result of source to target; None keys are skipped."""
+        self._node(source)
+        self._node(target)
+        if source == target or source in self._descendants(target):
+            raise ValueError(f"Edge {source} -> {target} would create a cycle")
+        self._nodes[source].edges.append((target, extract))
+        return self
+
+    def run(self, roots: Mapping[str, Iterable[Any]]) -> EsiFetchResult:
+        """Fetch the keys of roots and everything downstream of them."""
+        for name in roots:
+            self._node(name)
+        ancestors = {name: self._ancestors(name) for name in self._nodes}
+        partition = compatibility_partition(self.client.compatibility_date)
+        caches = {name: node.cache.partition(partition) for name, node in self._nodes.items()}
+        result = EsiFetchResult(data={name: {} for name in self._nodes}, errors={name: {} for name in self._nodes})
+        seen: dict[str, set[Any]] = {name: set() for name in self._nodes}
+        pending: dict[str, list[Any]] = {name: [] for name in self._nodes}
+        in_flight: dict[str, int] = dict.fromkeys(self._nodes, 0)
+        futures: dict[Future, str] = {}
+
+        def enqueue(name: str, keys: Iterable[Any]) -> None:
+            work = [(name, keys)]
+            while work:
+                name, keys = work.pop()
+                node = self._nodes[name]
+                fresh = [key for key in dict.fromkeys(keys) if key is not None and key not in seen[name]]
+                seen[name].update(fresh)
+                cached = caches[name].get_many(fresh)
+                pending[name].extend(key for key in fresh if key not in cached)
+                result.data[name].update(cached)
+                # Cached values flow downstream right away
+                work.extend(self._downstream(node, cached.values()))
+
+        def dispatch(pool: ContextThreadPoolExecutor) -> None:
+            for name, node in self._nodes.items():
+                queue, size = pending[name], node.batch_size
+                if not queue:
+                    continue
+                idle = all(not pending[ancestor] and not in_flight[ancestor] for ancestor in ancestors[name])
+                # Partial batches wait for more keys while anything upstream may still send some
+                count = len(queue) if idle else len(queue) - len(queue) % size
+                pending[name] = queue[count:]
+                for start in range(0, count, size):
+                    in_flight[name] += 1
+                    futures[pool.submit(self._fetch, node, caches[name], queue[start : start + size])] = name
+
+        for name, keys in roots.items():
+            enqueue(name, keys)
+        with ContextThreadPoolExecutor(self.max_concurrency, thread_name_prefix="pyesi-graph") as pool:
+            dispatch(pool)
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures.pop(future)
+                    in_flight[name] -= 1
+                    fetched, errors = future.result()
+                    result.data[name].update(fetched)
+                    result.errors[name].update(errors)
+                    for target, keys in self._downstream(self._nodes[name], fetched.values()):
+                        enqueue(target, keys)
+                dispatch(pool)
+        return result
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        for node in self._nodes.values():
+            node.cache.clear()
+
+    def _resolve(self, func: Callable[..., Any] | str) -> Callable[..., Any]:
+        if isinstance(func, str):
+            operation = get_operation_index().get(func)
+            return http_info_method(getattr(self.client, operation.api), operation.name)
+        api = getattr(func, "__self__", None)
+        if api is None:
+            raise ValueError("Fetch graph nodes require a bound generated API method or an operation id")
+        return http_info_method(api, operation_name(func))
+
+    def _add(self, node: _Node) -> "EsiFetchGraph":
+        if node.name in self._nodes:
+            raise ValueError(f"Duplicate fetch graph node: {node.name}")
+        self._nodes[node.name] = node
+        return self
+
+    def _node(self, name: str) -> _Node:
+        try:
+            return self._nodes[name]
+        except KeyError:
+            raise ValueError(f"Unknown fetch graph node: {name}") from None
+
+    def _descendants(self, name: str) -> set[str]:
+        found: set[str] = set()
+        work = [name]
+        while work:
+            for target, _ in self._nodes[work.pop()].edges:
+                if target not in found:
+                    found.add(target)
+                    work.append(target)
+        return found
+
+    def _ancestors(self, name: str) -> set[str]:
+        return {other for other in self._nodes if name in self._descendants(other)}
+
+    def _downstream(self, node: _Node, values: Iterable[Any]) -> list[tuple[str, list[Any]]]:
+        values = list(values)
+        return [(target, [key for value in values for key in extract(value)]) for target, extract in node.edges]
+
+    def _fetch(self, node: _Node, cache: EsiTtlCachePartition[Any, Any], batch: list[Any]) -> _Fetched:
+        if node.bulk:
+            return self._fetch_bulk(node, cache, batch)
+        (key,) = batch
+        try:
+            response = node.func(**node.params(key))  # type: ignore[misc]
+        except ApiException as e:
+            logger.debug(f"Fetch graph {node.name} {key} failed: {e.status}")
+            return {}, {key: e}
+        cache.set(key, response.data, expires_at_from_headers(response.headers, self.default_ttl))
+        return {key: response.data}, {}
+
+    def _fetch_bulk(self, node: _Node, cache: EsiTtlCachePartition[Any, Any], batch: list[Any]) -> _Fetched:
+        try:
+            response = node.func(request_body=batch)
+        except ApiException as e:
+            # ESI rejects a whole batch for one invalid id, split until it is isolated
+            if e.status not in (400, 404) or len(batch) == 1:
+                logger.debug(f"Fetch graph {node.name} batch of {len(batch)} failed: {e.status}")
+                return {}, dict.fromkeys(batch, e)
+            middle = len(batch) // 2
+            first, first_errors = self._fetch_bulk(node, cache, batch[:middle])
+            second, second_errors = self._fetch_bulk(node, cache, batch[middle:])
+            return first | second, first_errors | second_errors
+        fetched = {node.key(item): item for item in response.data or []}  # type: ignore[misc]
+        cache.set_many(fetched, expires_at_from_headers(response.headers, self.default_ttl))
+        return fetched, {}
@@ -0,0 +1,172 @@
+"""
+pyesi-client:
+
+Industry Price Feeds
+"""
+
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from pyesi_client.constants import DEFAULT_PRICE_TTL, SCC_SURCHARGE, EsiIndustryActivity
+from pyesi_client.core.cache import expires_at_from_headers
+from pyesi_client.core.numeric import require_numpy
+from pyesi_client.core.operations import http_info_method
+
+if TYPE_CHECKING:
+    from pyesi_client.core.client import EsiClient
+
+_ACTIVITIES: tuple[EsiIndustryActivity, ...] = tuple(EsiIndustryActivity)
+
+logger = logging.getLogger(__name__)
+
+
+class EsiIndustryFeed:
+    """
+    Market prices and system cost indices as NumPy arrays, refreshed when ESI expires them.
+
+    Prices are columns sorted by type_id and cost indices a (system, activity) matrix sorted
+    by solar_system_id, both looked up with searchsorted so whole id arrays resolve at once.
+    Unknown ids give NaN. Each feed is refetched on first use after its Expires header.
+    """
+
+    def __init__(self, client: "EsiClient", *, default_ttl: float = DEFAULT_PRICE_TTL) -> None:
+        self._np = require_numpy("EsiIndustryFeed")
+        self.client: EsiClient = client
+        self.default_ttl: float = default_ttl
+        self._lock = threading.Lock()
+        self._prices: tuple[Any, Any, Any] | None = None
+        self._prices_expire_at: float = 0.0
+        self._indices: tuple[Any, Any] | None = None
+        self._indices_expire_at: float = 0.0
+
+    @property
+    def price_type_ids(self) -> Any:
+        return self._ensure_prices()[0]
+
+    @property
+    def adjusted_prices(self) -> Any:
+        return self._ensure_prices()[1]
+
+    @property
+    def average_prices(self) -> Any:
+        return self._ensure_prices()[2]
+
+    @property
+    def system_ids(self) -> Any:
+        return self._ensure_indices()[0]
+
+    @property
+    def cost_indices(self) -> Any:
+        """Cost index matrix with one row per system and one column per EsiIndustryActivity."""
+        return self._ensure_indices()[1]
+
+    def refresh(self, *, force: bool = False) -> None:
+        """Fetch expired feeds now, or both feeds when forced."""
+        with self._lock:
+            if force or time.time() >= self._prices_expire_at:
+                self._fetch_prices()
+            if force or time.time() >= self._indices_expire_at:
+                self._fetch_indices()
+
+    def adjusted_price(self, type_ids: Any) -> Any:
+        """Get adjusted prices of an array of type ids."""
+        type_index, adjusted, _ = self._ensure_prices()
+        return self._lookup(type_index, adjusted, type_ids)
+
+    def average_price(self, type_ids: Any) -> Any:
+        """Get average market prices of an array of type ids."""
+        type_index, _, average = self._ensure_prices()
+        return self._lookup(type_index, average, type_ids)
+
+    def cost_index(self, system_ids: Any, activity: EsiIndustryActivity = EsiIndustryActivity.MANUFACTURING) -> Any:
+        """Get the cost index of an activity for an array of system ids."""
+        system_index, indices = self._ensure_indices()
+        return self._lookup(system_index, indices[:, _ACTIVITIES.index(activity)], system_ids)
+
+    def estimated_item_values(self, material_type_ids: Any, quantities: Any) -> Any:
+        """
+        Get estimated item values of blueprints from their materials.
+
+        Both arguments have one row per blueprint and one column per material; pad short rows
+        with type id 0 and quantity 0. Materials without an adjusted price count as zero.
+        """
+        np = self._np
+        prices = np.nan_to_num(self.adjusted_price(material_type_ids), nan=0.0)
+        return (prices * np.asarray(quantities, dtype=np.float64)).sum(axis=-1)
+
+    def job_costs(
+        self,
+        estimated_item_values: Any,
+        system_ids: Any,
+        activity: EsiIndustryActivity = EsiIndustryActivity.MANUFACTURING,
+        *,
+        runs: Any = 1,
+        facility_tax: float = 0.0,
+        structure_bonus: float = 0.0,
+        scc_surcharge: float = SCC_SURCHARGE,
+    ) -> Any:
+        """
+        Get job installation costs for every blueprint in every system.
+
+        Returns a (blueprints, systems) matrix of value * (cost index * (1 - structure bonus) +
+        facility tax + SCC surcharge), where value is the estimated item value times runs
+        (a number or one per blueprint). Systems without a cost index give NaN.
+        """
+        np = self._np
+        values = np.asarray(estimated_item_values, dtype=np.float64) * np.asarray(runs, dtype=np.float64)
+        rates = self.cost_index(system_ids, activity) * (1.0 - structure_bonus) + facility_tax + scc_surcharge
+        return np.multiply.outer(values, rates)
+
+    def _ensure_prices(self) -> tuple[Any, Any, Any]:
+        if self._prices is None or time.time() >= self._prices_expire_at:
+            with self._lock:
+                if self._prices is None or time.time() >= self._prices_expire_at:
+                    self._fetch_prices()
+        assert self._prices is not None
+        return self._prices
+
+    def _ensure_indices(self) -> tuple[Any, Any]:
+        if self._indices is None or time.time() >= self._indices_expire_at:
+            with self._lock:
+                if self._indices is None or time.time() >= self._indices_expire_at:
+                    self._fetch_indices()
+        assert self._indices is not None
+        return self._indices
+
+    def _fetch_prices(self) -> None:
+        np = self._np
+        response = http_info_method(self.client.market, "get_markets_prices")()
+        rows = sorted((price.type_id, price.adjusted_price, price.average_price) for price in response.data or [])
+        type_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        adjusted = np.array([np.nan if row[1] is None else row[1] for row in rows], dtype=np.float64)
+        average = np.array([np.nan if row[2] is None else row[2] for row in rows], dtype=np.float64)
+        # Swap all columns at once, so readers never mix old and new prices
+        self._prices = (type_ids, adjusted, average)
+        self._prices_expire_at = expires_at_from_headers(response.headers, self.default_ttl)
+        logger.debug(f"Loaded {len(rows)} market prices")
+
+    def _fetch_indices(self) -> None:
+        np = self._np
+        response = http_info_method(self.client.industry, "get_industry_systems")()
+        systems = sorted(response.data or [], key=lambda system: system.solar_system_id)
+        system_ids = np.fromiter((system.solar_system_id for system in systems), dtype=np.int64, count=len(systems))
+        indices = np.full((len(systems), len(_ACTIVITIES)), np.nan)
+        columns = {activity.value: column for column, activity in enumerate(_ACTIVITIES)}
+        for row, system in enumerate(systems):
+            for cost_index in system.cost_indices or []:
+                column = columns.get(cost_index.activity)
+                if column is not None:
+                    indices[row, column] = cost_index.cost_index
+        self._indices = (system_ids, indices)
+        self._indices_expire_at = expires_at_from_headers(response.headers, self.default_ttl)
+        logger.debug(f"Loaded cost indices of {len(systems)} systems")
+
+    def _lookup(self, keys: Any, values: Any, query: Any) -> Any:
+        np = self._np
+        query = np.asarray(query, dtype=np.int64)
+        if not len(keys):
+            return np.full(query.shape, np.nan)
+        rows = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+        return np.where(keys[rows] == query, values[rows], np.nan)
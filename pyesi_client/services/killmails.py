@@ -0,0 +1,215 @@
+"""
+pyesi-client:
+
+Killmail Pipeline
+"""
+
+import itertools
+import logging
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import TYPE_CHECKING, Any
+
+from pyesi_client.constants import DEFAULT_INGESTED_KILLMAILS, DEFAULT_KILLMAIL_CONCURRENCY, EsiResultFormat
+from pyesi_client.core.cache import EsiBlobStore
+from pyesi_client.core.compatibility import partition_namespace
+from pyesi_client.core.operations import http_info_method, raw_method, response_type
+from pyesi_client.core.pagination import fetch_raw
+from pyesi_client.core.scheduler import ContextThreadPoolExecutor
+
+if TYPE_CHECKING:
+    from pyesi_client.core.client import EsiClient
+
+KILLMAIL_NAMESPACE = "killmails"
+_KILLMAIL_OPERATION = "get_killmails_killmail_id_killmail_hash"
+
+logger = logging.getLogger(__name__)
+
+
+class EsiKillmailPipeline:
+    """
+    Ingest killmails for many characters and corporations, fetching each from ESI at most once.
+
+    Killmails are immutable and addressed by id and hash, so raw bodies are kept in the blob
+    store for good and never revalidated, per compatibility date of the client. Bodies are only
+    stored once they parse. Recent killmail lists are read through the client's router, so
+    characters and corporations must be covered by its token pool. ingest remembers the last
+    ingested_size killmail ids it yielded, refreshed while they stay listed.
+    """
+
+    def __init__(
+        self,
+        client: "EsiClient",
+        *,
+        store: EsiBlobStore | None = None,
+        max_concurrency: int = DEFAULT_KILLMAIL_CONCURRENCY,
+        ingested_size: int = DEFAULT_INGESTED_KILLMAILS,
+    ) -> None:
+        self.client: EsiClient = client
+        self.store: EsiBlobStore = store or EsiBlobStore()
+        self.max_concurrency: int = max_concurrency
+        self.ingested_size: int = ingested_size
+        # Yielded killmail ids, least recently listed first
+        self._ingested: OrderedDict[int, None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def _namespace(self) -> str:
+        return partition_namespace(KILLMAIL_NAMESPACE, self.client.compatibility_date)
+
+    def recent_refs(self, *, character_ids: Iterable[int] = (), corporation_ids: Iterable[int] = ()) -> dict[int, str]:
+        """Collect killmail ids and hashes from recent killmail lists, deduplicated across all of them."""
+        api = self.client.killmails
+        refs: dict[int, str] = {}
+        for character_id in character_ids:
+            func = http_info_method(api, "get_characters_character_id_killmails_recent")
+            self._collect_refs(refs, func, character_id=character_id)
+        for corporation_id in corporation_ids:
+            func = http_info_method(api, "get_corporations_corporation_id_killmails_recent")
+            self._collect_refs(refs, func, corporation_id=corporation_id)
+        return refs
+
+    def fetch(
+        self,
+        refs: Mapping[int, str] | Iterable[tuple[int, str]],
+        *,
+        result_format: EsiResultFormat = EsiResultFormat.MODEL,
+        errors: dict[int, Exception] | None = None,
+    ) -> Iterator[Any]:
+        """
+        Stream killmails for (killmail_id, killmail_hash) pairs in completion order.
+
+        Stored killmails are yielded first, the rest are downloaded in parallel and stored.
+        Killmails that fail to download or parse are logged and skipped, and their errors are
+        added to errors when given, so one bad ref does not stop the others.
+        """
+        for _, killmail in self._fetch(refs, result_format, errors if errors is not None else {}):
+            yield killmail
+
+    def ingest(
+        self,
+        *,
+        character_ids: Iterable[int] = (),
+        corporation_ids: Iterable[int] = (),
+        result_format: EsiResultFormat = EsiResultFormat.MODEL,
+    ) -> Iterator[Any]:
+        """
+        Stream killmails from recent killmail lists that this pipeline has not yielded before.
+
+        Killmails that failed, or were not reached because the stream failed or was closed
+        early, are offered again by the next ingest, so delivery is at least once.
+        """
+        refs = self.recent_refs(character_ids=character_ids, corporation_ids=corporation_ids)
+        with self._lock:
+            new = {killmail_id: refs[killmail_id] for killmail_id in refs.keys() - self._ingested.keys()}
+            for killmail_id in refs:
+                self._ingested[killmail_id] = None
+                self._ingested.move_to_end(killmail_id)
+            while len(self._ingested) > self.ingested_size:
+                self._ingested.popitem(last=False)
+        delivered: set[int] = set()
+        try:
+            for killmail_id, killmail in self._fetch(new, result_format, {}):
+                delivered.add(killmail_id)
+                yield killmail
+        finally:
+            with self._lock:
+                for killmail_id in new.keys() - delivered:
+                    self._ingested.pop(killmail_id, None)
+
+    def _fetch(
+        self,
+        refs: Mapping[int, str] | Iterable[tuple[int, str]],
+        result_format: EsiResultFormat,
+        errors: dict[int, Exception],
+    ) -> Iterator[tuple[int, Any]]:
+        refs = dict(refs)
+        executor = self.client.executor
+        parse_type = response_type(self.client.killmails, _KILLMAIL_OPERATION)
+        keys = {killmail_id: f"{killmail_id}:{killmail_hash}" for killmail_id, killmail_hash in refs.items()}
+        cached = self.store.get_many(self._namespace, keys.values())
+
+        futures = {
+            killmail_id: executor.submit(parse_type, cached[key], result_format)
+            for killmail_id, key in keys.items()
+            if key in cached
+        }
+        for killmail_id, future in futures.items():
+            try:
+                yield killmail_id, future.result()
+            except Exception as e:
+                # Never serve an unparseable body again, the next fetch downloads it anew
+                self.store.delete(self._namespace, keys[killmail_id])
+                self._failed(errors, killmail_id, e)
+
+        missing = [(killmail_id, refs[killmail_id]) for killmail_id, key in keys.items() if key not in cached]
+        if missing:
+            logger.debug(f"Fetching {len(missing)} of {len(refs)} killmails from ESI")
+
+        def finish(killmail_id: int, body: bytes, future: Future[Any]) -> tuple[int, Any] | None:
+            try:
+                killmail = future.result()
+            except Exception as e:
+                self._failed(errors, killmail_id, e)
+                return None
+            self.store.put(self._namespace, keys[killmail_id], body)
+            return killmail_id, killmail
+
+        # Bodies are parsed by the executor while later ones download, and stored once they parse
+        parsing: deque[tuple[int, bytes, Future[Any]]] = deque()
+        for killmail_id, body in self._download(missing):
+            if isinstance(body, Exception):
+                self._failed(errors, killmail_id, body)
+            else:
+                parsing.append((killmail_id, body, executor.submit(parse_type, body, result_format)))
+            while parsing and parsing[0][2].done():
+                if parsed := finish(*parsing.popleft()):
+                    yield parsed
+        while parsing:
+            if parsed := finish(*parsing.popleft()):
+                yield parsed
+
+    @staticmethod
+    def _failed(errors: dict[int, Exception], killmail_id: int, error: Exception) -> None:
+        logger.warning(f"Skipping killmail {killmail_id}: {error}")
+        errors[killmail_id] = error
+
+    def _collect_refs(self, refs: dict[int, str], func: Callable[..., Any], **kwargs: Any) -> None:
+        pages = 1
+        page = 1
+        while page <= pages:
+            response = self.client.router.call(func, page=page, **kwargs)
+            for item in response.data or []:
+                refs.setdefault(item.killmail_id, item.killmail_hash)
+            pages = int((response.headers or {}).get("X-Pages") or 1)
+            page += 1
+
+    def _download(self, refs: list[tuple[int, str]]) -> Iterator[tuple[int, bytes | Exception]]:
+        """Download killmails, yielding each body or the error that replaced it."""
+        fetch = raw_method(self.client.killmails, _KILLMAIL_OPERATION)
+        pending_refs = iter(refs)
+        with ContextThreadPoolExecutor(self.max_concurrency, thread_name_prefix="pyesi-killmail") as pool:
+
+            def submit(ref: tuple[int, str]) -> Future[tuple[int, bytes | Exception]]:
+                return pool.submit(self._download_one, fetch, *ref)
+
+            # Keep a bounded window in flight so huge ref lists do not queue every request up front
+            pending = {submit(ref) for ref in itertools.islice(pending_refs, self.max_concurrency * 2)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                    ref = next(pending_refs, None)
+                    if ref is not None:
+                        pending.add(submit(ref))
+
+    def _download_one(
+        self, fetch: Callable[..., Any], killmail_id: int, killmail_hash: str
+    ) -> tuple[int, bytes | Exception]:
+        try:
+            body, _ = fetch_raw(fetch, killmail_id=killmail_id, killmail_hash=killmail_hash)
+        except Exception as e:
+            return killmail_id, e
+        return killmail_id, body
@@ -0,0 +1,201 @@
+"""
+pyesi-client:
+
+Sovereignty and Faction Warfare Map State
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
+
+from pyesi_openapi import ApiException
+
+from pyesi_client.constants import DEFAULT_CONTESTED_THRESHOLDS, DEFAULT_MAP_TTL, EsiMapEventType
+from pyesi_client.core.cache import expires_at_from_headers
+from pyesi_client.core.operations import http_info_method
+from pyesi_client.core.scheduler import ContextThreadPoolExecutor
+from pyesi_client.models import EsiMapEvent, EsiSystemState
+
+if TYPE_CHECKING:
+    from pyesi_client.core.client import EsiClient
+
+# feed name -> (API attribute, operation)
+_FEEDS: dict[str, tuple[str, str]] = {
+    "sovereignty_map": ("sovereignty", "get_sovereignty_map"),
+    "sovereignty_structures": ("sovereignty", "get_sovereignty_structures"),
+    "sovereignty_campaigns": ("sovereignty", "get_sovereignty_campaigns"),
+    "fw_systems": ("faction_warfare", "get_fw_systems"),
+    "fw_stats": ("faction_warfare", "get_fw_stats"),
+}
+
+logger = logging.getLogger(__name__)
+
+
+class _Feed:
+    __slots__ = ("data", "etag", "expires_at", "loaded")
+
+    def __init__(self) -> None:
+        self.data: list[Any] = []
+        self.loaded: bool = False
+        self.etag: str | None = None
+        self.expires_at: float = 0.0
+
+
+class EsiMapState:
+    """
+    Shared snapshot of sovereignty and faction warfare state, indexed by system id.
+
+    Each feed is polled only after its Expires header, revalidating with its ETag, and the
+    snapshot is rebuilt only when a feed changed. Every rebuild is compared with the previous
+    snapshot to emit change events, which are returned by poll and passed to subscribers, so
+    many consumers share one set of requests and one diff. A failing feed does not hold back
+    the others: poll rebuilds from the feeds that changed and notifies subscribers, then
+    raises the error, and the failed feed is retried on the next poll. Until every feed has
+    loaded once, snapshots are only a baseline and emit no events, so a feed that failed at
+    first does not report every system it covers as changed when it loads.
+    """
+
+    def __init__(
+        self,
+        client: "EsiClient",
+        *,
+        contested_thresholds: Iterable[float] = DEFAULT_CONTESTED_THRESHOLDS,
+        default_ttl: float = DEFAULT_MAP_TTL,
+    ) -> None:
+        self.client: EsiClient = client
+        self.contested_thresholds: tuple[float, ...] = tuple(sorted(contested_thresholds))
+        self.default_ttl: float = default_ttl
+        self.systems: dict[int, EsiSystemState] = {}
+        self.faction_stats: dict[int, Any] = {}
+        self._feeds: dict[str, _Feed] = {name: _Feed() for name in _FEEDS}
+        self._subscribers: list[Callable[[EsiMapEvent], None]] = []
+        # Set when a feed got new data, until the snapshot is rebuilt from it
+        self._dirty: bool = False
+        # Set once a snapshot was built from every feed, so later snapshots can be diffed against it
+        self._complete: bool = False
+        self._lock = threading.Lock()
+
+    @property
+    def next_poll_at(self) -> float:
+        """Time at which the first feed expires."""
+        return min(feed.expires_at for feed in self._feeds.values())
+
+    def system(self, system_id: int) -> EsiSystemState | None:
+        return self.systems.get(system_id)
+
+    def subscribe(self, callback: Callable[[EsiMapEvent], None]) -> None:
+        """Call callback with every event emitted by later polls."""
+        self._subscribers.append(callback)
+
+    def poll(self, *, force: bool = False) -> list[EsiMapEvent]:
+        """Fetch expired feeds and return the changes since the previous snapshot, none until every feed loaded."""
+        with self._lock:
+            now = time.time()
+            expired = [name for name, feed in self._feeds.items() if force or feed.expires_at <= now]
+            if not expired and not self._dirty:
+                return []
+            with ContextThreadPoolExecutor(max(len(expired), 1), thread_name_prefix="pyesi-map") as pool:
+                futures = [pool.submit(self._fetch, name) for name in expired]
+            errors = [error for future in futures if (error := future.exception())]
+            events: list[EsiMapEvent] = []
+            if self._dirty:
+                previous = self.systems
+                self.systems = self._build()
+                self.faction_stats = {stats.faction_id: stats for stats in self._feeds["fw_stats"].data}
+                self._dirty = False
+                events = self._diff(previous, self.systems) if self._complete else []
+                self._complete = all(feed.loaded for feed in self._feeds.values())
+
+        for event in events:
+            for callback in self._subscribers:
+                try:
+                    callback(event)
+                except Exception:
+                    logger.exception(f"Map event subscriber failed on {event.type.value}")
+        if errors:
+            raise errors[0]
+        return events
+
+    def run(self, stop: threading.Event) -> None:
+        """Poll whenever a feed expires until stop is set."""
+        while not stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Map state poll failed: {e}")
+            stop.wait(max(self.next_poll_at - time.time(), 1.0))
+
+    def _fetch(self, name: str) -> None:
+        api_name, operation = _FEEDS[name]
+        feed = self._feeds[name]
+        func = http_info_method(getattr(self.client, api_name), operation)
+        try:
+            response = func(if_none_match=feed.etag)
+        except ApiException as e:
+            if e.status != 304:
+                raise
+            feed.expires_at = expires_at_from_headers(e.headers, self.default_ttl)
+            return
+        feed.data = response.data or []
+        feed.loaded = True
+        feed.etag = (response.headers or {}).get("ETag")
+        feed.expires_at = expires_at_from_headers(response.headers, self.default_ttl)
+        self._dirty = True
+
+    def _build(self) -> dict[int, EsiSystemState]:
+        states: dict[int, dict[str, Any]] = {}
+        for entry in self._feeds["sovereignty_map"].data:
+            states[entry.system_id] = {
+                "alliance_id": entry.alliance_id,
+                "corporation_id": entry.corporation_id,
+                "faction_id": entry.faction_id,
+            }
+        for structure in self._feeds["sovereignty_structures"].data:
+            if structure.vulnerability_occupancy_level is not None:
+                state = states.setdefault(structure.solar_system_id, {})
+                state["adm"] = max(state.get("adm") or 0.0, structure.vulnerability_occupancy_level)
+        for campaign in self._feeds["sovereignty_campaigns"].data:
+            state = states.setdefault(campaign.solar_system_id, {})
+            state["campaign_ids"] = state.get("campaign_ids", frozenset()) | {campaign.campaign_id}
+        for system in self._feeds["fw_systems"].data:
+            state = states.setdefault(system.solar_system_id, {})
+            state["fw_owner_faction_id"] = system.owner_faction_id
+            state["fw_occupier_faction_id"] = system.occupier_faction_id
+            state["fw_contested"] = getattr(system.contested, "value", system.contested)
+            if system.victory_points_threshold:
+                state["fw_progress"] = system.victory_points / system.victory_points_threshold
+        return {system_id: EsiSystemState(system_id=system_id, **state) for system_id, state in states.items()}
+
+    def _diff(self, previous: dict[int, EsiSystemState], current: dict[int, EsiSystemState]) -> list[EsiMapEvent]:
+        events: list[EsiMapEvent] = []
+        empty = EsiSystemState(system_id=0)
+        for system_id in sorted(previous.keys() | current.keys()):
+            before, after = previous.get(system_id), current.get(system_id)
+            if before == after:
+                continue
+            old, new = before or empty, after or empty
+            changes: list[tuple[EsiMapEventType, float | None]] = []
+            if old.owner_id != new.owner_id or old.corporation_id != new.corporation_id:
+                changes.append((EsiMapEventType.OWNER_CHANGED, None))
+            if old.adm != new.adm:
+                changes.append((EsiMapEventType.ADM_CHANGED, None))
+            changes.extend(
+                (EsiMapEventType.CAMPAIGN_STARTED, id_) for id_ in sorted(new.campaign_ids - old.campaign_ids)
+            )
+            changes.extend((EsiMapEventType.CAMPAIGN_ENDED, id_) for id_ in sorted(old.campaign_ids - new.campaign_ids))
+            if old.fw_occupier_faction_id != new.fw_occupier_faction_id:
+                changes.append((EsiMapEventType.OCCUPIER_CHANGED, None))
+            low, high = sorted((old.fw_progress or 0.0, new.fw_progress or 0.0))
+            # Crossing in either direction, so both escalation and relief are reported
+            changes.extend(
+                (EsiMapEventType.CONTESTED_THRESHOLD, threshold)
+                for threshold in self.contested_thresholds
+                if low < threshold <= high
+            )
+            events.extend(
+                EsiMapEvent(type=event_type, system_id=system_id, previous=before, current=after, value=value)
+                for event_type, value in changes
+            )
+        return events
@@ -0,0 +1,253 @@
+"""
+pyesi-client:
+
+Market History
+"""
+
+import logging
+import threading
+from array import array
+from collections.abc import Iterable, Mapping
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Self
+
+from pyesi_openapi import ApiException
+
+from pyesi_client.constants import DEFAULT_HISTORY_CONCURRENCY, EsiResultFormat
+from pyesi_client.core.numeric import require_numpy
+from pyesi_client.core.operations import raw_method, response_type
+from pyesi_client.core.pagination import fetch_raw
+from pyesi_client.core.scheduler import ContextThreadPoolExecutor
+from pyesi_client.core.storage import read_columns, write_columns
+
+if TYPE_CHECKING:
+    from pyesi_client.core.client import EsiClient
+
+_MAGIC = b"PYESIMH1"
+_EPOCH = date(1970, 1, 1).toordinal()
+_HISTORY_OPERATION = "get_markets_region_id_history"
+
+# field -> array typecode; dates are days since 1970-01-01
+FIELDS: dict[str, str] = {
+    "dates": "i",
+    "average": "d",
+    "highest": "d",
+    "lowest": "d",
+    "volume": "q",
+    "order_count": "q",
+}
+
+logger = logging.getLogger(__name__)
+
+
+class EsiMarketHistory:
+    """
+    Daily market history of one region, as one set of array columns per type.
+
+    Dates are stored as days since 1970-01-01, which NumPy reads directly as datetime64[D].
+    Rows are kept in date order and append only adds days after the last stored one. On disk
+    all types share flat columns, with type_offsets marking where each type's rows start.
+    """
+
+    def __init__(self, region_id: int, series: Mapping[int, dict[str, array]] | None = None) -> None:
+        self.region_id: int = region_id
+        self._series: dict[int, dict[str, array]] = dict(series or {})
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def __contains__(self, type_id: object) -> bool:
+        return type_id in self._series
+
+    @property
+    def type_ids(self) -> list[int]:
+        return sorted(self._series)
+
+    def series(self, type_id: int) -> dict[str, array]:
+        """Get the columns of a type, raising KeyError for types without history."""
+        return self._series[type_id]
+
+    def last_date(self, type_id: int) -> date | None:
+        """Get the most recent day stored for a type."""
+        series = self._series.get(type_id)
+        if not series or not series["dates"]:
+            return None
+        return date.fromordinal(series["dates"][-1] + _EPOCH)
+
+    def append(self, type_id: int, columns: Mapping[str, list[Any]]) -> int:
+        """
+        Add rows newer than the last stored day and return how many were added.
+
+        columns holds ESI field names (date, average, highest, lowest, volume, order_count),
+        as returned by parsing with EsiResultFormat.COLUMNS.
+        """
+        days = [_day(value) for value in columns.get("date") or []]
+        order = sorted(range(len(days)), key=days.__getitem__)
+        with self._lock:
+            series = self._series.get(type_id)
+            if series is None:
+                series = {field: array(typecode) for field, typecode in FIELDS.items()}
+            last = series["dates"][-1] if series["dates"] else None
+            new = [row for row in order if last is None or days[row] > last]
+            if not new:
+                return 0
+            series["dates"].extend(days[row] for row in new)
+            for field in FIELDS.keys() - {"dates"}:
+                values = columns[field]
+                series[field].extend(values[row] or 0 for row in new)
+            self._series[type_id] = series
+        return len(new)
+
+    def save(self, path: str | Path) -> None:
+        """Write the history to a binary file, replacing it atomically."""
+        type_ids = array("q", self.type_ids)
+        type_offsets = array("q", [0])
+        columns = {field: array(typecode) for field, typecode in FIELDS.items()}
+        for type_id in type_ids:
+            series = self._series[type_id]
+            for field, column in columns.items():
+                column.extend(series[field])
+            type_offsets.append(len(columns["dates"]))
+        write_columns(
+            path, _MAGIC, {"region_id": self.region_id}, {"type_ids": type_ids, "type_offsets": type_offsets, **columns}
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> Self:
+        """Read a history written by save."""
+        header, columns = read_columns(path, _MAGIC)
+        type_ids, offsets = columns["type_ids"], columns["type_offsets"]
+        series = {
+            type_id: {field: columns[field][offsets[row] : offsets[row + 1]] for field in FIELDS}
+            for row, type_id in enumerate(type_ids)
+        }
+        return cls(header["region_id"], series)
+
+    def moving_average(self, type_id: int, window: int, field: str = "average") -> Any:
+        """Get the trailing moving average of a field, NaN until a full window of days is stored."""
+        np = require_numpy("EsiMarketHistory.moving_average")
+        values = np.frombuffer(self.series(type_id)[field], dtype=np.dtype(FIELDS[field])).astype(np.float64)
+        averages = np.full(values.shape, np.nan)
+        if len(values) >= window:
+            sums = np.cumsum(np.concatenate(([0.0], values)))
+            averages[window - 1 :] = (sums[window:] - sums[:-window]) / window
+        return averages
+
+    def volume_weighted_prices(self, *, days: int = 30, until: date | None = None) -> tuple[Any, Any]:
+        """
+        Get the volume-weighted average price of every type over the last days.
+
+        The window ends at until, or the newest day stored for any type. Returns (type_ids,
+        prices) arrays, with NaN for types without volume in the window.
+        """
+        np = require_numpy("EsiMarketHistory.volume_weighted_prices")
+        # Only types with at least one stored day are kept, so no segment below is empty
+        type_ids = [type_id for type_id in self.type_ids if self._series[type_id]["dates"]]
+        if not type_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        def flat(field: str) -> Any:
+            return np.concatenate(
+                [np.frombuffer(self._series[type_id][field], dtype=np.dtype(FIELDS[field])) for type_id in type_ids]
+            )
+
+        dates, average, volume = flat("dates"), flat("average"), flat("volume").astype(np.float64)
+        lengths = np.array([len(self._series[type_id]["dates"]) for type_id in type_ids], dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        end = _day(until) if until else int(dates.max())
+        weights = np.where((dates > end - days) & (dates <= end), volume, 0.0)
+        # One reduceat over the flat columns sums every type's window at once
+        traded = np.add.reduceat(average * weights, starts)
+        total = np.add.reduceat(weights, starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            prices = np.where(total > 0, traded / total, np.nan)
+        return np.array(type_ids, dtype=np.int64), prices
+
+
+class EsiMarketHistoryLoader:
+    """
+    Fetch regional market history for many types in parallel into EsiMarketHistory.
+
+    ESI publishes one new day per type after downtime, so types whose history already ends
+    yesterday are not requested again, and only newer days are appended for the rest. With a
+    cache_dir each region's history is kept in a binary file between runs.
+    """
+
+    def __init__(
+        self,
+        client: "EsiClient",
+        *,
+        cache_dir: str | Path | None = None,
+        max_concurrency: int = DEFAULT_HISTORY_CONCURRENCY,
+    ) -> None:
+        self.client: EsiClient = client
+        self.cache_dir: Path | None = Path(cache_dir) if cache_dir else None
+        self.max_concurrency: int = max_concurrency
+
+    def load(self, region_id: int) -> EsiMarketHistory:
+        """Get a region's stored history, empty when none is stored."""
+        path = self._path(region_id)
+        if path and path.exists():
+            return EsiMarketHistory.load(path)
+        return EsiMarketHistory(region_id)
+
+    def update(
+        self,
+        region_id: int,
+        type_ids: Iterable[int] | None = None,
+        *,
+        errors: dict[int, Exception] | None = None,
+    ) -> EsiMarketHistory:
+        """
+        Fetch new days for types of a region, by default every type with market orders there.
+
+        Types that fail to download are logged and skipped, and their errors are added to errors
+        when given. The days fetched for every other type are still saved, and the skipped types
+        are requested again by the next update.
+        """
+        history = self.load(region_id)
+        if type_ids is None:
+            type_ids = self.client.fetch_pages(self.client.market.get_markets_region_id_types, region_id=region_id)
+        latest = datetime.now(UTC).date() - timedelta(days=1)
+        stale = [type_id for type_id in dict.fromkeys(type_ids) if (history.last_date(type_id) or date.min) < latest]
+        logger.debug(f"Region {region_id}: fetching history of {len(stale)} types")
+
+        fetch = raw_method(self.client.market, _HISTORY_OPERATION)
+        parse_type = response_type(self.client.market, _HISTORY_OPERATION)
+        executor = self.client.executor
+        failed = errors if errors is not None else {}
+
+        def fetch_type(type_id: int) -> int:
+            try:
+                body, _ = fetch_raw(fetch, region_id=region_id, type_id=type_id)
+                return history.append(type_id, executor.parse(parse_type, body, EsiResultFormat.COLUMNS))
+            except Exception as e:
+                # Types that were never traded in the region have no history
+                if isinstance(e, ApiException) and e.status == 404:
+                    return 0
+                logger.warning(f"Region {region_id}: history of type {type_id} failed: {e}")
+                failed[type_id] = e
+                return 0
+
+        if stale:
+            with ContextThreadPoolExecutor(
+                min(self.max_concurrency, len(stale)), thread_name_prefix="pyesi-history"
+            ) as pool:
+                added = sum(pool.map(fetch_type, stale))
+            logger.debug(f"Region {region_id}: added {added} days of history")
+
+        path = self._path(region_id)
+        if path:
+            history.save(path)
+        return history
+
+    def _path(self, region_id: int) -> Path | None:
+        return self.cache_dir / f"{region_id}.history" if self.cache_dir else None
+
+
+def _day(value: date | str) -> int:
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return value.toordinal() - _EPOCH
@@ -0,0 +1,276 @@
+"""
+pyesi-client:
+
+Route Engine
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING
+
+from pyesi_client.constants import DEFAULT_ROUTE_CACHE_SIZE, HIGHSEC_THRESHOLD, EsiRouteFlag
+from pyesi_client.core.operations import data_method
+from pyesi_client.services.universe import EsiUniverseTables
+
+if TYPE_CHECKING:
+    from pyesi_client.core.client import EsiClient
+
+logger = logging.getLogger(__name__)
+
+_SearchKey = tuple[int, EsiRouteFlag, frozenset[int], frozenset[tuple[int, int]]]
+
+
+class EsiRouteEngine:
+    """
+    Compute stargate routes locally, answering the same question as RoutesApi.
+
+    Shortest routes use breadth-first search; secure and insecure routes use Dijkstra, where
+    entering a system of the unwanted security band costs more than any route avoiding it. Each
+    search yields routes from one origin to every system, so the results are cached per origin,
+    flag, avoid list and connections, and batch queries share one search per distinct origin.
+    Connections are extra two-way links such as jump bridges. Without tables, or for systems
+    missing from them, routes are requested from ESI through the client.
+    """
+
+    def __init__(
+        self,
+        tables: EsiUniverseTables | None,
+        *,
+        client: "EsiClient | None" = None,
+        cache_size: int = DEFAULT_ROUTE_CACHE_SIZE,
+    ) -> None:
+        self.tables: EsiUniverseTables | None = tables
+        self.client: EsiClient | None = client
+        self.cache_size: int = cache_size
+        self._searches: OrderedDict[_SearchKey, tuple[array, array]] = OrderedDict()
+        self._penalties: dict[EsiRouteFlag, array] = {}
+        self._lock = threading.Lock()
+
+    def route(
+        self,
+        origin: int,
+        destination: int,
+        *,
+        flag: EsiRouteFlag = EsiRouteFlag.SHORTEST,
+        avoid: Iterable[int] = (),
+        connections: Iterable[tuple[int, int]] = (),
+    ) -> list[int]:
+        """Get the systems on a route, including origin and destination."""
+        avoid = frozenset(avoid)
+        connections = frozenset(map(tuple, connections))
+        if not self._is_local(origin, destination):
+            return self._esi_route(origin, destination, flag, avoid, connections)
+        route = self._route(origin, destination, flag, self._rows(avoid), connections)
+        if route is None:
+            raise ValueError(f"No route found from {origin} to {destination}")
+        return route
+
+    def jumps(
+        self,
+        origin: int,
+        destination: int,
+        *,
+        flag: EsiRouteFlag = EsiRouteFlag.SHORTEST,
+        avoid: Iterable[int] = (),
+        connections: Iterable[tuple[int, int]] = (),
+    ) -> int:
+        """Get the number of jumps on a route."""
+        return len(self.route(origin, destination, flag=flag, avoid=avoid, connections=connections)) - 1
+
+    def routes(
+        self,
+        pairs: Iterable[tuple[int, int]],
+        *,
+        flag: EsiRouteFlag = EsiRouteFlag.SHORTEST,
+        avoid: Iterable[int] = (),
+        connections: Iterable[tuple[int, int]] = (),
+    ) -> list[list[int] | None]:
+        """Get routes for many (origin, destination) pairs, None where no route exists."""
+        avoid = frozenset(avoid)
+        connections = frozenset(map(tuple, connections))
+        avoid_rows = self._rows(avoid) if self.tables is not None else frozenset()
+        # Consecutive pairs from one origin hit the same cached search
+        pairs = sorted(enumerate(pairs), key=lambda item: item[1][0])
+        results: list[list[int] | None] = [None] * len(pairs)
+        for position, (origin, destination) in pairs:
+            if self._is_local(origin, destination):
+                results[position] = self._route(origin, destination, flag, avoid_rows, connections)
+            else:
+                results[position] = self._esi_route(origin, destination, flag, avoid, connections)
+        return results
+
+    def jump_matrix(
+        self,
+        origins: Sequence[int],
+        destinations: Sequence[int],
+        *,
+        flag: EsiRouteFlag = EsiRouteFlag.SHORTEST,
+        avoid: Iterable[int] = (),
+        connections: Iterable[tuple[int, int]] = (),
+    ) -> list[list[int | None]]:
+        """
+        Get jump counts from every origin to every destination, None where unreachable.
+
+        Only systems in the local tables are supported. Passing every system as origins
+        precomputes the full matrix for a flag, within the engine's cache size.
+        """
+        tables = self._require_tables()
+        avoid_rows = self._rows(avoid)
+        connections = frozenset(map(tuple, connections))
+        destination_rows = [tables.system_index(destination) for destination in destinations]
+        matrix: list[list[int | None]] = []
+        for origin in origins:
+            jumps, _ = self._search(tables.system_index(origin), flag, avoid_rows, connections)
+            matrix.append([jumps[row] if jumps[row] >= 0 else None for row in destination_rows])
+        return matrix
+
+    def clear(self) -> None:
+        """Drop cached searches, for example after replacing the tables."""
+        with self._lock:
+            self._searches.clear()
+            self._penalties.clear()
+
+    def _is_local(self, *system_ids: int) -> bool:
+        if self.tables is None:
+            return False
+        try:
+            for system_id in system_ids:
+                self.tables.system_index(system_id)
+        except KeyError:
+            return False
+        return True
+
+    def _require_tables(self) -> EsiUniverseTables:
+        if self.tables is None:
+            raise ValueError("Route engine has no universe tables")
+        return self.tables
+
+    def _rows(self, system_ids: Iterable[int]) -> frozenset[int]:
+        tables = self._require_tables()
+        return frozenset(tables.system_index(system_id) for system_id in system_ids if self._is_local(system_id))
+
+    def _extra_edges(self, connections: frozenset[tuple[int, int]]) -> dict[int, tuple[int, ...]]:
+        tables = self._require_tables()
+        extra: dict[int, list[int]] = {}
+        for source, destination in connections:
+            if self._is_local(source, destination):
+                source_row, destination_row = tables.system_index(source), tables.system_index(destination)
+                extra.setdefault(source_row, []).append(destination_row)
+                extra.setdefault(destination_row, []).append(source_row)
+        return {row: tuple(rows) for row, rows in extra.items()}
+
+    def _route(
+        self,
+        origin: int,
+        destination: int,
+        flag: EsiRouteFlag,
+        avoid_rows: frozenset[int],
+        connections: frozenset[tuple[int, int]],
+    ) -> list[int] | None:
+        tables = self._require_tables()
+        origin_row, destination_row = tables.system_index(origin), tables.system_index(destination)
+        jumps, previous = self._search(origin_row, flag, avoid_rows, connections)
+        if jumps[destination_row] < 0:
+            return None
+        rows = [destination_row]
+        while rows[-1] != origin_row:
+            rows.append(previous[rows[-1]])
+        return [tables.system_ids[row] for row in reversed(rows)]
+
+    def _search(
+        self,
+        origin_row: int,
+        flag: EsiRouteFlag,
+        avoid_rows: frozenset[int],
+        connections: frozenset[tuple[int, int]],
+    ) -> tuple[array, array]:
+        key: _SearchKey = (origin_row, flag, avoid_rows, connections)
+        with self._lock:
+            cached = self._searches.get(key)
+            if cached is not None:
+                self._searches.move_to_end(key)
+                return cached
+
+        tables = self._require_tables()
+        extra = self._extra_edges(connections)
+        offsets, targets = tables.gate_offsets, tables.gate_targets
+        size = len(tables.system_ids)
+        jumps = array("i", [-1]) * size
+        previous = array("i", [-1]) * size
+        jumps[origin_row] = 0
+
+        if flag == EsiRouteFlag.SHORTEST:
+            queue = deque([origin_row])
+            while queue:
+                row = queue.popleft()
+                next_jumps = jumps[row] + 1
+                for neighbor in itertools.chain(targets[offsets[row] : offsets[row + 1]], extra.get(row, ())):
+                    if jumps[neighbor] < 0 and neighbor not in avoid_rows:
+                        jumps[neighbor] = next_jumps
+                        previous[neighbor] = row
+                        queue.append(neighbor)
+        else:
+            penalties = self._entry_costs(flag)
+            costs = [float("inf")] * size
+            costs[origin_row] = 0
+            heap = [(0, origin_row)]
+            while heap:
+                cost, row = heapq.heappop(heap)
+                if cost > costs[row]:
+                    continue
+                for neighbor in itertools.chain(targets[offsets[row] : offsets[row + 1]], extra.get(row, ())):
+                    if neighbor in avoid_rows:
+                        continue
+                    next_cost = cost + penalties[neighbor]
+                    if next_cost < costs[neighbor]:
+                        costs[neighbor] = next_cost
+                        jumps[neighbor] = jumps[row] + 1
+                        previous[neighbor] = row
+                        heapq.heappush(heap, (next_cost, neighbor))
+
+        with self._lock:
+            self._searches[key] = (jumps, previous)
+            while len(self._searches) > self.cache_size:
+                self._searches.popitem(last=False)
+        return jumps, previous
+
+    def _entry_costs(self, flag: EsiRouteFlag) -> array:
+        penalties = self._penalties.get(flag)
+        if penalties is None:
+            tables = self._require_tables()
+            # Larger than any loop-free route, so one unwanted system outweighs every detour
+            penalty = len(tables.system_ids) + 1
+            wanted_highsec = flag == EsiRouteFlag.SECURE
+            penalties = array(
+                "q",
+                (
+                    1 if (security >= HIGHSEC_THRESHOLD) == wanted_highsec else penalty
+                    for security in tables.system_security
+                ),
+            )
+            self._penalties[flag] = penalties
+        return penalties
+
+    def _esi_route(
+        self,
+        origin: int,
+        destination: int,
+        flag: EsiRouteFlag,
+        avoid: frozenset[int],
+        connections: frozenset[tuple[int, int]],
+    ) -> list[int]:
+        if self.client is None:
+            raise ValueError(f"Systems {origin} or {destination} are not in the universe tables and no client is set")
+        get_route = data_method(self.client.routes, "get_route_origin_destination")
+        return get_route(
+            origin=origin,
+            destination=destination,
+            flag=flag.value,
+            avoid=sorted(avoid) or None,
+            connections=[list(connection) for connection in sorted(connections)] or None,
+        )
@@ -0,0 +1,328 @@
+"""
+pyesi-client:
+
+Universe Static Data
+"""
+
+import logging
+import math
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from datetime import date, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Self
+
+from pyesi_openapi import ApiException
+
+from pyesi_client.constants import DEFAULT_UNIVERSE_ATTEMPTS, DEFAULT_UNIVERSE_CONCURRENCY, EsiPriority
+from pyesi_client.core.compatibility import compatibility_context, compatibility_partition
+from pyesi_client.core.operations import data_method
+from pyesi_client.core.scheduler import ContextThreadPoolExecutor, request_context
+from pyesi_client.core.storage import read_columns, write_columns
+
+if TYPE_CHECKING:
+    from pyesi_client.core.client import EsiClient
+
+_MAGIC = b"PYESIUT1"
+
+# name -> array typecode, in file order
+_COLUMNS: dict[str, str] = {
+    "system_ids": "q",
+    "system_constellations": "q",
+    "system_regions": "q",
+    "system_security": "d",
+    "gate_offsets": "q",
+    "gate_targets": "q",
+    "type_ids": "q",
+    "type_groups": "q",
+    "type_categories": "q",
+    "type_volumes": "d",
+    "type_packaged_volumes": "d",
+}
+
+logger = logging.getLogger(__name__)
+
+
+class EsiUniverseTables:
+    """
+    Compact, indexed lookup tables of universe static data.
+
+    Columns are arrays sorted by id and looked up by binary search, and stargate connections are
+    stored as an adjacency list in CSR form (gate_offsets index into gate_targets, which holds
+    system row indices). Unknown volumes are NaN.
+    """
+
+    def __init__(self, compatibility_date: str, columns: dict[str, array]) -> None:
+        self.compatibility_date: str = compatibility_date
+        missing = _COLUMNS.keys() - columns.keys()
+        if missing:
+            raise ValueError(f"Missing universe table columns: {sorted(missing)}")
+        self.system_ids: array = columns["system_ids"]
+        self.system_constellations: array = columns["system_constellations"]
+        self.system_regions: array = columns["system_regions"]
+        self.system_security: array = columns["system_security"]
+        self.gate_offsets: array = columns["gate_offsets"]
+        self.gate_targets: array = columns["gate_targets"]
+        self.type_ids: array = columns["type_ids"]
+        self.type_groups: array = columns["type_groups"]
+        self.type_categories: array = columns["type_categories"]
+        self.type_volumes: array = columns["type_volumes"]
+        self.type_packaged_volumes: array = columns["type_packaged_volumes"]
+
+    @classmethod
+    def build(
+        cls,
+        compatibility_date: str,
+        *,
+        systems: Iterable[tuple[int, int, int, float]],
+        gates: Iterable[tuple[int, int]],
+        types: Iterable[tuple[int, int, int, float | None, float | None]] = (),
+    ) -> Self:
+        """
+        Build tables from rows.
+
+        systems holds (system_id, constellation_id, region_id, security_status), gates holds
+        (from_system_id, to_system_id) and types holds (type_id, group_id, category_id, volume,
+        packaged_volume). Gates to systems missing from systems are dropped.
+        """
+        system_rows = sorted(systems)
+        system_ids = array("q", (row[0] for row in system_rows))
+        index = {system_id: row for row, system_id in enumerate(system_ids)}
+        neighbors: list[set[int]] = [set() for _ in system_rows]
+        for source, destination in gates:
+            if source in index and destination in index:
+                neighbors[index[source]].add(index[destination])
+
+        gate_offsets = array("q", [0])
+        gate_targets = array("q")
+        for targets in neighbors:
+            gate_targets.extend(sorted(targets))
+            gate_offsets.append(len(gate_targets))
+
+        type_rows = sorted(types)
+        nan = math.nan
+        columns = {
+            "system_ids": system_ids,
+            "system_constellations": array("q", (row[1] for row in system_rows)),
+            "system_regions": array("q", (row[2] for row in system_rows)),
+            "system_security": array("d", (row[3] for row in system_rows)),
+            "gate_offsets": gate_offsets,
+            "gate_targets": gate_targets,
+            "type_ids": array("q", (row[0] for row in type_rows)),
+            "type_groups": array("q", (row[1] for row in type_rows)),
+            "type_categories": array("q", (row[2] for row in type_rows)),
+            "type_volumes": array("d", (nan if row[3] is None else row[3] for row in type_rows)),
+            "type_packaged_volumes": array("d", (nan if row[4] is None else row[4] for row in type_rows)),
+        }
+        return cls(compatibility_date, columns)
+
+    def system_index(self, system_id: int) -> int:
+        """Get the row of a system, raising KeyError for unknown systems."""
+        return _row(self.system_ids, system_id)
+
+    def system_region(self, system_id: int) -> int:
+        return self.system_regions[self.system_index(system_id)]
+
+    def system_constellation(self, system_id: int) -> int:
+        return self.system_constellations[self.system_index(system_id)]
+
+    def security_status(self, system_id: int) -> float:
+        return self.system_security[self.system_index(system_id)]
+
+    def neighbors(self, system_id: int) -> tuple[int, ...]:
+        """Get the systems one stargate jump away."""
+        row = self.system_index(system_id)
+        targets = self.gate_targets[self.gate_offsets[row] : self.gate_offsets[row + 1]]
+        return tuple(self.system_ids[target] for target in targets)
+
+    def type_group(self, type_id: int) -> int:
+        return self.type_groups[_row(self.type_ids, type_id)]
+
+    def type_category(self, type_id: int) -> int:
+        return self.type_categories[_row(self.type_ids, type_id)]
+
+    def type_volume(self, type_id: int, *, packaged: bool = False) -> float:
+        """Get the volume of a type in m3, NaN when ESI does not publish one."""
+        volumes = self.type_packaged_volumes if packaged else self.type_volumes
+        return volumes[_row(self.type_ids, type_id)]
+
+    def save(self, path: str | Path) -> None:
+        """Write the tables to a binary file, replacing it atomically."""
+        columns = {name: getattr(self, name) for name in _COLUMNS}
+        write_columns(path, _MAGIC, {"compatibility_date": self.compatibility_date}, columns)
+
+    @classmethod
+    def load(cls, path: str | Path) -> Self:
+        """Read tables written by save."""
+        header, columns = read_columns(path, _MAGIC)
+        return cls(header["compatibility_date"], columns)
+
+
+def _row(ids: array, value: int) -> int:
+    row = bisect_left(ids, value)
+    if row == len(ids) or ids[row] != value:
+        raise KeyError(value)
+    return row
+
+
+class EsiUniversePreloader:
+    """
+    Bulk-load universe static data into EsiUniverseTables.
+
+    Systems are placed through the constellation endpoints, stargates give the jump graph, and
+    types are grouped through the category and group endpoints; per-type requests are only made
+    for volumes. With a cache_path the tables are saved next to it, one file per compatibility
+    date, and reused until that date changes. The compatibility date defaults to the client's,
+    so warm can build the tables of a new date while processes on the old one keep theirs.
+
+    Failed per-id requests are retried once every other id was fetched, up to max_attempts
+    times, and ids still failing then raise one ApiException naming them, so incomplete
+    tables are never cached.
+    """
+
+    def __init__(
+        self,
+        client: "EsiClient",
+        *,
+        cache_path: str | Path | None = None,
+        compatibility_date: date | None = None,
+        include_type_volumes: bool = True,
+        max_concurrency: int = DEFAULT_UNIVERSE_CONCURRENCY,
+        max_attempts: int = DEFAULT_UNIVERSE_ATTEMPTS,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.client: EsiClient = client
+        self.cache_path: Path | None = Path(cache_path) if cache_path else None
+        self._compatibility_date: date | None = compatibility_date
+        self.include_type_volumes: bool = include_type_volumes
+        self.max_concurrency: int = max_concurrency
+        self.max_attempts: int = max_attempts
+
+    @property
+    def compatibility_date(self) -> date:
+        """The compatibility date given to the preloader, else the client's current one."""
+        value = self._compatibility_date or self.client.compatibility_date
+        # EsiClient.COMPATIBILITY_DATE is a datetime, tables are tagged with the day only
+        return value.date() if isinstance(value, datetime) else value
+
+    @property
+    def cache_file(self) -> Path | None:
+        """Cache file of the tables for the current compatibility date."""
+        if not self.cache_path:
+            return None
+        partition = compatibility_partition(self.compatibility_date)
+        return self.cache_path.with_name(f"{self.cache_path.stem}.{partition}{self.cache_path.suffix}")
+
+    def load(self, *, force: bool = False) -> EsiUniverseTables:
+        """Get the tables from the cache file, fetching them from ESI when missing or outdated."""
+        cache_file = self.cache_file
+        if cache_file and not force:
+            try:
+                tables = EsiUniverseTables.load(cache_file)
+                if tables.compatibility_date == self.compatibility_date.isoformat():
+                    return tables
+                logger.info(f"Universe tables are for compatibility date {tables.compatibility_date}, reloading")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable universe tables {cache_file}: {e}")
+
+        tables = self.fetch()
+        if cache_file:
+            tables.save(cache_file)
+        return tables
+
+    def warm(self, compatibility_date: date) -> EsiUniverseTables:
+        """Build and save the tables of another compatibility date ahead of a cutover, as bulk requests."""
+        preloader = EsiUniversePreloader(
+            self.client,
+            cache_path=self.cache_path,
+            compatibility_date=compatibility_date,
+            include_type_volumes=self.include_type_volumes,
+            max_concurrency=self.max_concurrency,
+            max_attempts=self.max_attempts,
+        )
+        with compatibility_context(compatibility_date), request_context(EsiPriority.BULK):
+            return preloader.load()
+
+    def fetch(self) -> EsiUniverseTables:
+        """Fetch universe static data from ESI."""
+        with ContextThreadPoolExecutor(self.max_concurrency, thread_name_prefix="pyesi-universe") as pool:
+            constellations = self._fetch_each(pool, "get_universe_constellations", "constellation_id")
+            systems = self._fetch_each(pool, "get_universe_systems", "system_id")
+            stargate_ids = [stargate_id for system in systems for stargate_id in system.stargates or []]
+            stargates = self._fetch_details(pool, "get_universe_stargates_stargate_id", "stargate_id", stargate_ids)
+
+            categories = self._fetch_each(pool, "get_universe_categories", "category_id")
+            group_ids = [group_id for category in categories for group_id in category.groups]
+            groups = self._fetch_details(pool, "get_universe_groups_group_id", "group_id", group_ids)
+            type_rows: dict[int, tuple[int, int]] = {
+                type_id: (group.group_id, group.category_id) for group in groups for type_id in group.types
+            }
+            volumes: dict[int, tuple[float | None, float | None]] = {}
+            if self.include_type_volumes:
+                for item in self._fetch_details(pool, "get_universe_types_type_id", "type_id", list(type_rows)):
+                    volumes[item.type_id] = (item.volume, item.packaged_volume)
+
+        placement = {
+            system_id: (constellation.constellation_id, constellation.region_id)
+            for constellation in constellations
+            for system_id in constellation.systems
+        }
+        logger.info(f"Fetched {len(systems)} systems, {len(stargates)} stargates and {len(type_rows)} types")
+        return EsiUniverseTables.build(
+            self.compatibility_date.isoformat(),
+            systems=(
+                (
+                    system.system_id,
+                    *placement.get(system.system_id, (system.constellation_id, 0)),
+                    system.security_status,
+                )
+                for system in systems
+            ),
+            gates=((stargate.system_id, stargate.destination.system_id) for stargate in stargates),
+            types=(
+                (type_id, group_id, category_id, *volumes.get(type_id, (None, None)))
+                for type_id, (group_id, category_id) in type_rows.items()
+            ),
+        )
+
+    def _fetch_each(self, pool: ContextThreadPoolExecutor, list_operation: str, id_param: str) -> list[Any]:
+        ids = self._call(list_operation)
+        return self._fetch_details(pool, f"{list_operation}_{id_param}", id_param, ids)
+
+    def _fetch_details(
+        self, pool: ContextThreadPoolExecutor, operation: str, id_param: str, ids: list[int]
+    ) -> list[Any]:
+        results: dict[int, Any] = {}
+        errors: dict[int, Exception] = {}
+        remaining = list(dict.fromkeys(ids))
+        for attempt in range(1, self.max_attempts + 1):
+            errors.clear()
+            outcomes = pool.map(lambda item_id: self._try_call(operation, **{id_param: item_id}), remaining)
+            for item_id, outcome in zip(remaining, outcomes, strict=True):
+                if isinstance(outcome, Exception):
+                    errors[item_id] = outcome
+                else:
+                    results[item_id] = outcome
+            if not errors:
+                break
+            logger.warning(f"{operation} failed for {len(errors)} ids on attempt {attempt}/{self.max_attempts}")
+            remaining = list(errors)
+        if errors:
+            first = next(iter(errors.values()))
+            status = first.status if isinstance(first, ApiException) else 0
+            raise ApiException(status=status, reason=f"{operation} failed for ids {sorted(errors)}") from first
+        return [results[item_id] for item_id in dict.fromkeys(ids)]
+
+    def _try_call(self, operation: str, **kwargs: Any) -> Any:
+        try:
+            return self._call(operation, **kwargs)
+        except Exception as e:
+            return e
+
+    def _call(self, operation: str, **kwargs: Any) -> Any:
+        method = data_method(self.client.universe, operation)
+        return method(**kwargs, x_compatibility_date=self.compatibility_date)
@@ -0,0 +1,183 @@
+"""
+pyesi-client:
+
+Wallet Sync
+"""
+
+import logging
+from collections.abc import Callable, Iterable
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from pyesi_openapi import ApiException
+
+from pyesi_client.constants import DEFAULT_WALLET_CONCURRENCY, WALLET_DIVISIONS
+from pyesi_client.core.cache import EsiBlobStore
+from pyesi_client.core.operations import http_info_method
+from pyesi_client.core.scheduler import ContextThreadPoolExecutor
+from pyesi_client.models import EsiWalletCursor
+
+if TYPE_CHECKING:
+    from pyesi_client.core.client import EsiClient
+
+WALLET_CURSOR_NAMESPACE = "wallet_cursors"
+
+logger = logging.getLogger(__name__)
+
+
+def wallet_key(owner: str, owner_id: int, kind: str, division: int | None = None) -> str:
+    """Build the cursor key of a wallet, e.g. character:<id>:journal or corporation:<id>:<division>:transactions."""
+    return ":".join(str(part) for part in (owner, owner_id, division, kind) if part is not None)
+
+
+class EsiWalletSync:
+    """
+    Incrementally sync wallet journals and transactions, emitting only entries not seen before.
+
+    ESI lists both newest first, so each sync stops as soon as it reaches the newest entry of
+    the previous one, which is kept with the ETags of the pages read in a per-wallet cursor.
+    A 304 on any page means nothing newer is there. Journals are paged, transactions are walked
+    backwards with from_id. Calls go through the client's router, so owners must be covered by
+    its token pool. Cursors advance when a sync returns, so new entries are delivered once.
+    """
+
+    def __init__(
+        self,
+        client: "EsiClient",
+        *,
+        store: EsiBlobStore | None = None,
+        max_concurrency: int = DEFAULT_WALLET_CONCURRENCY,
+    ) -> None:
+        self.client: EsiClient = client
+        self.store: EsiBlobStore = store or EsiBlobStore()
+        self.max_concurrency: int = max_concurrency
+
+    def character_journal(self, character_id: int) -> list[Any]:
+        """Get new journal entries of a character, oldest first."""
+        func = http_info_method(self.client.wallet, "get_characters_character_id_wallet_journal")
+        return self._sync_journal(wallet_key("character", character_id, "journal"), func, character_id=character_id)
+
+    def character_transactions(self, character_id: int) -> list[Any]:
+        """Get new market transactions of a character, oldest first."""
+        func = http_info_method(self.client.wallet, "get_characters_character_id_wallet_transactions")
+        key = wallet_key("character", character_id, "transactions")
+        return self._sync_transactions(key, func, character_id=character_id)
+
+    def corporation_journal(self, corporation_id: int, division: int) -> list[Any]:
+        """Get new journal entries of a corporation wallet division, oldest first."""
+        func = http_info_method(self.client.wallet, "get_corporations_corporation_id_wallets_division_journal")
+        key = wallet_key("corporation", corporation_id, "journal", division)
+        return self._sync_journal(key, func, corporation_id=corporation_id, division=division)
+
+    def corporation_transactions(self, corporation_id: int, division: int) -> list[Any]:
+        """Get new market transactions of a corporation wallet division, oldest first."""
+        func = http_info_method(self.client.wallet, "get_corporations_corporation_id_wallets_division_transactions")
+        key = wallet_key("corporation", corporation_id, "transactions", division)
+        return self._sync_transactions(key, func, corporation_id=corporation_id, division=division)
+
+    def sync(
+        self,
+        *,
+        character_ids: Iterable[int] = (),
+        corporation_ids: Iterable[int] = (),
+        divisions: Iterable[int] = WALLET_DIVISIONS,
+        transactions: bool = True,
+    ) -> dict[str, list[Any]]:
+        """
+        Sync journals, and optionally transactions, of many wallets in parallel.
+
+        Returns new entries by wallet key (see wallet_key), leaving out wallets without new entries.
+        """
+        divisions = tuple(divisions)
+        tasks: dict[str, Callable[[], list[Any]]] = {}
+        for character_id in character_ids:
+            tasks[wallet_key("character", character_id, "journal")] = partial(self.character_journal, character_id)
+            if transactions:
+                key = wallet_key("character", character_id, "transactions")
+                tasks[key] = partial(self.character_transactions, character_id)
+        for corporation_id in corporation_ids:
+            for division in divisions:
+                key = wallet_key("corporation", corporation_id, "journal", division)
+                tasks[key] = partial(self.corporation_journal, corporation_id, division)
+                if transactions:
+                    key = wallet_key("corporation", corporation_id, "transactions", division)
+                    tasks[key] = partial(self.corporation_transactions, corporation_id, division)
+        if not tasks:
+            return {}
+
+        with ContextThreadPoolExecutor(
+            min(self.max_concurrency, len(tasks)), thread_name_prefix="pyesi-wallet"
+        ) as pool:
+            results = dict(zip(tasks, pool.map(lambda task: task(), tasks.values()), strict=True))
+        return {key: rows for key, rows in results.items() if rows}
+
+    def cursor(self, key: str) -> EsiWalletCursor:
+        """Get the stored cursor of a wallet key."""
+        value = self.store.get(WALLET_CURSOR_NAMESPACE, key)
+        return EsiWalletCursor.model_validate_json(value) if value else EsiWalletCursor()
+
+    def reset(self, key: str) -> None:
+        """Forget a wallet's cursor, so the next sync emits its full history again."""
+        self.store.delete(WALLET_CURSOR_NAMESPACE, key)
+
+    def _sync_journal(self, key: str, func: Callable[..., Any], **kwargs: Any) -> list[Any]:
+        cursor = self.cursor(key)
+        etags: dict[int, str] = {}
+        rows: list[Any] = []
+        page, pages = 1, 1
+        while page <= pages:
+            etag = cursor.etags.get(page) if cursor.last_id is not None else None
+            response = self._call(func, etag, page=page, **kwargs)
+            if response is None:
+                break
+            pages = int(response.headers.get("X-Pages") or 1)
+            if etag := response.headers.get("ETag"):
+                etags[page] = etag
+            entries = response.data or []
+            new = [entry for entry in entries if cursor.last_id is None or entry.id > cursor.last_id]
+            rows.extend(new)
+            if len(new) < len(entries):
+                break
+            page += 1
+        return self._advance(key, cursor, etags, rows, id_field="id")
+
+    def _sync_transactions(self, key: str, func: Callable[..., Any], **kwargs: Any) -> list[Any]:
+        cursor = self.cursor(key)
+        etags: dict[int, str] = {}
+        rows: list[Any] = []
+        from_id: int | None = None
+        while True:
+            # Only the unfiltered first request is stable enough to revalidate with an ETag
+            etag = cursor.etags.get(1) if cursor.last_id is not None and from_id is None else None
+            response = self._call(func, etag, from_id=from_id, **kwargs)
+            if response is None:
+                break
+            if from_id is None and (etag := response.headers.get("ETag")):
+                etags[1] = etag
+            entries = [entry for entry in response.data or [] if from_id is None or entry.transaction_id < from_id]
+            new = [entry for entry in entries if cursor.last_id is None or entry.transaction_id > cursor.last_id]
+            rows.extend(new)
+            if not entries or len(new) < len(entries):
+                break
+            from_id = min(entry.transaction_id for entry in entries)
+        return self._advance(key, cursor, etags, rows, id_field="transaction_id")
+
+    def _call(self, func: Callable[..., Any], etag: str | None, /, **kwargs: Any) -> Any | None:
+        try:
+            return self.client.router.call(func, if_none_match=etag, **kwargs)
+        except ApiException as e:
+            if e.status == 304:
+                return None
+            raise
+
+    def _advance(
+        self, key: str, cursor: EsiWalletCursor, etags: dict[int, str], rows: list[Any], *, id_field: str
+    ) -> list[Any]:
+        rows.sort(key=lambda row: getattr(row, id_field))
+        if rows or etags:
+            last_id = getattr(rows[-1], id_field) if rows else cursor.last_id
+            updated = EsiWalletCursor(last_id=last_id, etags={**cursor.etags, **etags})
+            self.store.put(WALLET_CURSOR_NAMESPACE, key, updated.model_dump_json().encode())
+        if rows:
+            logger.debug(f"{key}: {len(rows)} new entries")
+        return rows
@@ -0,0 +1,45 @@
+"""Tests for the adaptive concurrency limit."""
+
+import time
+
+from pyesi_client import EsiAdaptiveLimit, EsiRequestScheduler
+
+
+class TestEsiAdaptiveLimit:
+    """Tests for EsiAdaptiveLimit."""
+
+    def test_additive_increase_multiplicative_decrease(self):
+        """Test that healthy responses grow the limit and overload halves it once per cooldown."""
+        limit = EsiAdaptiveLimit(10, max_limit=12, cooldown=60)
+        for _ in range(11):
+            limit.observe(0.1, 200)
+        assert limit.limit == 11
+        limit.observe(0.1, 420)
+        limit.observe(0.1, 503)
+        assert limit.limit == 5
+        assert limit.metrics["decreases"] == 1
+        for _ in range(1000):
+            limit.observe(0.1, 200)
+        assert limit.limit == 12
+
+    def test_latency_and_error_budget(self):
+        """Test that slow responses and a low error budget lower the limit."""
+        limit = EsiAdaptiveLimit(16, cooldown=0)
+        limit.observe(0.1, 200)
+        for _ in range(20):
+            limit.observe(1.0, 200)
+        assert limit.limit < 16
+        budget = EsiAdaptiveLimit(16, cooldown=0)
+        budget.observe(0.1, 404, {"X-ESI-Error-Limit-Remain": "5"})
+        assert budget.limit == 8
+
+    def test_retry_after_pauses_scheduler(self):
+        """Test that a Retry-After response holds waiting requests until the pause ends."""
+        scheduler = EsiRequestScheduler(4, reserved=0, adaptive=EsiAdaptiveLimit(4))
+        assert scheduler.acquire(timeout=1)
+        scheduler.observe(0.1, 420, {"Retry-After": "0.2"})
+        scheduler.release()
+        started = time.monotonic()
+        assert scheduler.acquire(timeout=2)
+        assert time.monotonic() - started >= 0.15
+        assert scheduler.metrics["capacity"] == 2
@@ -0,0 +1,108 @@
+"""Tests for asset trees and the asset engine."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from pyesi_client import EsiAssetEngine, EsiAssetTree
+
+STATION = 60003760
+SYSTEM = 30000142
+
+
+def make_columns(rows: list[tuple[int, int, int, str, str, int, bool]]) -> dict[str, list]:
+    names = ["item_id", "type_id", "location_id", "location_flag", "location_type", "quantity", "is_singleton"]
+    return {name: [row[index] for row in rows] for index, name in enumerate(names)}
+
+
+# A ship in a station holding a container with ammo, plus a container anchored in space
+ASSETS = [
+    (5, 587, STATION, "Hangar", "station", 1, True),
+    (3, 3467, 5, "Cargo", "item", 1, True),
+    (9, 215, 3, "Unlocked", "item", 5000, False),
+    (7, 17366, SYSTEM, "AutoFit", "solar_system", 1, True),
+    (8, 34, STATION, "Hangar", "station", 100, False),
+]
+
+
+class FakeAssetsApi:
+    def __init__(self):
+        self.requested: dict[str, list[int]] = {}
+
+    def get_characters_character_id_assets(self, **kwargs):
+        raise AssertionError("pages are fetched through fetch_pages")
+
+    def post_characters_character_id_assets_names_data(self, character_id, request_body):
+        self.requested["names"] = request_body
+        return [SimpleNamespace(item_id=item_id, name=f"Box {item_id}") for item_id in request_body]
+
+    def post_characters_character_id_assets_locations_data(self, character_id, request_body):
+        self.requested["locations"] = request_body
+        return [
+            SimpleNamespace(item_id=item_id, position=SimpleNamespace(x=1.0, y=2.0, z=3.0)) for item_id in request_body
+        ]
+
+
+class FakeRouter:
+    pool = SimpleNamespace(request_auth=lambda character_id: {"value": f"Bearer {character_id}"})
+
+    def character_for(self, operation, *, character_id=None, corporation_id=None):
+        return character_id
+
+    def call(self, func, /, **kwargs):
+        return func(**kwargs)
+
+
+def make_client(rows) -> SimpleNamespace:
+    def fetch_pages(func, /, **kwargs):
+        assert kwargs["_request_auth"] == {"value": "Bearer 1"}
+        return make_columns(rows)
+
+    return SimpleNamespace(assets=FakeAssetsApi(), router=FakeRouter(), fetch_pages=fetch_pages)
+
+
+class TestEsiAssetTree:
+    """Tests for EsiAssetTree."""
+
+    def test_containment(self):
+        """Test parent, child and location lookups."""
+        tree = EsiAssetTree.build("character:1", make_columns(ASSETS))
+        assert tree.children(5) == (3,)
+        assert list(tree.descendants(5)) == [3, 9]
+        assert tree.items_at(STATION) == (5, 8)
+        assert tree.root_location(9) == (STATION, "station")
+        assert sorted(tree.roots()) == [5, 7, 8]
+        assert tree.item(9).location_flag == "Unlocked"
+        assert tree.item(9).quantity == 5000
+        with pytest.raises(KeyError):
+            tree.item(4)
+
+    def test_diff_and_snapshot(self, tmp_path):
+        """Test that diffs report added, removed, moved and restacked items across a save."""
+        EsiAssetTree.build("character:1", make_columns(ASSETS)).save(tmp_path / "assets.bin")
+        previous = EsiAssetTree.load(tmp_path / "assets.bin")
+        rows = [row for row in ASSETS if row[0] != 8]
+        rows[2] = (9, 215, 5, "Cargo", "item", 4000, False)
+        rows.append((10, 34, STATION, "Hangar", "station", 1, False))
+        diff = EsiAssetTree.build("character:1", make_columns(rows)).diff(previous)
+        assert (diff.added, diff.removed, diff.moved, diff.quantity_changed) == ((10,), (8,), (9,), (9,))
+
+
+class TestEsiAssetEngine:
+    """Tests for EsiAssetEngine."""
+
+    def test_names_and_locations(self):
+        """Test that only containers and ships are named and only items in space are located."""
+        client = make_client(ASSETS)
+        tree = EsiAssetEngine(client).character_assets(1)  # type: ignore[arg-type]
+        assert client.assets.requested == {"names": [3, 5, 7], "locations": [7]}
+        assert tree.item(3).name == "Box 3"
+        assert tree.positions == {7: (1.0, 2.0, 3.0)}
+
+    def test_changes(self, tmp_path):
+        """Test that changes diffs against the stored snapshot."""
+        engine = EsiAssetEngine(make_client(ASSETS), snapshot_dir=tmp_path)  # type: ignore[arg-type]
+        tree = engine.character_assets(1, resolve_names=False, resolve_locations=False)
+        assert engine.changes(tree).added == (3, 5, 7, 8, 9)
+        assert not engine.changes(tree)
+        assert engine.snapshot("character:1") is not None
@@ -0,0 +1,72 @@
+"""Tests for batched operation calls."""
+
+import json
+import threading
+import time
+from functools import partial
+
+from pyesi_openapi.exceptions import NotFoundException
+
+from pyesi_client import EsiClient, EsiReplayTransport, EsiTransportArchive
+from pyesi_client.core.batch import gather
+from pyesi_client.models import EsiExchange
+
+CHARACTER = {
+    "birthday": "2015-03-24T11:37:00Z",
+    "bloodline_id": 3,
+    "corporation_id": 98000001,
+    "gender": "male",
+    "name": "Pilot",
+    "race_id": 2,
+}
+HEADERS = {"Content-Type": "application/json"}
+
+
+class TestEsiBatch:
+    """Tests for EsiBatch and gather."""
+
+    def test_results_and_errors_in_order(self):
+        """Test that calls across API groups return their results and errors in the order added."""
+        archive = EsiTransportArchive(
+            [
+                EsiExchange(
+                    method="GET",
+                    url="https://esi.evetech.net/characters/90000001",
+                    status=200,
+                    headers=HEADERS,
+                    body=json.dumps(CHARACTER),
+                ),
+                EsiExchange(
+                    method="GET",
+                    url="https://esi.evetech.net/corporations/98000001",
+                    status=404,
+                    headers=HEADERS,
+                    body='{"error": "Corporation not found"}',
+                ),
+            ]
+        )
+        client = EsiClient("client_id", transport=EsiReplayTransport(archive))
+        batch = client.batch()
+        batch.add(client.corporation.get_corporations_corporation_id, corporation_id=98000001)
+        batch.add(client.api.character.get_characters_character_id, character_id=90000001)
+        assert len(batch) == 2
+
+        corporation, character = batch.run()
+        assert isinstance(corporation.error, NotFoundException)
+        assert not corporation.ok
+        assert character.unwrap().data.name == "Pilot"
+
+    def test_calls_run_concurrently(self):
+        """Test that gather overlaps calls, costing about the slowest one."""
+        barrier = threading.Barrier(4, timeout=2)
+
+        def call(value: int) -> int:
+            barrier.wait()
+            time.sleep(0.05)
+            return value
+
+        started = time.monotonic()
+        results = EsiClient("client_id").gather(*(partial(call, value) for value in range(4)))
+        assert [result.value for result in results] == [0, 1, 2, 3]
+        assert time.monotonic() - started < 0.5
+        assert gather([]) == []
@@ -0,0 +1,83 @@
+"""Tests for per-operation circuit breakers."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from pyesi_openapi import ApiClient, Configuration
+
+from pyesi_client import EsiCircuitBreakers, EsiCircuitOpenError, EsiCircuitState, EsiClient
+from pyesi_client.core.api_client import EsiApiClient
+
+ORDERS = "get_markets_region_id_orders"
+
+
+class TestEsiCircuitBreakers:
+    """Tests for EsiCircuitBreakers."""
+
+    def test_opens_after_threshold_and_probes(self):
+        """Test that consecutive failures open a circuit and one probe closes it again."""
+        circuits = EsiCircuitBreakers(failure_threshold=3, reset_timeout=0.1)
+        for status in (500, 0, 502):
+            circuits.allow(ORDERS)
+            circuits.record(ORDERS, status)
+        assert circuits.state(ORDERS) == EsiCircuitState.OPEN
+        with pytest.raises(EsiCircuitOpenError):
+            circuits.allow(ORDERS)
+        circuits.allow("get_markets_prices")
+
+        time.sleep(0.15)
+        circuits.allow(ORDERS)
+        assert circuits.state(ORDERS) == EsiCircuitState.HALF_OPEN
+        with pytest.raises(EsiCircuitOpenError):
+            circuits.allow(ORDERS)
+        circuits.record(ORDERS, 200)
+        assert circuits.state(ORDERS) == EsiCircuitState.CLOSED
+        assert circuits.metrics[ORDERS]["rejected"] == 2
+
+    def test_failed_probe_reopens(self):
+        """Test that a failed probe opens the circuit again and 4xx responses count as success."""
+        circuits = EsiCircuitBreakers(failure_threshold=2, reset_timeout=0.05, thresholds={ORDERS: 1})
+        circuits.record(ORDERS, 503)
+        assert circuits.state(ORDERS) == EsiCircuitState.OPEN
+        time.sleep(0.1)
+        circuits.allow(ORDERS)
+        circuits.record(ORDERS, 504)
+        assert circuits.state(ORDERS) == EsiCircuitState.OPEN
+        circuits.record("get_markets_prices", 404)
+        assert "get_markets_prices" not in circuits.metrics
+
+    def test_operation_for(self):
+        """Test that request URLs resolve to operation names."""
+        url = "https://esi.evetech.net/markets/10000002/orders?order_type=all&page=2"
+        assert EsiCircuitBreakers.operation_for("GET", url) == ORDERS
+        assert EsiCircuitBreakers.operation_for("GET", "https://esi.evetech.net/unknown") == "GET /unknown"
+
+
+class TestEsiApiClient:
+    """Tests for EsiApiClient with circuit breakers."""
+
+    def test_fails_fast_without_request(self, monkeypatch):
+        """Test that an open circuit raises before sending and client metrics report it."""
+        calls = []
+
+        def call_api(self, method, url, *args, **kwargs):
+            calls.append(url)
+            return SimpleNamespace(status=503, read=lambda: b"", getheaders=dict)
+
+        monkeypatch.setattr(ApiClient, "call_api", call_api)
+        client = EsiClient("client_id", circuit_breakers=EsiCircuitBreakers(failure_threshold=2))
+        assert isinstance(client.api_client, EsiApiClient)
+        url = "https://esi.evetech.net/markets/10000002/orders"
+        client.api_client.call_api("GET", url)
+        client.api_client.call_api("GET", url)
+        with pytest.raises(EsiCircuitOpenError) as e:
+            client.api_client.call_api("GET", url)
+        assert e.value.status == 503
+        assert len(calls) == 2
+        assert client.metrics()["circuits"][ORDERS]["state"] == "open"
+
+    def test_plain_client_without_options(self):
+        """Test that the generated API client is used without a scheduler or circuit breakers."""
+        client = EsiApiClient(Configuration())
+        assert client.scheduler is None and client.circuits is None
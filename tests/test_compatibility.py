@@ -0,0 +1,53 @@
+"""Tests for per-client and per-context compatibility dates."""
+
+import json
+from datetime import date
+
+import urllib3
+from pyesi_openapi.rest import RESTResponse
+
+from pyesi_client import EsiClient, EsiTransport
+from pyesi_client.core.scheduler import ContextThreadPoolExecutor
+
+STATUS = {"players": 30000, "server_version": "2981611", "start_time": "2025-08-26T11:00:00Z"}
+
+
+class HeaderTransport(EsiTransport):
+    """Transport answering every request with the server status, recording the compatibility date sent."""
+
+    def __init__(self):
+        self.dates: list[str | None] = []
+
+    def request(self, method, url, headers=None, body=None, post_params=None, _request_timeout=None):
+        self.dates.append((headers or {}).get("X-Compatibility-Date"))
+        response = urllib3.HTTPResponse(
+            body=json.dumps(STATUS).encode(),
+            headers={"Content-Type": "application/json"},
+            status=200,
+            preload_content=False,
+        )
+        return RESTResponse(response)
+
+
+class TestCompatibilityDate:
+    """Tests for EsiClient compatibility dates."""
+
+    def test_client_date_sent_with_requests(self):
+        """Test that requests carry the client's compatibility date unless the caller sets one."""
+        transport = HeaderTransport()
+        client = EsiClient("client_id", transport=transport, compatibility_date=date(2025, 9, 30))
+        client.status.get_status()
+        client.status.get_status(x_compatibility_date=date(2025, 8, 26))
+        assert client.compatibility_date == date(2025, 9, 30)
+        assert transport.dates == ["2025-09-30", "2025-08-26"]
+
+    def test_context_date_follows_fan_outs(self):
+        """Test that a compatibility context overrides the client's date, in worker threads too."""
+        transport = HeaderTransport()
+        client = EsiClient("client_id", transport=transport)
+        with client.compatibility(date(2026, 1, 1)):
+            assert client.compatibility_date == date(2026, 1, 1)
+            with ContextThreadPoolExecutor(2) as pool:
+                list(pool.map(lambda _: client.status.get_status(), range(2)))
+        client.status.get_status()
+        assert transport.dates == ["2026-01-01", "2026-01-01", f"{EsiClient.COMPATIBILITY_DATE:%Y-%m-%d}"]
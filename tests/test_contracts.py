@@ -0,0 +1,108 @@
+"""Tests for the public contract crawler."""
+
+import json
+from datetime import date
+from types import SimpleNamespace
+
+from pyesi_openapi import ApiException
+
+from pyesi_client import EsiBlobStore, EsiContractCrawler, EsiExecutorMode, EsiParseExecutor
+
+
+class FakeResponse:
+    def __init__(self, status: int, data: bytes):
+        self.status = status
+        self.reason = "Not Found" if status == 404 else "OK"
+        self.data = data
+        self.headers = {"X-Pages": "1"}
+
+    def release_conn(self):
+        pass
+
+
+class FakeContractsApi:
+    """Contracts endpoints over an in-memory listing."""
+
+    def __init__(self, listings: dict[int, list[dict]]):
+        self.listings = listings
+        self.failing_regions: set[int] = set()
+        self.item_requests: list[int] = []
+
+    def get_contracts_public_region_id(self, **kwargs):
+        raise AssertionError("listings are fetched through fetch_pages")
+
+    def get_contracts_public_items_contract_id_data(self, contract_id: int) -> list[dict]:
+        raise AssertionError("items are fetched raw")
+
+    def get_contracts_public_items_contract_id_without_preload_content(self, contract_id: int, page: int = 1):
+        self.item_requests.append(contract_id)
+        if contract_id in (404, 500):
+            return FakeResponse(contract_id, b"")
+        return FakeResponse(200, json.dumps([{"record_id": 1, "type_id": 34, "quantity": contract_id}]).encode())
+
+
+def make_crawler(listings: dict[int, list[dict]], store: EsiBlobStore) -> EsiContractCrawler:
+    api = FakeContractsApi(listings)
+
+    def fetch_pages(func, /, *, result_format, region_id):
+        if region_id in api.failing_regions:
+            raise ApiException(status=503, reason="Service Unavailable")
+        return [SimpleNamespace(**contract) for contract in api.listings[region_id]]
+
+    client = SimpleNamespace(
+        contracts=api,
+        fetch_pages=fetch_pages,
+        executor=EsiParseExecutor(EsiExecutorMode.INLINE),
+        compatibility_date=date(2025, 8, 26),
+    )
+    return EsiContractCrawler(client, store=store)  # type: ignore[arg-type]
+
+
+class TestEsiContractCrawler:
+    """Tests for EsiContractCrawler."""
+
+    def test_items_fetched_once_and_expired(self):
+        """Test that items are downloaded for new contracts only and dropped when contracts expire."""
+        store = EsiBlobStore()
+        listings = {
+            10000002: [{"contract_id": 1, "type": "item_exchange"}, {"contract_id": 2, "type": "courier"}],
+            10000043: [{"contract_id": 3, "type": "auction"}, {"contract_id": 404, "type": "auction"}],
+        }
+        crawler = make_crawler(listings, store)
+        updates = crawler.crawl([10000002, 10000043])
+        assert updates[10000043].new == (3, 404)
+        assert sorted(crawler.client.contracts.item_requests) == [1, 3, 404]
+        assert crawler.items(3) == [{"record_id": 1, "type_id": 34, "quantity": 3}]
+
+        listings[10000002] = [{"contract_id": 5, "type": "item_exchange"}]
+        crawler = make_crawler(listings, store)
+        updates = crawler.crawl([10000002, 10000043])
+        assert (updates[10000002].new, updates[10000002].expired) == ((5,), (1, 2))
+        # 404 is still listed, but its missing items were remembered
+        assert crawler.client.contracts.item_requests == [5]
+        assert crawler.items(404) == []
+        assert crawler.items(1) is None
+        assert crawler.items(3) is not None
+
+    def test_failures_do_not_lose_updates(self):
+        """Test that failing regions and items are reported while the other regions' updates are returned."""
+        store = EsiBlobStore()
+        listings = {
+            10000002: [{"contract_id": 1, "type": "item_exchange"}, {"contract_id": 500, "type": "auction"}],
+            10000043: [{"contract_id": 3, "type": "auction"}],
+        }
+        crawler = make_crawler(listings, store)
+        crawler.client.contracts.failing_regions.add(10000043)
+        errors: dict[int, Exception] = {}
+        updates = crawler.crawl([10000002, 10000043], errors=errors)
+        assert list(updates) == [10000002]
+        assert updates[10000002].new == (1, 500)
+        assert sorted(errors) == [500, 10000043]
+        assert crawler.items(1) is not None
+        assert crawler.items(500) is None
+
+        crawler = make_crawler(listings, store)
+        updates = crawler.crawl([10000002, 10000043])
+        # The failed region was not saved, so its contracts are still new
+        assert (updates[10000002].new, updates[10000043].new) == ((), (3,))
+        assert sorted(crawler.client.contracts.item_requests) == [3, 500]
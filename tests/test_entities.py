@@ -0,0 +1,123 @@
+"""Tests for the TTL cache and bulk entity resolver."""
+
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from pyesi_openapi import ApiException
+
+from pyesi_client import EsiEntityResolver, EsiTtlCache
+from pyesi_client.core.cache import expires_at_from_headers
+
+INVALID_ID = 666
+AFFILIATIONS = {
+    1: SimpleNamespace(character_id=1, corporation_id=100, alliance_id=1000, faction_id=None),
+    2: SimpleNamespace(character_id=2, corporation_id=100, alliance_id=1000, faction_id=None),
+    3: SimpleNamespace(character_id=3, corporation_id=101, alliance_id=None, faction_id=500001),
+}
+CORPORATIONS = {100: SimpleNamespace(name="Corp A", ticker="CA"), 101: SimpleNamespace(name="Corp B", ticker="CB")}
+ALLIANCES = {1000: SimpleNamespace(name="Alliance", ticker="ALL")}
+HEADERS = {"Expires": "Wed, 01 Jan 2099 00:00:00 GMT"}
+
+
+class FakeApi:
+    """Generated API stand-in recording calls per operation."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, object]] = []
+
+    def post_characters_affiliation_with_http_info(self, request_body):
+        self.calls.append(("affiliation", list(request_body)))
+        if INVALID_ID in request_body:
+            raise ApiException(status=404, reason="Not Found")
+        return SimpleNamespace(data=[AFFILIATIONS[i] for i in request_body], headers=HEADERS)
+
+    def post_universe_names_with_http_info(self, request_body):
+        self.calls.append(("names", list(request_body)))
+        if INVALID_ID in request_body:
+            raise ApiException(status=404, reason="Not Found")
+        return SimpleNamespace(data=[SimpleNamespace(id=i, name=f"Pilot {i}") for i in request_body], headers={})
+
+    def get_corporations_corporation_id_with_http_info(self, corporation_id):
+        self.calls.append(("corporation", corporation_id))
+        return SimpleNamespace(data=CORPORATIONS[corporation_id], headers=HEADERS)
+
+    def get_alliances_alliance_id_with_http_info(self, alliance_id):
+        self.calls.append(("alliance", alliance_id))
+        return SimpleNamespace(data=ALLIANCES[alliance_id], headers=HEADERS)
+
+
+def make_resolver() -> tuple[EsiEntityResolver, FakeApi]:
+    api = FakeApi()
+    client = SimpleNamespace(
+        character=api, universe=api, corporation=api, alliance=api, compatibility_date=date(2025, 8, 26)
+    )
+    return EsiEntityResolver(client), api  # type: ignore[arg-type]
+
+
+class TestEsiTtlCache:
+    """Tests for EsiTtlCache."""
+
+    def test_expiry_and_eviction(self):
+        """Test that expired entries are dropped and the least recently used is evicted."""
+        cache: EsiTtlCache[int, str] = EsiTtlCache(maxsize=2)
+        cache.set(1, "a", time.time() + 60)
+        cache.set(2, "b", time.time() - 1)
+        assert cache.get(2) is None
+        cache.set(3, "c", time.time() + 60)
+        cache.get(1)
+        cache.set(4, "d", time.time() + 60)
+        assert cache.get_many([1, 3, 4]) == {1: "a", 4: "d"}
+
+    def test_expires_header(self):
+        """Test that the Expires header sets the expiry, with a default otherwise."""
+        assert expires_at_from_headers(HEADERS, 60) == 4070908800
+        assert expires_at_from_headers({"Expires": "garbage"}, 60) == pytest.approx(time.time() + 60, abs=5)
+
+
+class TestEsiEntityResolver:
+    """Tests for EsiEntityResolver."""
+
+    def test_resolve(self):
+        """Test that characters are resolved with one batched call per lookup and one per distinct entity."""
+        resolver, api = make_resolver()
+        resolved = resolver.resolve([1, 2, 3])
+        assert resolved[1].corporation_ticker == "CA"
+        assert resolved[2].alliance_name == "Alliance"
+        assert resolved[3].character_name == "Pilot 3"
+        assert resolved[3].alliance_id is None
+        assert resolved[3].faction_id == 500001
+        assert sorted(call[0] for call in api.calls) == [
+            "affiliation",
+            "alliance",
+            "corporation",
+            "corporation",
+            "names",
+        ]
+
+    def test_cache_hits(self):
+        """Test that cached entities are not requested again."""
+        resolver, api = make_resolver()
+        resolver.resolve([1, 2])
+        api.calls.clear()
+        resolver.resolve([1, 2, 3])
+        # Character names have no Expires header but still get the default TTL
+        assert sorted(api.calls) == [("affiliation", [3]), ("corporation", 101), ("names", [3])]
+
+    def test_invalid_ids_are_isolated(self):
+        """Test that a batch with an invalid id is split and the valid ids still resolve."""
+        resolver, api = make_resolver()
+        affiliations = resolver.affiliations([1, 2, INVALID_ID, 3])
+        assert sorted(affiliations) == [1, 2, 3]
+        assert ("affiliation", [INVALID_ID]) in api.calls
+
+    def test_cache_partitioned_by_compatibility_date(self):
+        """Test that entities cached under one compatibility date are fetched again under another."""
+        resolver, api = make_resolver()
+        resolver.affiliations([1, 2])
+        resolver.client.compatibility_date = date(2026, 1, 1)
+        resolver.affiliations([1, 2])
+        resolver.client.compatibility_date = date(2025, 8, 26)
+        resolver.affiliations([1, 2])
+        assert api.calls == [("affiliation", [1, 2]), ("affiliation", [1, 2])]
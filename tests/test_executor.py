@@ -0,0 +1,143 @@
+"""Tests for the parse executor and paginated fetches."""
+
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import urllib3
+from pyesi_openapi import ApiException
+from pyesi_openapi.models import MarketsRegionIdOrdersGetInner
+from pyesi_openapi.rest import RESTResponse
+
+from pyesi_client import EsiClient, EsiExecutorMode, EsiParseExecutor, EsiResultFormat, EsiTransport
+from pyesi_client.core.pagination import fetch_pages
+
+ORDERS = list[MarketsRegionIdOrdersGetInner]
+
+
+def make_orders(start: int, count: int) -> list[dict]:
+    return [
+        {
+            "duration": 90,
+            "is_buy_order": False,
+            "issued": "2025-09-01T12:00:00Z",
+            "location_id": 60003760,
+            "min_volume": 1,
+            "order_id": order_id,
+            "price": 5.5,
+            "range": "region",
+            "system_id": 30000142,
+            "type_id": 34,
+            "volume_remain": 100,
+            "volume_total": 100,
+        }
+        for order_id in range(start, start + count)
+    ]
+
+
+class FakeRawResponse:
+    """urllib3 response stand-in."""
+
+    def __init__(self, body: list[dict], pages: int, status: int = 200):
+        self.status = status
+        self.reason = "OK" if status == 200 else "Error"
+        self.data = json.dumps(body).encode()
+        self.headers = {"X-Pages": str(pages)}
+
+    def release_conn(self) -> None:
+        pass
+
+
+class FakeMarketApi:
+    """Generated API stand-in serving three pages of orders."""
+
+    def __init__(self, failing_page: int | None = None):
+        self.failing_page = failing_page
+        self.pages: list[int] = []
+
+    def get_markets_region_id_orders(self, **kwargs) -> ORDERS:
+        raise NotImplementedError
+
+    def get_markets_region_id_orders_data(self, **kwargs) -> ORDERS:
+        raise NotImplementedError
+
+    def get_markets_region_id_orders_without_preload_content(self, **kwargs) -> FakeRawResponse:
+        page = kwargs.get("page") or 1
+        self.pages.append(page)
+        status = 503 if page == self.failing_page else 200
+        return FakeRawResponse(make_orders(page * 10, 2), pages=3, status=status)
+
+
+class PagedOrdersTransport(EsiTransport):
+    """Transport serving three pages of orders for any region."""
+
+    def request(self, method, url, headers=None, body=None, post_params=None, _request_timeout=None):
+        page = int(parse_qs(urlsplit(url).query).get("page", ["1"])[0])
+        response = urllib3.HTTPResponse(
+            body=json.dumps(make_orders(page * 10, 2)).encode(),
+            headers={"Content-Type": "application/json", "X-Pages": "3"},
+            status=200,
+            preload_content=False,
+        )
+        return RESTResponse(response)
+
+
+class TestEsiParseExecutor:
+    """Tests for EsiParseExecutor."""
+
+    @pytest.mark.parametrize("mode", [EsiExecutorMode.INLINE, EsiExecutorMode.THREAD, EsiExecutorMode.PROCESS])
+    def test_modes_parse_identically(self, mode):
+        """Test that every mode returns the same validated data."""
+        body = json.dumps(make_orders(1, 3)).encode()
+        with EsiParseExecutor(mode, max_workers=1, min_offload_bytes=0) as executor:
+            orders = executor.parse(ORDERS, body)
+            rows = executor.parse(ORDERS, body, EsiResultFormat.DICT)
+        assert [order.order_id for order in orders] == [1, 2, 3]
+        assert [row["order_id"] for row in rows] == [1, 2, 3]
+
+    def test_columns_format(self):
+        """Test that list responses can be returned column-wise."""
+        executor = EsiParseExecutor(EsiExecutorMode.INLINE)
+        columns = executor.parse(ORDERS, json.dumps(make_orders(1, 2)).encode(), EsiResultFormat.COLUMNS)
+        assert columns["order_id"] == [1, 2]
+        assert columns["price"] == [5.5, 5.5]
+
+    def test_invalid_body_raises(self):
+        """Test that validation errors surface from the future."""
+        executor = EsiParseExecutor(EsiExecutorMode.INLINE)
+        with pytest.raises(ValueError):
+            executor.parse(ORDERS, b'[{"order_id": "not an order"}]')
+
+
+class TestFetchPages:
+    """Tests for fetch_pages."""
+
+    def test_all_pages_merged_in_order(self):
+        """Test that every page is fetched once and merged in page order."""
+        api = FakeMarketApi()
+        orders = fetch_pages(api.get_markets_region_id_orders, EsiParseExecutor(EsiExecutorMode.THREAD), region_id=1)
+        assert sorted(api.pages) == [1, 2, 3]
+        assert [order.order_id for order in orders] == [10, 11, 20, 21, 30, 31]
+
+    def test_columns_merged_across_pages(self):
+        """Test that column results from each page are concatenated."""
+        api = FakeMarketApi()
+        columns = fetch_pages(
+            api.get_markets_region_id_orders,
+            EsiParseExecutor(EsiExecutorMode.INLINE),
+            result_format=EsiResultFormat.COLUMNS,
+            region_id=1,
+        )
+        assert columns["order_id"] == [10, 11, 20, 21, 30, 31]
+
+    def test_failed_page_raises(self):
+        """Test that an error response on any page propagates."""
+        api = FakeMarketApi(failing_page=2)
+        with pytest.raises(ApiException):
+            fetch_pages(api.get_markets_region_id_orders, EsiParseExecutor(EsiExecutorMode.INLINE), region_id=1)
+
+    def test_client_api_methods(self):
+        """Test that methods of the client's API groups, which inject the compatibility date, can be paged."""
+        client = EsiClient("client_id", transport=PagedOrdersTransport())
+        orders = client.fetch_pages(client.market.get_markets_region_id_orders, region_id=10000002, order_type="all")
+        assert [order.order_id for order in orders] == [10, 11, 20, 21, 30, 31]
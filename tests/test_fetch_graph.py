@@ -0,0 +1,110 @@
+"""Tests for the dependency-aware fetch graph."""
+
+import threading
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from pyesi_openapi import ApiException
+
+from pyesi_client import EsiFetchGraph
+
+INVALID_ID = 666
+HEADERS = {"Expires": "Wed, 01 Jan 2099 00:00:00 GMT"}
+KILLMAILS = {
+    (1, "a"): SimpleNamespace(victim=SimpleNamespace(character_id=10, ship_type_id=587), attackers=[11, INVALID_ID]),
+    (2, "b"): SimpleNamespace(victim=SimpleNamespace(character_id=11, ship_type_id=603), attackers=[10]),
+    (3, "c"): SimpleNamespace(victim=SimpleNamespace(character_id=12, ship_type_id=587), attackers=[]),
+}
+
+
+class FakeApi:
+    """Generated API stand-in for killmails, affiliations and types, recording calls with their time."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, object, float]] = []
+        self.lock = threading.Lock()
+
+    def record(self, name, value):
+        with self.lock:
+            self.calls.append((name, value, time.monotonic()))
+
+    def named(self, name):
+        return [value for call, value, _ in self.calls if call == name]
+
+    def get_killmails_killmail_id_killmail_hash_with_http_info(self, killmail_id, killmail_hash):
+        if killmail_id == 4:
+            raise ApiException(status=500, reason="Internal Server Error")
+        time.sleep(0.3 if killmail_id == 3 else 0.01)
+        self.record("killmail", killmail_id)
+        return SimpleNamespace(data=KILLMAILS[(killmail_id, killmail_hash)], headers=HEADERS)
+
+    def post_characters_affiliation_with_http_info(self, request_body):
+        self.record("affiliation", sorted(request_body))
+        if INVALID_ID in request_body:
+            raise ApiException(status=404, reason="Not Found")
+        return SimpleNamespace(
+            data=[SimpleNamespace(character_id=i, corporation_id=i * 100) for i in request_body], headers=HEADERS
+        )
+
+    def get_universe_types_type_id_with_http_info(self, type_id):
+        self.record("type", type_id)
+        return SimpleNamespace(data=SimpleNamespace(type_id=type_id), headers=HEADERS)
+
+
+def make_graph() -> tuple[EsiFetchGraph, FakeApi]:
+    api = FakeApi()
+    client = SimpleNamespace(killmails=api, character=api, universe=api, compatibility_date=date(2025, 8, 26))
+    graph = EsiFetchGraph(client)  # type: ignore[arg-type]
+    graph.each(
+        "killmails",
+        api.get_killmails_killmail_id_killmail_hash_with_http_info,
+        lambda ref: {"killmail_id": ref[0], "killmail_hash": ref[1]},
+    )
+    graph.bulk("affiliations", api.post_characters_affiliation_with_http_info, key=lambda item: item.character_id)
+    graph.each("types", "get_universe_types_type_id", "type_id")
+    graph.edge("killmails", "affiliations", lambda km: [km.victim.character_id, *km.attackers])
+    graph.edge("killmails", "types", lambda km: [km.victim.ship_type_id])
+    return graph, api
+
+
+class TestEsiFetchGraph:
+    """Tests for EsiFetchGraph."""
+
+    def test_levels_batched_and_pipelined(self):
+        """Test that ids from every killmail share bulk requests while per-key nodes start early."""
+        graph, api = make_graph()
+        result = graph.run({"killmails": [(1, "a"), (2, "b"), (3, "c"), (4, "d")]})
+
+        assert set(result.data["killmails"]) == {(1, "a"), (2, "b"), (3, "c")}
+        assert isinstance(result.errors["killmails"][(4, "d")], ApiException)
+        assert set(result.data["affiliations"]) == {10, 11, 12}
+        assert list(result.errors["affiliations"]) == [INVALID_ID]
+        assert api.named("affiliation")[0] == [10, 11, 12, INVALID_ID]
+        assert sorted(api.named("type")) == [587, 603]
+
+        # Types of the fast killmails were fetched while the slow one was still in flight
+        slow_done = next(at for call, value, at in api.calls if call == "killmail" and value == 3)
+        first_type = min(at for call, _, at in api.calls if call == "type")
+        assert first_type < slow_done
+
+    def test_dedupes_against_cache(self):
+        """Test that a second run only fetches keys missing from the node caches."""
+        graph, api = make_graph()
+        graph.run({"killmails": [(1, "a")]})
+        api.calls.clear()
+        result = graph.run({"killmails": [(1, "a"), (2, "b")]})
+        assert api.named("killmail") == [2]
+        assert api.named("type") == [603]
+        # Failed keys are not cached, so only the invalid id is asked again
+        assert api.named("affiliation") == [[INVALID_ID]]
+        assert set(result.data["affiliations"]) == {10, 11}
+
+    def test_rejects_cycles_and_unknown_nodes(self):
+        """Test that edges closing a cycle and unknown node names raise ValueError."""
+        graph, _ = make_graph()
+        with pytest.raises(ValueError):
+            graph.edge("types", "killmails", lambda item: [])
+        with pytest.raises(ValueError):
+            graph.run({"names": [1]})
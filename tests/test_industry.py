@@ -0,0 +1,68 @@
+"""Tests for the industry price feed."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from pyesi_client import EsiIndustryActivity, EsiIndustryFeed
+
+np = pytest.importorskip("numpy")
+
+HEADERS = {"Expires": "Wed, 01 Jan 2099 00:00:00 GMT"}
+
+
+class FakeApi:
+    def __init__(self):
+        self.calls = 0
+
+    def get_markets_prices_with_http_info(self):
+        self.calls += 1
+        prices = [
+            SimpleNamespace(type_id=35, adjusted_price=20.0, average_price=None),
+            SimpleNamespace(type_id=34, adjusted_price=10.0, average_price=11.0),
+        ]
+        return SimpleNamespace(data=prices, headers=HEADERS)
+
+    def get_industry_systems_with_http_info(self):
+        self.calls += 1
+        systems = [
+            SimpleNamespace(
+                solar_system_id=30000142,
+                cost_indices=[
+                    SimpleNamespace(activity="manufacturing", cost_index=0.1),
+                    SimpleNamespace(activity="invention", cost_index=0.2),
+                ],
+            ),
+            SimpleNamespace(
+                solar_system_id=30000144, cost_indices=[SimpleNamespace(activity="manufacturing", cost_index=0.05)]
+            ),
+        ]
+        return SimpleNamespace(data=systems, headers=HEADERS)
+
+
+def make_feed() -> tuple[EsiIndustryFeed, FakeApi]:
+    api = FakeApi()
+    return EsiIndustryFeed(SimpleNamespace(market=api, industry=api)), api  # type: ignore[arg-type]
+
+
+class TestEsiIndustryFeed:
+    """Tests for EsiIndustryFeed."""
+
+    def test_lookups(self):
+        """Test vectorized price and cost index lookups, with NaN for unknown ids."""
+        feed, api = make_feed()
+        np.testing.assert_array_equal(feed.adjusted_price([34, 35, 36]), [10.0, 20.0, np.nan])
+        np.testing.assert_array_equal(feed.average_price([35]), [np.nan])
+        np.testing.assert_array_equal(
+            feed.cost_index([30000144, 30000142], EsiIndustryActivity.INVENTION), [np.nan, 0.2]
+        )
+        feed.cost_index([30000142])
+        assert api.calls == 2
+
+    def test_job_costs(self):
+        """Test estimated item values and the blueprint by system cost matrix."""
+        feed, _ = make_feed()
+        values = feed.estimated_item_values([[34, 35], [34, 0]], [[10, 5], [100, 0]])
+        np.testing.assert_array_equal(values, [200.0, 1000.0])
+        costs = feed.job_costs(values, [30000142, 30000144], runs=[1, 2], facility_tax=0.01)
+        np.testing.assert_allclose(costs, [[200 * 0.15, 200 * 0.10], [2000 * 0.15, 2000 * 0.10]])
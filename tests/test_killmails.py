@@ -0,0 +1,192 @@
+"""Tests for the blob store and killmail pipeline."""
+
+import json
+import time
+from datetime import date
+
+import pytest
+from pyesi_openapi import ApiException
+from pyesi_openapi.api_response import ApiResponse
+from pyesi_openapi.models import CharactersCharacterIdKillmailsRecentGetInner, KillmailsKillmailIdKillmailHashGet
+
+from pyesi_client import EsiBlobStore, EsiExecutorMode, EsiKillmailPipeline, EsiParseExecutor
+
+RECENT = list[CharactersCharacterIdKillmailsRecentGetInner]
+
+
+def make_killmail(killmail_id: int) -> dict:
+    return {
+        "killmail_id": killmail_id,
+        "killmail_time": "2025-09-01T12:00:00Z",
+        "solar_system_id": 30000142,
+        "victim": {"damage_taken": 1000, "ship_type_id": 587},
+        "attackers": [{"damage_done": 1000, "final_blow": True, "security_status": 0.5}],
+    }
+
+
+class FakeRawResponse:
+    """urllib3 response stand-in."""
+
+    def __init__(self, body: dict | bytes, status: int = 200):
+        self.status = status
+        self.reason = "OK"
+        self.data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.headers = {}
+
+    def release_conn(self) -> None:
+        pass
+
+
+class FakeKillmailsApi:
+    """Generated API stand-in recording killmail downloads."""
+
+    def __init__(self):
+        self.downloads: list[int] = []
+
+    def get_characters_character_id_killmails_recent(self, **kwargs) -> RECENT:
+        raise NotImplementedError
+
+    def get_corporations_corporation_id_killmails_recent(self, **kwargs) -> RECENT:
+        raise NotImplementedError
+
+    def get_killmails_killmail_id_killmail_hash_data(self, **kwargs) -> KillmailsKillmailIdKillmailHashGet:
+        raise NotImplementedError
+
+    def get_killmails_killmail_id_killmail_hash_without_preload_content(self, killmail_id, killmail_hash):
+        self.downloads.append(killmail_id)
+        if killmail_hash == "bad":
+            return FakeRawResponse({"error": "Invalid killmail_id and/or killmail_hash"}, status=422)
+        if killmail_hash == "truncated":
+            return FakeRawResponse(json.dumps(make_killmail(killmail_id)).encode()[:40])
+        return FakeRawResponse(make_killmail(killmail_id))
+
+
+class FakeRouter:
+    """Router stand-in serving recent killmail lists, two pages per list."""
+
+    def __init__(self):
+        self.lists = {
+            ("character_id", 1): [[(10, "a"), (11, "b")], [(12, "c")]],
+            ("character_id", 2): [[(11, "b")], [(13, "d")]],
+            ("corporation_id", 100): [[(10, "a"), (14, "e")], []],
+            ("corporation_id", 200): [[(15, "bad"), (16, "f")], [(17, "g")]],
+        }
+
+    def call(self, func, /, *, page, **kwargs):
+        ((param, value),) = kwargs.items()
+        pages = self.lists[(param, value)]
+        data = [
+            CharactersCharacterIdKillmailsRecentGetInner(killmail_id=killmail_id, killmail_hash=killmail_hash)
+            for killmail_id, killmail_hash in pages[page - 1]
+        ]
+        return ApiResponse(status_code=200, headers={"X-Pages": str(len(pages))}, data=data, raw_data=b"")
+
+
+class FakeClient:
+    def __init__(self):
+        self.killmails = FakeKillmailsApi()
+        self.router = FakeRouter()
+        self.executor = EsiParseExecutor(EsiExecutorMode.INLINE)
+        self.compatibility_date = date(2025, 8, 26)
+
+
+class TestEsiBlobStore:
+    """Tests for EsiBlobStore."""
+
+    @pytest.mark.parametrize("persistent", [False, True])
+    def test_get_put_and_expiry(self, tmp_path, persistent):
+        """Test lookups, namespaces and expiry in memory and on disk."""
+        store = EsiBlobStore(tmp_path / "blobs.sqlite3" if persistent else None)
+        store.put("a", "1", b"one")
+        store.put("b", "1", b"other")
+        store.put("a", "2", b"two", expires_at=int(time.time()) - 1)
+        assert store.get_many("a", ["1", "2", "3"]) == {"1": b"one"}
+        assert store.get("b", "1") == b"other"
+        store.clear("a")
+        assert store.get("a", "1") is None
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test that a second store on the same file sees earlier writes."""
+        EsiBlobStore(tmp_path / "blobs.sqlite3").put_many("a", {str(i): b"x" for i in range(1200)})
+        assert len(EsiBlobStore(tmp_path / "blobs.sqlite3").get_many("a", [str(i) for i in range(1200)])) == 1200
+
+
+class TestEsiKillmailPipeline:
+    """Tests for EsiKillmailPipeline."""
+
+    def test_recent_refs_deduplicated_across_lists(self):
+        """Test that every page of every list is read and duplicates collapse."""
+        pipeline = EsiKillmailPipeline(FakeClient())  # type: ignore[arg-type]
+        refs = pipeline.recent_refs(character_ids=[1, 2], corporation_ids=[100])
+        assert refs == {10: "a", 11: "b", 12: "c", 13: "d", 14: "e"}
+
+    def test_stored_killmails_not_refetched(self, tmp_path):
+        """Test that a killmail is downloaded once, even by a new pipeline sharing the store."""
+        client = FakeClient()
+        path = tmp_path / "killmails.sqlite3"
+        first = list(EsiKillmailPipeline(client, store=EsiBlobStore(path)).fetch({10: "a", 11: "b"}))  # type: ignore[arg-type]
+        second = list(EsiKillmailPipeline(client, store=EsiBlobStore(path)).fetch([(10, "a"), (12, "c")]))  # type: ignore[arg-type]
+        assert sorted(killmail.killmail_id for killmail in first) == [10, 11]
+        assert sorted(killmail.killmail_id for killmail in second) == [10, 12]
+        assert sorted(client.killmails.downloads) == [10, 11, 12]
+
+    def test_ingest_yields_each_killmail_once(self):
+        """Test that repeated ingestion only yields killmails not seen before."""
+        pipeline = EsiKillmailPipeline(FakeClient())  # type: ignore[arg-type]
+        assert len(list(pipeline.ingest(character_ids=[1]))) == 3
+        assert sorted(killmail.killmail_id for killmail in pipeline.ingest(character_ids=[1, 2])) == [13]
+
+    def test_failed_download_skipped(self):
+        """Test that an ESI error only skips its killmail, is reported, and nothing is stored for it."""
+        pipeline = EsiKillmailPipeline(FakeClient())  # type: ignore[arg-type]
+        errors: dict[int, Exception] = {}
+        killmails = list(pipeline.fetch({15: "bad", 16: "f"}, errors=errors))
+        assert [killmail.killmail_id for killmail in killmails] == [16]
+        assert isinstance(errors[15], ApiException) and errors[15].status == 422
+        assert pipeline.store.get_many(pipeline._namespace, ["15:bad", "16:f"]).keys() == {"16:f"}
+
+    def test_ingest_retries_only_undelivered(self):
+        """Test that failed or unread killmails are offered again and delivered ones are not."""
+        client = FakeClient()
+        pipeline = EsiKillmailPipeline(client)  # type: ignore[arg-type]
+        stream = pipeline.ingest(corporation_ids=[200])
+        first = next(stream)
+        stream.close()
+        rest = list(pipeline.ingest(corporation_ids=[200]))
+        assert sorted([first.killmail_id] + [killmail.killmail_id for killmail in rest]) == [16, 17]
+        client.killmails.downloads.clear()
+        assert list(pipeline.ingest(corporation_ids=[200])) == []
+        assert client.killmails.downloads == [15]
+
+    def test_unparseable_body_not_stored(self):
+        """Test that a body that fails to parse is never stored, and a stored one is dropped."""
+        client = FakeClient()
+        pipeline = EsiKillmailPipeline(client)  # type: ignore[arg-type]
+        errors: dict[int, Exception] = {}
+        assert list(pipeline.fetch({18: "truncated"}, errors=errors)) == []
+        assert list(errors) == [18]
+        assert pipeline.store.get(pipeline._namespace, "18:truncated") is None
+
+        pipeline.store.put(pipeline._namespace, "19:h", b"{")
+        assert list(pipeline.fetch({19: "h"})) == []
+        assert pipeline.store.get(pipeline._namespace, "19:h") is None
+        assert [killmail.killmail_id for killmail in pipeline.fetch({19: "h"})] == [19]
+        assert client.killmails.downloads == [18, 19]
+
+    def test_downloads_parsed_by_executor(self):
+        """Test that downloaded bodies are parsed on the executor's threads and stored."""
+        client = FakeClient()
+        client.executor = EsiParseExecutor(EsiExecutorMode.THREAD)
+        client.executor.min_offload_bytes = 0
+        pipeline = EsiKillmailPipeline(client)  # type: ignore[arg-type]
+        refs = {killmail_id: "h" for killmail_id in range(100, 140)}
+        killmails = list(pipeline.fetch(refs))
+        client.executor.shutdown()
+        assert sorted(killmail.killmail_id for killmail in killmails) == list(refs)
+        assert len(pipeline.store.get_many(pipeline._namespace, [f"{killmail_id}:h" for killmail_id in refs])) == 40
+
+    def test_ingested_ids_bounded(self):
+        """Test that only the most recently listed ingested ids are remembered."""
+        pipeline = EsiKillmailPipeline(FakeClient(), ingested_size=2)  # type: ignore[arg-type]
+        assert len(list(pipeline.ingest(character_ids=[1]))) == 3
+        assert list(pipeline._ingested) == [11, 12]
@@ -0,0 +1,137 @@
+"""Tests for the sovereignty and faction warfare map state."""
+
+from types import SimpleNamespace
+
+import pytest
+from pyesi_openapi import ApiException
+
+from pyesi_client import EsiMapEventType, EsiMapState
+
+HEADERS = {"Expires": "Wed, 01 Jan 2099 00:00:00 GMT", "ETag": '"v1"'}
+
+
+class FakeMapApi:
+    """Sovereignty and faction warfare endpoints answering 304 when the ETag matches."""
+
+    def __init__(self):
+        self.version = 1
+        self.calls = 0
+        self.stats_failing = False
+        self.fw_failing = False
+        self.map = [SimpleNamespace(system_id=1, alliance_id=100, corporation_id=10, faction_id=None)]
+        self.structures = [SimpleNamespace(solar_system_id=1, vulnerability_occupancy_level=2.0)]
+        self.campaigns = [SimpleNamespace(campaign_id=7, solar_system_id=1)]
+        self.fw = [
+            SimpleNamespace(
+                solar_system_id=2,
+                owner_faction_id=500001,
+                occupier_faction_id=500001,
+                contested="contested",
+                victory_points=1000,
+                victory_points_threshold=4000,
+            )
+        ]
+
+    def _respond(self, data, if_none_match):
+        self.calls += 1
+        etag = f'"v{self.version}"'
+        if if_none_match == etag:
+            raise ApiException(status=304)
+        return SimpleNamespace(data=data, headers=HEADERS | {"ETag": etag})
+
+    def get_sovereignty_map_with_http_info(self, if_none_match=None):
+        return self._respond(self.map, if_none_match)
+
+    def get_sovereignty_structures_with_http_info(self, if_none_match=None):
+        return self._respond(self.structures, if_none_match)
+
+    def get_sovereignty_campaigns_with_http_info(self, if_none_match=None):
+        return self._respond(self.campaigns, if_none_match)
+
+    def get_fw_systems_with_http_info(self, if_none_match=None):
+        if self.fw_failing:
+            raise ApiException(status=503)
+        return self._respond(self.fw, if_none_match)
+
+    def get_fw_stats_with_http_info(self, if_none_match=None):
+        if self.stats_failing:
+            raise ApiException(status=503)
+        return self._respond([SimpleNamespace(faction_id=500001, systems_controlled=1)], if_none_match)
+
+
+def make_state() -> tuple[EsiMapState, FakeMapApi]:
+    api = FakeMapApi()
+    client = SimpleNamespace(sovereignty=api, faction_warfare=api)
+    return EsiMapState(client), api  # type: ignore[arg-type]
+
+
+class TestEsiMapState:
+    """Tests for EsiMapState."""
+
+    def test_snapshot(self):
+        """Test that feeds merge into one state per system and are not refetched before they expire."""
+        state, api = make_state()
+        assert state.poll() == []
+        system = state.system(1)
+        assert system is not None
+        assert (system.owner_id, system.adm, system.campaign_ids) == (100, 2.0, frozenset({7}))
+        fw_system = state.system(2)
+        assert fw_system is not None
+        assert fw_system.fw_progress == pytest.approx(0.25)
+        assert state.faction_stats[500001].systems_controlled == 1
+        assert state.poll() == [] and api.calls == 5
+
+    def test_change_events(self):
+        """Test that changes between polls reach subscribers, and unchanged feeds answer 304."""
+        state, api = make_state()
+        state.poll()
+        received = []
+        state.subscribe(received.append)
+
+        assert state.poll(force=True) == []
+        api.version = 2
+        api.map[0].alliance_id = 200
+        api.campaigns.clear()
+        api.fw[0].victory_points = 3000
+        events = state.poll(force=True)
+        assert [(event.type, event.system_id, event.value) for event in events] == [
+            (EsiMapEventType.OWNER_CHANGED, 1, None),
+            (EsiMapEventType.CAMPAIGN_ENDED, 1, 7),
+            (EsiMapEventType.CONTESTED_THRESHOLD, 2, 0.5),
+            (EsiMapEventType.CONTESTED_THRESHOLD, 2, 0.75),
+        ]
+        assert received == events
+        assert events[0].previous.alliance_id == 100 and events[0].current.alliance_id == 200
+
+    def test_failing_feed_does_not_hold_back_others(self):
+        """Test that feeds that changed are applied and reported when another feed fails."""
+        state, api = make_state()
+        state.poll()
+        received = []
+        state.subscribe(received.append)
+
+        api.version = 2
+        api.map[0].alliance_id = 200
+        api.stats_failing = True
+        with pytest.raises(ApiException):
+            state.poll(force=True)
+        system = state.system(1)
+        assert system is not None and system.owner_id == 200
+        assert [event.type for event in received] == [EsiMapEventType.OWNER_CHANGED]
+
+    def test_feed_failing_on_first_poll_is_baseline(self):
+        """Test that a feed loading after failing on the first poll does not report its systems as changed."""
+        state, api = make_state()
+        api.fw_failing = True
+        with pytest.raises(ApiException):
+            state.poll()
+        assert state.system(2) is None
+
+        api.fw_failing = False
+        assert state.poll() == []
+        assert state.system(2) is not None
+
+        api.version = 2
+        api.fw[0].occupier_faction_id = 500002
+        events = state.poll(force=True)
+        assert [(event.type, event.system_id) for event in events] == [(EsiMapEventType.OCCUPIER_CHANGED, 2)]
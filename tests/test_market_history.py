@@ -0,0 +1,112 @@
+"""Tests for market history storage and loading."""
+
+import json
+from datetime import UTC, date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from pyesi_client import EsiExecutorMode, EsiMarketHistory, EsiMarketHistoryLoader, EsiParseExecutor
+
+
+def make_rows(start: date, count: int, price: float = 10.0, volume: int = 100) -> dict[str, list]:
+    dates = [start + timedelta(days=offset) for offset in range(count)]
+    return {
+        "date": dates,
+        "average": [price + offset for offset in range(count)],
+        "highest": [price + offset + 1 for offset in range(count)],
+        "lowest": [price + offset - 1 for offset in range(count)],
+        "volume": [volume] * count,
+        "order_count": [5] * count,
+    }
+
+
+class FakeResponse:
+    def __init__(self, status: int, data: bytes):
+        self.status = status
+        self.reason = "OK"
+        self.data = data
+        self.headers = {}
+
+    def release_conn(self):
+        pass
+
+
+class FakeMarketApi:
+    """History endpoint serving the last three days for every type but 404 and 500."""
+
+    def __init__(self):
+        self.requested: list[int] = []
+
+    def get_markets_region_id_history_data(self, region_id: int, type_id: int) -> list[dict]:
+        raise AssertionError("history is fetched raw")
+
+    def get_markets_region_id_history_without_preload_content(self, region_id: int, type_id: int):
+        self.requested.append(type_id)
+        if type_id in (404, 500):
+            return FakeResponse(type_id, b"")
+        today = datetime.now(UTC).date()
+        rows = [
+            {"date": (today - timedelta(days=days)).isoformat(), "average": 5.0, "highest": 6.0, "lowest": 4.0}
+            | {"volume": 10, "order_count": 1}
+            for days in (3, 2, 1)
+        ]
+        return FakeResponse(200, json.dumps(rows).encode())
+
+
+class TestEsiMarketHistory:
+    """Tests for EsiMarketHistory."""
+
+    def test_append_only_new_days(self, tmp_path):
+        """Test that appends skip stored days and survive a save."""
+        history = EsiMarketHistory(10000002)
+        assert history.append(34, make_rows(date(2025, 1, 1), 5)) == 5
+        assert history.append(34, make_rows(date(2025, 1, 3), 5)) == 2
+        history.save(tmp_path / "history.bin")
+        loaded = EsiMarketHistory.load(tmp_path / "history.bin")
+        assert loaded.last_date(34) == date(2025, 1, 7)
+        assert list(loaded.series(34)["volume"]) == [100] * 7
+
+    def test_aggregates(self):
+        """Test moving averages and volume-weighted prices."""
+        np = pytest.importorskip("numpy")
+        history = EsiMarketHistory(10000002)
+        history.append(34, make_rows(date(2025, 1, 1), 4, price=10.0, volume=100))
+        history.append(35, make_rows(date(2025, 1, 3), 2, price=100.0, volume=0))
+        np.testing.assert_array_equal(history.moving_average(34, 2), [np.nan, 10.5, 11.5, 12.5])
+        type_ids, prices = history.volume_weighted_prices(days=2)
+        assert list(type_ids) == [34, 35]
+        np.testing.assert_array_equal(prices, [12.5, np.nan])
+
+
+class TestEsiMarketHistoryLoader:
+    """Tests for EsiMarketHistoryLoader."""
+
+    def test_update_skips_current_types(self, tmp_path):
+        """Test that types already holding yesterday are not requested again."""
+        market = FakeMarketApi()
+        client = SimpleNamespace(market=market, executor=EsiParseExecutor(EsiExecutorMode.INLINE))
+        loader = EsiMarketHistoryLoader(client, cache_dir=tmp_path)  # type: ignore[arg-type]
+        history = loader.update(10000002, [34, 35, 404])
+        assert sorted(market.requested) == [34, 35, 404]
+        assert len(history.series(34)["dates"]) == 3
+        assert 404 not in history
+
+        market.requested.clear()
+        loader.update(10000002, [34, 36])
+        assert market.requested == [36]
+        assert loader.load(10000002).type_ids == [34, 35, 36]
+
+    def test_update_saves_when_a_type_fails(self, tmp_path):
+        """Test that a failing type is reported and skipped while the other types are saved."""
+        market = FakeMarketApi()
+        client = SimpleNamespace(market=market, executor=EsiParseExecutor(EsiExecutorMode.INLINE))
+        loader = EsiMarketHistoryLoader(client, cache_dir=tmp_path)  # type: ignore[arg-type]
+        errors: dict[int, Exception] = {}
+        loader.update(10000002, [34, 500, 35], errors=errors)
+        assert list(errors) == [500]
+        assert loader.load(10000002).type_ids == [34, 35]
+
+        market.requested.clear()
+        loader.update(10000002, [34, 35, 500])
+        assert market.requested == [500]
@@ -0,0 +1,151 @@
+"""Tests for SSO metadata persistence and stale-while-revalidate."""
+
+import json
+import threading
+import time
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+from jwt.algorithms import ECAlgorithm
+from pyesi_openapi import ApiException
+
+from pyesi_client import EsiMetadataManager
+from pyesi_client.constants import DEFAULT_ESI_ENDPOINTS_URL
+
+METADATA = {
+    "issuer": "https://login.eveonline.com",
+    "authorization_endpoint": "https://login.eveonline.com/v2/oauth/authorize",
+    "token_endpoint": "https://login.eveonline.com/v2/oauth/token",
+    "jwks_uri": "https://login.eveonline.com/oauth/jwks",
+    "revocation_endpoint": "https://login.eveonline.com/v2/oauth/revoke",
+}
+JWKS = {
+    "keys": [
+        {
+            "alg": "ES256",
+            "crv": "P-256",
+            "kid": "JWT-Signature-Key",
+            "kty": "EC",
+            "use": "sig",
+            "x": "x",
+            "y": "y",
+        }
+    ],
+    "SkipUnresolvedJsonWebKeys": True,
+}
+
+
+class FakeResponse:
+    def __init__(self, status: int, body: dict | None = None):
+        self.status = status
+        self.data = json.dumps(body or {}).encode()
+
+    def read(self) -> bytes:
+        return self.data
+
+
+class FakeApiClient:
+    """API client stand-in serving SSO documents, optionally failing."""
+
+    def __init__(self, metadata: dict | None = None, jwks: dict | None = None):
+        self.calls: list[str] = []
+        self.failing = False
+        self.delay = 0.0
+        self.metadata = metadata or METADATA
+        self.jwks = jwks or JWKS
+
+    def call_api(self, method: str, url: str, **kwargs) -> FakeResponse:
+        self.calls.append(url)
+        time.sleep(self.delay)
+        if self.failing:
+            return FakeResponse(503)
+        return FakeResponse(200, self.jwks if url.endswith("jwks") else self.metadata)
+
+
+class TestEsiMetadataManager:
+    """Tests for EsiMetadataManager caching."""
+
+    def test_persisted_documents_start_warm(self, tmp_path):
+        """Test that a second manager loads metadata and keys without fetching."""
+        first = EsiMetadataManager(FakeApiClient(), cache_dir=tmp_path)  # type: ignore[arg-type]
+        assert first.get_jwk("JWT-Signature-Key") is not None
+
+        api_client = FakeApiClient()
+        second = EsiMetadataManager(api_client, cache_dir=tmp_path)  # type: ignore[arg-type]
+        assert second.get_jwk("JWT-Signature-Key") is not None
+        assert second.issuer == METADATA["issuer"]
+        assert api_client.calls == []
+
+    def test_stale_documents_served_when_sso_is_down(self, tmp_path):
+        """Test that expired documents are served when refreshing fails."""
+        api_client = FakeApiClient()
+        manager = EsiMetadataManager(api_client, cache_dir=tmp_path, stale_while_revalidate=False)  # type: ignore[arg-type]
+        manager.fetch_jwks()
+        manager._metadata_expires_at = manager._jwks_expires_at = int(time.time()) - 1
+
+        api_client.failing = True
+        assert manager.get_jwk("JWT-Signature-Key") is not None
+        assert manager.discover_metadata().jwks_uri == METADATA["jwks_uri"]
+        assert manager._jwks_expires_at > time.time()
+
+    def test_stale_documents_revalidated_in_background(self):
+        """Test that expired documents are returned immediately and refreshed in the background."""
+        api_client = FakeApiClient()
+        manager = EsiMetadataManager(api_client)  # type: ignore[arg-type]
+        manager.fetch_jwks()
+        manager._jwks_expires_at = int(time.time()) - 1
+        calls = len(api_client.calls)
+
+        assert manager.fetch_jwks() is not None
+        deadline = time.time() + 5
+        while manager._jwks_expires_at <= time.time() and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(api_client.calls) == calls + 1
+
+    def test_first_fetch_failure_raises(self):
+        """Test that failures without any cached copy propagate."""
+        api_client = FakeApiClient()
+        api_client.failing = True
+        manager = EsiMetadataManager(api_client)  # type: ignore[arg-type]
+        with pytest.raises(ApiException):
+            manager.discover_metadata()
+
+    def test_derived_metadata_replaced_on_refresh(self):
+        """Test that endpoints and issuer are reused until metadata is fetched again."""
+        api_client = FakeApiClient()
+        manager = EsiMetadataManager(api_client)  # type: ignore[arg-type]
+        endpoints = manager.endpoints
+        assert manager.endpoints is endpoints
+        assert len(api_client.calls) == 1
+
+        api_client.metadata = {**METADATA, "token_endpoint": "https://sso.example/token", "issuer": "sso.example"}
+        manager.discover_metadata(force=True)
+        assert manager.endpoints.token_endpoint == "https://sso.example/token"
+        assert manager.issuer == "sso.example"
+
+    def test_signing_key_parsed_once_per_key_set(self):
+        """Test that the parsed public key is cached until the key set is refreshed."""
+        jwk = json.loads(ECAlgorithm.to_jwk(ec.generate_private_key(ec.SECP256R1()).public_key()))
+        jwks = {"keys": [{**jwk, "alg": "ES256", "kid": "JWT-Signature-Key", "use": "sig"}]}
+        manager = EsiMetadataManager(FakeApiClient(jwks=jwks))  # type: ignore[arg-type]
+
+        key = manager.get_signing_key("JWT-Signature-Key")
+        assert key is not None
+        assert manager.get_signing_key("JWT-Signature-Key") is key
+        manager.fetch_jwks(force=True)
+        assert manager.get_signing_key("JWT-Signature-Key") is not key
+
+    def test_cold_start_fetches_once_across_threads(self):
+        """Test that threads needing keys before any are cached share one fetch of each document."""
+        api_client = FakeApiClient()
+        api_client.delay = 0.05
+        manager = EsiMetadataManager(api_client)  # type: ignore[arg-type]
+        keys: list[object] = []
+
+        workers = [threading.Thread(target=lambda: keys.append(manager.get_jwk("JWT-Signature-Key"))) for _ in range(8)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert api_client.calls == [DEFAULT_ESI_ENDPOINTS_URL, METADATA["jwks_uri"]]
+        assert len(keys) == 8 and None not in keys
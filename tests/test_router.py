@@ -0,0 +1,124 @@
+"""Tests for the operation index and character router."""
+
+import threading
+
+import pytest
+from pyesi_openapi import ApiClient, ApiException, Configuration
+
+from pyesi_client import EsiCharacterRouter, EsiClient, EsiCorporationRole, EsiScope, EsiTokenPool
+from pyesi_client.core.operations import get_operation_index, operation_name
+from pyesi_client.models import EsiJwtTokenData
+
+
+class FakeAuth:
+    """Auth stand-in returning a fixed verified token."""
+
+    def __init__(self, character_id: int, scopes: list[EsiScope]):
+        self.access_token = f"token-{character_id}"
+        self._token = EsiJwtTokenData(
+            scp=scopes,
+            jti="jti",
+            kid="JWT-Signature-Key",
+            sub=f"CHARACTER:EVE:{character_id}",
+            azp="client",
+            tenant="tranquility",
+            tier="live",
+            region="world",
+            aud=["client", "EVE Online"],
+            name=f"Character {character_id}",
+            owner="owner",
+            exp=0,
+            iat=0,
+            iss="https://login.eveonline.com",
+        )
+
+    def verify(self) -> EsiJwtTokenData:
+        return self._token
+
+
+def make_pool() -> EsiTokenPool:
+    pool = EsiTokenPool(ApiClient(Configuration()), "client")
+    corp_assets = [EsiScope.ASSETS_READ_CORPORATION_ASSETS]
+    pool.add(FakeAuth(1, corp_assets), corporation_id=100, roles=[EsiCorporationRole.DIRECTOR])  # type: ignore[arg-type]
+    pool.add(FakeAuth(2, corp_assets), corporation_id=100, roles=[EsiCorporationRole.TRADER])  # type: ignore[arg-type]
+    pool.add(FakeAuth(3, corp_assets), corporation_id=200, roles=[EsiCorporationRole.DIRECTOR])  # type: ignore[arg-type]
+    pool.add(FakeAuth(4, corp_assets), corporation_id=100, roles=[EsiCorporationRole.DIRECTOR])  # type: ignore[arg-type]
+    return pool
+
+
+class TestEsiOperationIndex:
+    """Tests for the operation index built from pyesi_openapi."""
+
+    def test_every_authenticated_operation_has_a_scope(self):
+        """Test that the scope table covers every OAuth2 operation."""
+        index = get_operation_index()
+        assert [operation.name for operation in index if operation.requires_auth and not operation.scope] == []
+
+    def test_operation_metadata(self):
+        """Test the metadata of a corporation endpoint."""
+        operation = get_operation_index().get("get_corporations_corporation_id_assets")
+        assert operation.api == "assets"
+        assert operation.method == "GET"
+        assert operation.path == "/corporations/{corporation_id}/assets"
+        assert operation.path_params == ("corporation_id",)
+        assert operation.scope == EsiScope.ASSETS_READ_CORPORATION_ASSETS
+        assert EsiCorporationRole.DIRECTOR in operation.roles
+
+    def test_operation_name_strips_variants(self):
+        """Test that generated method variants share one operation id."""
+        assert operation_name("get_status_with_http_info") == "get_status"
+        assert operation_name("get_status_without_preload_content") == "get_status"
+        assert operation_name("get_status_data") == "get_status"
+
+
+class TestEsiCharacterRouter:
+    """Tests for EsiCharacterRouter."""
+
+    def test_eligible_filters_by_corporation_and_roles(self):
+        """Test that only directors of the requested corporation are eligible."""
+        router = EsiCharacterRouter(make_pool())
+        assert router.eligible("get_corporations_corporation_id_assets", corporation_id=100) == (1, 4)
+        assert router.eligible("get_corporations_corporation_id_assets", corporation_id=200) == (3,)
+        assert router.eligible("get_characters_character_id_assets") == ()
+
+    def test_call_spreads_load_and_sets_auth(self):
+        """Test that calls rotate over eligible characters with their own tokens."""
+        router = EsiCharacterRouter(make_pool())
+        seen = []
+
+        def get_corporations_corporation_id_assets(**kwargs):
+            seen.append(kwargs["_request_auth"]["value"])
+            return []
+
+        for _ in range(4):
+            router.call(get_corporations_corporation_id_assets, corporation_id=100)
+        assert seen == ["Bearer token-1", "Bearer token-4", "Bearer token-1", "Bearer token-4"]
+
+    def test_forbidden_character_is_excluded(self):
+        """Test that a character refused with 403 is no longer routed to."""
+        router = EsiCharacterRouter(make_pool())
+
+        def get_corporations_corporation_id_assets(**kwargs):
+            if kwargs["_request_auth"]["value"] == "Bearer token-1":
+                raise ApiException(status=403, reason="Forbidden")
+            return []
+
+        with pytest.raises(ApiException):
+            router.call(get_corporations_corporation_id_assets, corporation_id=100)
+        assert router.eligible("get_corporations_corporation_id_assets", corporation_id=100) == (4,)
+
+    def test_no_eligible_character(self):
+        """Test that routing fails fast when no character qualifies."""
+        router = EsiCharacterRouter(make_pool())
+        with pytest.raises(ValueError):
+            router.select("get_corporations_corporation_id_assets", corporation_id=300)
+
+    def test_client_router_before_token_pool(self):
+        """Test that a fresh client's router creates its token pool without deadlocking."""
+        client = EsiClient("client")
+        routers = []
+        thread = threading.Thread(target=lambda: routers.append(client.router), daemon=True)
+        thread.start()
+        thread.join(5)
+        assert routers and routers[0].pool is client.token_pool
+        client.close()
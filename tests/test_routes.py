@@ -0,0 +1,72 @@
+"""Tests for the local route engine."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from pyesi_client import EsiRouteEngine, EsiRouteFlag, EsiUniverseTables
+
+
+def make_tables() -> EsiUniverseTables:
+    # Highsec line 1-2-3-4 with a lowsec shortcut 1-5-4, and an unconnected system 6
+    gates = [(1, 2), (2, 3), (3, 4), (1, 5), (5, 4)]
+    return EsiUniverseTables.build(
+        "2025-08-26",
+        systems=[
+            (1, 20, 10, 0.9),
+            (2, 20, 10, 0.8),
+            (3, 20, 10, 0.5),
+            (4, 20, 10, 0.7),
+            (5, 21, 10, 0.2),
+            (6, 22, 11, 1.0),
+        ],
+        gates=gates + [(destination, source) for source, destination in gates],
+    )
+
+
+class FakeRoutesApi:
+    def __init__(self):
+        self.calls: list[dict] = []
+
+    def get_route_origin_destination_data(self, **kwargs) -> list[int]:
+        self.calls.append(kwargs)
+        return [kwargs["origin"], kwargs["destination"]]
+
+
+class TestEsiRouteEngine:
+    """Tests for EsiRouteEngine."""
+
+    def test_flags(self):
+        """Test that security preferences pick the expected route."""
+        engine = EsiRouteEngine(make_tables())
+        assert engine.route(1, 4) == [1, 5, 4]
+        assert engine.route(1, 4, flag=EsiRouteFlag.SECURE) == [1, 2, 3, 4]
+        assert engine.route(1, 4, flag=EsiRouteFlag.INSECURE) == [1, 5, 4]
+        assert engine.jumps(4, 1) == 2
+
+    def test_avoid_and_connections(self):
+        """Test that avoided systems are skipped and connections add links."""
+        engine = EsiRouteEngine(make_tables())
+        assert engine.route(1, 4, avoid=[5]) == [1, 2, 3, 4]
+        assert engine.route(1, 6, connections=[(4, 6)]) == [1, 5, 4, 6]
+        with pytest.raises(ValueError):
+            engine.route(1, 6)
+
+    def test_batch_queries_share_searches(self):
+        """Test that batch queries run one search per distinct origin."""
+        engine = EsiRouteEngine(make_tables())
+        routes = engine.routes([(1, 4), (2, 4), (1, 3), (1, 6)])
+        assert routes == [[1, 5, 4], [2, 3, 4], [1, 2, 3], None]
+        assert len(engine._searches) == 2
+        assert engine.jump_matrix([1, 6], [4, 6]) == [[2, None], [None, 0]]
+
+    def test_esi_fallback(self):
+        """Test that systems missing from the tables are routed by ESI."""
+        client = SimpleNamespace(routes=FakeRoutesApi())
+        engine = EsiRouteEngine(make_tables(), client=client)  # type: ignore[arg-type]
+        assert engine.route(1, 99, flag=EsiRouteFlag.SECURE, avoid=[5]) == [1, 99]
+        assert client.routes.calls == [
+            {"origin": 1, "destination": 99, "flag": "secure", "avoid": [5], "connections": None}
+        ]
+        with pytest.raises(ValueError):
+            EsiRouteEngine(None).route(1, 4)
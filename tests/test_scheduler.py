@@ -0,0 +1,97 @@
+"""Tests for the request scheduler."""
+
+import asyncio
+import threading
+import time
+
+from pyesi_client import EsiPriority, EsiRequestScheduler
+from pyesi_client.core.scheduler import ContextThreadPoolExecutor, request_context
+
+
+def run_queued(scheduler: EsiRequestScheduler, requests: list[tuple[EsiPriority, str]]) -> list[str]:
+    """Queue requests behind one held slot, release it and return the tenants in service order."""
+    served: list[str] = []
+    scheduler.acquire()
+
+    def request(priority: EsiPriority, tenant: str) -> None:
+        with request_context(priority, tenant), scheduler.slot():
+            served.append(tenant)
+
+    threads = []
+    for priority, tenant in requests:
+        threads.append(threading.Thread(target=request, args=(priority, tenant)))
+        threads[-1].start()
+        # Wait until queued, so arrival order is deterministic
+        while scheduler.waiting < len(threads):
+            time.sleep(0.001)
+    scheduler.release()
+    for thread in threads:
+        thread.join()
+    return served
+
+
+class TestEsiRequestScheduler:
+    """Tests for EsiRequestScheduler."""
+
+    def test_priority_before_arrival(self):
+        """Test that interactive requests overtake queued bulk and background requests."""
+        scheduler = EsiRequestScheduler(1, reserved=0)
+        requests = [(EsiPriority.BULK, "bulk"), (EsiPriority.BACKGROUND, "background")]
+        requests.append((EsiPriority.INTERACTIVE, "interactive"))
+        assert run_queued(scheduler, requests) == ["interactive", "background", "bulk"]
+
+    def test_weighted_fairness_between_tenants(self):
+        """Test that a tenant queueing many requests does not starve another one."""
+        scheduler = EsiRequestScheduler(1, reserved=0, weights={"heavy": 2.0})
+        requests = [(EsiPriority.BULK, "corp")] * 6 + [(EsiPriority.BULK, "user")] * 2
+        assert run_queued(scheduler, requests)[:4] == ["corp", "user", "corp", "user"]
+        requests = [(EsiPriority.BULK, "heavy")] * 6 + [(EsiPriority.BULK, "light")] * 3
+        assert run_queued(scheduler, requests)[:6] == ["heavy", "heavy", "light", "heavy", "heavy", "light"]
+
+    def test_reserved_slots(self):
+        """Test that background requests cannot use slots reserved for interactive ones."""
+        scheduler = EsiRequestScheduler(2, reserved=1)
+        assert scheduler.acquire(timeout=1)
+        assert not scheduler.acquire(timeout=0.05)
+        assert scheduler.waiting == 0
+        with request_context(EsiPriority.INTERACTIVE):
+            assert scheduler.acquire(timeout=1)
+        assert scheduler.in_flight == 2
+        scheduler.release()
+        scheduler.release()
+        assert scheduler.acquire(timeout=1)
+
+    def test_async_slot(self):
+        """Test that asyncio waiters get slots in turn and a cancelled waiter gives its place up."""
+
+        async def main() -> list[str]:
+            scheduler = EsiRequestScheduler(1, reserved=0)
+            served: list[str] = []
+
+            async def request(name: str) -> None:
+                async with scheduler.async_slot():
+                    served.append(name)
+                    await asyncio.sleep(0.01)
+
+            await scheduler.acquire_async()
+            cancelled = asyncio.create_task(request("cancelled"))
+            waiting = asyncio.create_task(request("waiting"))
+            await asyncio.sleep(0.01)
+            cancelled.cancel()
+            await asyncio.sleep(0.01)
+            scheduler.release()
+            await waiting
+            assert scheduler.in_flight == 0 and scheduler.waiting == 0
+            return served
+
+        assert asyncio.run(main()) == ["waiting"]
+
+    def test_context_follows_thread_pools(self):
+        """Test that fan-out threads inherit the submitting context."""
+        with request_context(EsiPriority.BULK, "corp"), ContextThreadPoolExecutor(2) as pool:
+            from pyesi_client.core.scheduler import _priority, current_tenant
+
+            assert (
+                list(pool.map(lambda _: (_priority.get(), current_tenant()), range(2)))
+                == [(EsiPriority.BULK, "corp")] * 2
+            )
@@ -0,0 +1,107 @@
+"""Tests for the scope bitset, scope index and scope manager."""
+
+import pytest
+
+from pyesi_client import EsiScope, EsiScopeIndex, EsiScopeManager, EsiScopeSet
+
+
+class TestEsiScopeSet:
+    """Tests for EsiScopeSet."""
+
+    def test_membership_and_length(self):
+        """Test that scopes added to a set are reported as members."""
+        scopes = EsiScopeSet.from_scopes([EsiScope.ASSETS_READ_ASSETS, "esi-skills.read_skills.v1"])
+        assert EsiScope.ASSETS_READ_ASSETS in scopes
+        assert EsiScope.SKILLS_READ_SKILLS in scopes
+        assert "esi-skills.read_skills.v1" in scopes
+        assert EsiScope.MAIL_READ_MAIL not in scopes
+        assert len(scopes) == 2
+
+    def test_unknown_scope_raises(self):
+        """Test that unknown scope strings are rejected."""
+        with pytest.raises(ValueError):
+            EsiScopeSet.from_scopes(["esi-unknown.v1"])
+
+    def test_oauth_string_matches_sorted_values(self):
+        """Test that the OAuth string is sorted by scope value."""
+        scopes = list(EsiScope)
+        expected = " ".join(sorted(scope.value for scope in scopes))
+        assert EsiScopeSet.from_scopes(scopes).oauth_string == expected
+        assert EsiScopeSet.all().oauth_string == expected
+
+    def test_oauth_string_round_trip(self):
+        """Test that parsing an OAuth string yields an equal set."""
+        scopes = EsiScopeSet.from_scopes([EsiScope.WALLET_READ_CHARACTER_WALLET, EsiScope.ASSETS_READ_ASSETS])
+        assert EsiScopeSet.from_oauth_string(scopes.oauth_string) == scopes
+        assert EsiScopeSet.from_oauth_string(scopes.oauth_string) is EsiScopeSet.from_oauth_string(scopes.oauth_string)
+
+    def test_subset_and_superset(self):
+        """Test subset and superset checks."""
+        small = EsiScopeSet.from_scopes([EsiScope.ASSETS_READ_ASSETS])
+        large = EsiScopeSet.from_scopes([EsiScope.ASSETS_READ_ASSETS, EsiScope.SKILLS_READ_SKILLS])
+        assert small.issubset(large)
+        assert large.issuperset(small)
+        assert not large.issubset(small)
+        assert small <= large
+        assert (large - small) == {EsiScope.SKILLS_READ_SKILLS}
+        assert (small | large) == large
+        assert (small & large) == small
+
+
+class TestEsiScopeIndex:
+    """Tests for EsiScopeIndex."""
+
+    def test_characters_with(self):
+        """Test that only characters holding every scope are eligible."""
+        index = EsiScopeIndex()
+        index.set(1, [EsiScope.ASSETS_READ_CORPORATION_ASSETS, EsiScope.ASSETS_READ_ASSETS])
+        index.set(2, [EsiScope.ASSETS_READ_ASSETS])
+        index.set(3, [EsiScope.ASSETS_READ_CORPORATION_ASSETS])
+        assert index.characters_with(EsiScope.ASSETS_READ_ASSETS) == (1, 2)
+        assert index.characters_with(EsiScope.ASSETS_READ_CORPORATION_ASSETS) == (1, 3)
+        assert index.characters_with(EsiScope.ASSETS_READ_ASSETS, EsiScope.ASSETS_READ_CORPORATION_ASSETS) == (1,)
+
+    def test_changes_invalidate_lookups(self):
+        """Test that registering and removing characters updates cached lookups."""
+        index = EsiScopeIndex()
+        required = EsiScopeSet.from_scopes([EsiScope.SKILLS_READ_SKILLS])
+        index.set(1, required)
+        assert index.eligible(required) == (1,)
+        index.set(2, required)
+        assert index.eligible(required) == (1, 2)
+        index.discard(1)
+        assert index.eligible(required) == (2,)
+        assert 1 not in index
+
+
+class TestEsiScopeManager:
+    """Tests for EsiScopeManager."""
+
+    def test_accepts_sets_and_lists(self):
+        """Test that the manager accepts sets, lists and raw scope strings."""
+        from_set = EsiScopeManager(scopes={EsiScope.ASSETS_READ_ASSETS})
+        from_list = EsiScopeManager(scopes=["esi-assets.read_assets.v1"])  # type: ignore[arg-type]
+        assert from_set.scopes == from_list.scopes
+
+    def test_add_remove_and_has(self):
+        """Test adding and removing scopes."""
+        manager = EsiScopeManager()
+        manager.add(EsiScope.ASSETS_READ_ASSETS, EsiScope.SKILLS_READ_SKILLS)
+        assert manager.has(EsiScope.SKILLS_READ_SKILLS)
+        manager.remove(EsiScope.SKILLS_READ_SKILLS)
+        assert not manager.has(EsiScope.SKILLS_READ_SKILLS)
+        assert manager.to_oauth_string() == EsiScope.ASSETS_READ_ASSETS.value
+
+    def test_matches(self):
+        """Test matching against JWT scope representations."""
+        manager = EsiScopeManager(scopes={EsiScope.ASSETS_READ_ASSETS, EsiScope.SKILLS_READ_SKILLS})
+        assert manager.matches("esi-skills.read_skills.v1 esi-assets.read_assets.v1")
+        assert manager.matches(["esi-assets.read_assets.v1", "esi-skills.read_skills.v1"])
+        assert manager.matches({EsiScope.ASSETS_READ_ASSETS, EsiScope.SKILLS_READ_SKILLS})
+        assert not manager.matches("esi-assets.read_assets.v1")
+        assert not manager.matches("esi-assets.read_assets.v1 esi-skills.read_skills.v1 esi-unknown.v1")
+
+    def test_model_dump(self):
+        """Test that scopes serialize as sorted scope strings."""
+        manager = EsiScopeManager(scopes={EsiScope.SKILLS_READ_SKILLS, EsiScope.ASSETS_READ_ASSETS})
+        assert manager.model_dump() == {"scopes": ["esi-assets.read_assets.v1", "esi-skills.read_skills.v1"]}
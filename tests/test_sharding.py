@@ -0,0 +1,77 @@
+"""Tests for consistent hashing and shard membership."""
+
+import os
+import time
+
+from pyesi_openapi import ApiClient, Configuration
+
+from pyesi_client import EsiHashRing, EsiShard, EsiShardCoordinator, EsiTokenPool
+from pyesi_client.core.sharding import shard_key
+
+
+class TestEsiHashRing:
+    """Tests for EsiHashRing."""
+
+    def test_balance_and_minimal_movement(self):
+        """Test that keys spread evenly and a new node only takes keys from others."""
+        keys = [shard_key("character", character_id) for character_id in range(10_000)]
+        ring = EsiHashRing(["a", "b", "c", "d"])
+        before = {key: ring.node_for(key) for key in keys}
+        sizes = [len(owned) for owned in ring.assign(keys).values()]
+        assert min(sizes) > 0.7 * len(keys) / 4
+
+        ring.add("e")
+        moved = [key for key in keys if ring.node_for(key) != before[key]]
+        assert {ring.node_for(key) for key in moved} == {"e"}
+        assert 0.1 * len(keys) < len(moved) < 0.3 * len(keys)
+
+        ring.remove("e")
+        assert {key: ring.node_for(key) for key in keys} == before
+
+
+class TestEsiShard:
+    """Tests for EsiShard."""
+
+    def test_rebalance_on_join_and_leave(self, tmp_path):
+        """Test that workers split entities without overlap and take over a leaving worker's share."""
+        first = EsiShard(EsiShardCoordinator(tmp_path, "first"))
+        second = EsiShard(EsiShardCoordinator(tmp_path, "second"))
+        assert first.refresh() and not second.refresh()
+
+        regions = list(range(10000001, 10000070))
+        owned = first.select("region", regions), second.select("region", regions)
+        assert sorted(owned[0] + owned[1]) == regions and owned[0] and owned[1]
+
+        second.coordinator.leave()
+        assert first.refresh()
+        assert first.select("region", regions) == regions
+
+    def test_stale_worker_is_dropped(self, tmp_path):
+        """Test that workers without a recent heartbeat are no longer members."""
+        EsiShardCoordinator(tmp_path, "stale").heartbeat()
+        stale = tmp_path / "stale.worker"
+        os.utime(stale, (time.time() - 60, time.time() - 60))
+        assert EsiShard(EsiShardCoordinator(tmp_path, "live")).members == ("live",)
+
+    def test_assign_tokens(self, tmp_path):
+        """Test that every character lands in exactly one shard, the one owning its corporation when known."""
+        shard = EsiShard(EsiShardCoordinator(tmp_path, "first"))
+        other = EsiShard(EsiShardCoordinator(tmp_path, "second"))
+        shard.refresh()
+        characters = range(1, 41)
+        # Characters 1-20 share four corporations, 21-40 have no known corporation
+        corporations = {character_id: 1000 + character_id % 4 for character_id in range(1, 21)}
+        tokens = {c: f"rt{c}" for c in characters}
+
+        added: dict[str, list[str]] = {"first": [], "second": []}
+        for worker in (shard, other):
+            pool = EsiTokenPool(ApiClient(Configuration()), "client")
+            tokens_added = added[worker.worker_id]
+            pool.add_refresh_token = lambda token, tokens_added=tokens_added, **kwargs: tokens_added.append(token)  # type: ignore[method-assign]
+            worker.assign_tokens(pool, tokens, corporation_ids=corporations)
+
+        assert sorted(added["first"] + added["second"]) == sorted(tokens.values())
+        assert added["first"] == [tokens[c] for c in characters if shard.owns_character(c, corporations.get(c))]
+        for corporation_id in set(corporations.values()):
+            members = {tokens[c] for c, corporation in corporations.items() if corporation == corporation_id}
+            assert members <= set(added["first"]) or members <= set(added["second"])
@@ -0,0 +1,119 @@
+"""Tests for shared token stores and coordinated refreshes."""
+
+import threading
+import time
+
+from pyesi_openapi import ApiClient, Configuration
+
+from pyesi_client import EsiAuth, EsiMemoryTokenStore, EsiScopeManager, EsiSqliteTokenStore
+from pyesi_client.models import EsiTokenSet
+
+
+def make_token_set(refresh_token: str, ttl: int = 1200) -> EsiTokenSet:
+    return EsiTokenSet(
+        access_token=f"access-{refresh_token}",
+        refresh_token=refresh_token,
+        token_type="Bearer",
+        expires_at=int(time.time()) + ttl,
+    )
+
+
+class RotatingSso:
+    """SSO stand-in that rotates refresh tokens and rejects any token already used."""
+
+    def __init__(self, refresh_token: str):
+        self.current = refresh_token
+        self.refreshes = 0
+        self._lock = threading.Lock()
+
+    def refresh(self, refresh_token: str) -> EsiTokenSet:
+        with self._lock:
+            if refresh_token != self.current:
+                raise ValueError(f"Refresh token {refresh_token} was already rotated")
+            self.refreshes += 1
+            self.current = f"rt{self.refreshes}"
+        time.sleep(0.05)
+        return make_token_set(self.current)
+
+
+class FakeAuth(EsiAuth):
+    """EsiAuth sending token requests to a RotatingSso."""
+
+    def __init__(self, sso: RotatingSso, **kwargs):
+        self.sso = sso
+        super().__init__(ApiClient(Configuration()), EsiScopeManager(), "http://localhost", "client", **kwargs)
+
+    def _request_token(self, request) -> EsiTokenSet:
+        return self.sso.refresh(request.refresh_token)
+
+
+class TestEsiSqliteTokenStore:
+    """Tests for EsiSqliteTokenStore."""
+
+    def test_tokens_and_leases(self, tmp_path):
+        """Test that leases are exclusive across store instances until released or expired."""
+        first = EsiSqliteTokenStore(tmp_path / "tokens.db")
+        second = EsiSqliteTokenStore(tmp_path / "tokens.db")
+        first.put("character:1", make_token_set("rt0"))
+        assert second.get("character:1") == first.get("character:1")
+        assert second.get("character:2") is None
+
+        assert first.acquire("character:1", "a", 30)
+        assert not second.acquire("character:1", "b", 30)
+        second.release("character:1", "b")
+        assert not second.acquire("character:1", "b", 30)
+        first.release("character:1", "a")
+        assert second.acquire("character:1", "b", 0.01)
+        time.sleep(0.02)
+        assert first.acquire("character:1", "a", 30)
+
+
+class TestSharedRefresh:
+    """Tests for EsiAuth refreshes coordinated across threads and processes."""
+
+    def test_one_refresh_across_workers(self, tmp_path):
+        """Test that concurrent workers seeded with one refresh token refresh it once."""
+        sso = RotatingSso("rt0")
+        path = tmp_path / "tokens.db"
+        auths: list[FakeAuth] = []
+
+        def start_worker():
+            auths.append(FakeAuth(sso, refresh_token="rt0", token_store=EsiSqliteTokenStore(path)))
+
+        workers = [threading.Thread(target=start_worker) for _ in range(8)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert sso.refreshes == 1
+        assert {auth.access_token for auth in auths} == {"access-rt1"}
+
+    def test_expired_token_adopts_stored_refresh(self):
+        """Test that an expired worker picks up the token set another worker stored."""
+        sso = RotatingSso("rt0")
+        store = EsiMemoryTokenStore()
+        first = FakeAuth(sso, refresh_token="rt0", token_store=store, token_key="character:1")
+        second = FakeAuth(sso, refresh_token="rt0", token_store=store, token_key="character:1")
+        assert sso.refreshes == 1
+        # Expire the shared token set, as after 20 minutes
+        store.put("character:1", make_token_set("rt1", ttl=-1))
+        first._token_set = second._token_set = store.get("character:1")
+
+        assert first.access_token == "access-rt2"
+        assert second.access_token == "access-rt2"
+        assert sso.refreshes == 2
+
+    def test_one_refresh_across_threads(self):
+        """Test that threads reading an expired token without a store wait for a single refresh."""
+        sso = RotatingSso("rt0")
+        auth = FakeAuth(sso, refresh_token="rt0")
+        auth._token_set = make_token_set("rt1", ttl=-1)
+        tokens: list[str] = []
+
+        workers = [threading.Thread(target=lambda: tokens.append(auth.access_token)) for _ in range(8)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert sso.refreshes == 2
+        assert tokens == ["access-rt2"] * 8
@@ -0,0 +1,95 @@
+"""Tests for the record and replay transport."""
+
+import json
+import time
+
+import pytest
+import urllib3
+from pyesi_openapi import ApiClient, ApiException, Configuration
+from pyesi_openapi.rest import RESTResponse
+
+from pyesi_client import EsiClient, EsiMetadataManager, EsiRecordingTransport, EsiReplayTransport, EsiTransportArchive
+
+METADATA = {
+    "issuer": "https://login.eveonline.com",
+    "authorization_endpoint": "https://login.eveonline.com/v2/oauth/authorize",
+    "token_endpoint": "https://login.eveonline.com/v2/oauth/token",
+    "jwks_uri": "https://login.eveonline.com/oauth/jwks",
+    "revocation_endpoint": "https://login.eveonline.com/v2/oauth/revoke",
+}
+ORDERS = "https://esi.evetech.net/markets/10000002/orders"
+
+
+class FakeRestClient:
+    """Network stand-in answering SSO discovery, token and paged market requests."""
+
+    def __init__(self):
+        self.calls: list[str] = []
+
+    def request(self, method, url, headers=None, body=None, post_params=None, _request_timeout=None):
+        self.calls.append(url)
+        time.sleep(0.02)
+        if url == "https://login.eveonline.com/.well-known/oauth-authorization-server":
+            payload, headers = METADATA, {}
+        elif url.endswith("/token"):
+            payload, headers = {"access_token": post_params["refresh_token"]}, {}
+        else:
+            page = int(url.rsplit("=", 1)[1])
+            payload, headers = [{"order_id": page}], {"X-Pages": "2", "ETag": f'"{page}"'}
+        data = json.dumps(payload).encode()
+        return RESTResponse(urllib3.HTTPResponse(body=data, headers=headers, status=200, preload_content=False))
+
+
+def record(network: FakeRestClient) -> EsiTransportArchive:
+    api_client = ApiClient(Configuration())
+    api_client.rest_client = network
+    recorder = EsiRecordingTransport()
+    recorder.install(api_client)
+    EsiMetadataManager(api_client).discover_metadata()
+    api_client.call_api("POST", METADATA["token_endpoint"], post_params={"refresh_token": "secret"})
+    for page in (1, 2):
+        api_client.call_api("GET", f"{ORDERS}?page={page}").read()
+    return recorder.archive
+
+
+class TestEsiTransport:
+    """Tests for EsiRecordingTransport and EsiReplayTransport."""
+
+    def test_record_and_replay(self, tmp_path):
+        """Test that recorded exchanges replay offline with headers and without request secrets."""
+        network = FakeRestClient()
+        archive = record(network)
+        assert len(archive) == 4
+        path = tmp_path / "esi.jsonl.gz"
+        archive.save(path)
+        assert b"secret" not in path.read_bytes()
+
+        api_client = ApiClient(Configuration())
+        EsiReplayTransport(path).install(api_client)
+        metadata = EsiMetadataManager(api_client).discover_metadata()
+        assert metadata.token_endpoint == METADATA["token_endpoint"]
+        response = api_client.call_api("GET", f"{ORDERS}?page=2")
+        assert json.loads(response.read()) == [{"order_id": 2}]
+        assert response.getheader("x-pages") == "2"
+        # Another refresh token still gets the recorded token response
+        token = api_client.call_api("POST", METADATA["token_endpoint"], post_params={"refresh_token": "other"})
+        assert json.loads(token.read()) == {"access_token": "secret"}
+        assert len(network.calls) == 4
+
+    def test_unknown_request_and_speed(self):
+        """Test that unrecorded requests fail and speed scales recorded durations."""
+        transport = EsiReplayTransport(record(FakeRestClient()), speed=2)
+        api_client = ApiClient(Configuration())
+        transport.install(api_client)
+        started = time.monotonic()
+        api_client.call_api("GET", f"{ORDERS}?page=1")
+        assert time.monotonic() - started >= 0.01
+        with pytest.raises(ApiException):
+            api_client.call_api("GET", f"{ORDERS}?page=3")
+        assert transport.served == 1
+
+    def test_client_installs_transport(self):
+        """Test that EsiClient sends its requests through the given transport."""
+        transport = EsiReplayTransport(EsiTransportArchive())
+        client = EsiClient("client_id", transport=transport)
+        assert client.api_client.rest_client is transport
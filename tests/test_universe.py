@@ -0,0 +1,152 @@
+"""Tests for the universe static data tables and preloader."""
+
+import math
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from pyesi_openapi import ApiException
+
+from pyesi_client import EsiUniversePreloader, EsiUniverseTables
+
+# Three systems in a line, 1 <-> 2 <-> 3, with system 3 in another region
+CONSTELLATIONS = {
+    20: SimpleNamespace(constellation_id=20, region_id=10, systems=[1, 2]),
+    21: SimpleNamespace(constellation_id=21, region_id=11, systems=[3]),
+}
+SYSTEMS = {
+    1: SimpleNamespace(system_id=1, constellation_id=20, security_status=0.9, stargates=[100]),
+    2: SimpleNamespace(system_id=2, constellation_id=20, security_status=0.4, stargates=[101, 102]),
+    3: SimpleNamespace(system_id=3, constellation_id=21, security_status=-0.2, stargates=[103]),
+}
+STARGATES = {
+    100: SimpleNamespace(system_id=1, destination=SimpleNamespace(system_id=2)),
+    101: SimpleNamespace(system_id=2, destination=SimpleNamespace(system_id=1)),
+    102: SimpleNamespace(system_id=2, destination=SimpleNamespace(system_id=3)),
+    103: SimpleNamespace(system_id=3, destination=SimpleNamespace(system_id=2)),
+}
+
+
+class FakeUniverseApi:
+    """Generated API stand-in counting calls per operation, failing stargates a set number of times."""
+
+    def __init__(self):
+        self.calls: dict[str, int] = {}
+        self.stargate_failures: dict[int, int] = {}
+
+    def __getattr__(self, name: str):
+        operation = name.removesuffix("_data")
+        handlers = {
+            "get_universe_constellations": lambda: list(CONSTELLATIONS),
+            "get_universe_constellations_constellation_id": lambda constellation_id: CONSTELLATIONS[constellation_id],
+            "get_universe_systems": lambda: list(SYSTEMS),
+            "get_universe_systems_system_id": lambda system_id: SYSTEMS[system_id],
+            "get_universe_stargates_stargate_id": lambda stargate_id: STARGATES[stargate_id],
+            "get_universe_categories": lambda: [6],
+            "get_universe_categories_category_id": lambda category_id: SimpleNamespace(groups=[25]),
+            "get_universe_groups_group_id": lambda group_id: SimpleNamespace(group_id=25, category_id=6, types=[587]),
+            "get_universe_types_type_id": lambda type_id: SimpleNamespace(
+                type_id=type_id, volume=27289.0, packaged_volume=2500.0
+            ),
+        }
+
+        def call(x_compatibility_date: date, **kwargs):
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            stargate_id = kwargs.get("stargate_id")
+            if self.stargate_failures.get(stargate_id):
+                self.stargate_failures[stargate_id] -= 1
+                raise ApiException(status=502, reason="Bad Gateway")
+            return handlers[operation](**kwargs)
+
+        return call
+
+
+class TestEsiUniverseTables:
+    """Tests for EsiUniverseTables."""
+
+    def test_lookups(self):
+        """Test system, gate and type lookups."""
+        tables = EsiUniverseTables.build(
+            "2025-08-26",
+            systems=[(3, 21, 11, -0.2), (1, 20, 10, 0.9), (2, 20, 10, 0.4)],
+            gates=[(1, 2), (2, 1), (2, 3), (3, 2), (3, 99)],
+            types=[(587, 25, 6, 27289.0, None)],
+        )
+        assert tables.system_region(3) == 11
+        assert tables.security_status(2) == 0.4
+        assert tables.neighbors(2) == (1, 3)
+        assert tables.neighbors(3) == (2,)
+        assert tables.type_category(587) == 6
+        assert math.isnan(tables.type_volume(587, packaged=True))
+        with pytest.raises(KeyError):
+            tables.system_region(4)
+
+    def test_save_and_load(self, tmp_path):
+        """Test that tables survive a round trip through the binary format."""
+        tables = EsiUniverseTables.build("2025-08-26", systems=[(1, 20, 10, 0.9), (2, 20, 10, 0.4)], gates=[(1, 2)])
+        tables.save(tmp_path / "universe.bin")
+        loaded = EsiUniverseTables.load(tmp_path / "universe.bin")
+        assert loaded.compatibility_date == "2025-08-26"
+        assert loaded.system_ids == tables.system_ids
+        assert loaded.neighbors(1) == (2,)
+
+
+class TestEsiUniversePreloader:
+    """Tests for EsiUniversePreloader."""
+
+    def test_fetch_builds_tables(self):
+        """Test that ESI data is assembled into tables."""
+        client = SimpleNamespace(universe=FakeUniverseApi(), compatibility_date=datetime(2025, 8, 26))
+        tables = EsiUniversePreloader(client).fetch()  # type: ignore[arg-type]
+        assert tables.neighbors(2) == (1, 3)
+        assert tables.system_region(3) == 11
+        assert tables.type_group(587) == 25
+        assert tables.type_volume(587) == 27289.0
+        assert client.universe.calls["get_universe_stargates_stargate_id"] == 4
+
+    def test_failed_ids_retried(self, tmp_path):
+        """Test that failing ids are retried, and ids still failing after the last attempt are reported and not cached."""
+        client = SimpleNamespace(universe=FakeUniverseApi(), compatibility_date=datetime(2025, 8, 26))
+        client.universe.stargate_failures = {101: 2}
+        assert EsiUniversePreloader(client).fetch().neighbors(2) == (1, 3)  # type: ignore[arg-type]
+        assert client.universe.calls["get_universe_stargates_stargate_id"] == 6
+
+        client.universe.stargate_failures = {101: 3, 103: 1}
+        path = tmp_path / "universe.bin"
+        with pytest.raises(ApiException, match=r"\[101\]") as raised:
+            EsiUniversePreloader(client, cache_path=path).load()  # type: ignore[arg-type]
+        assert raised.value.status == 502
+        assert list(tmp_path.iterdir()) == []
+
+    def test_cache_reused_until_compatibility_date_changes(self, tmp_path):
+        """Test that cached tables are only refetched for a new client or preloader compatibility date."""
+        client = SimpleNamespace(universe=FakeUniverseApi(), compatibility_date=datetime(2025, 8, 26))
+        path = tmp_path / "universe.bin"
+        EsiUniversePreloader(client, cache_path=path).load()  # type: ignore[arg-type]
+        EsiUniversePreloader(client, cache_path=path).load()  # type: ignore[arg-type]
+        assert client.universe.calls["get_universe_systems"] == 1
+
+        client.compatibility_date = datetime(2025, 9, 30)
+        assert EsiUniversePreloader(client, cache_path=path).load().compatibility_date == "2025-09-30"  # type: ignore[arg-type]
+        assert client.universe.calls["get_universe_systems"] == 2
+
+        newer = EsiUniversePreloader(client, cache_path=path, compatibility_date=date(2026, 1, 1))  # type: ignore[arg-type]
+        assert newer.load().compatibility_date == "2026-01-01"
+        assert client.universe.calls["get_universe_systems"] == 3
+
+    def test_warm_ahead_of_cutover(self, tmp_path):
+        """Test that warming a new date leaves the current tables in place and serves the cutover from cache."""
+        client = SimpleNamespace(universe=FakeUniverseApi(), compatibility_date=datetime(2025, 8, 26))
+        path = tmp_path / "universe.bin"
+        preloader = EsiUniversePreloader(client, cache_path=path)  # type: ignore[arg-type]
+        preloader.load()
+        assert preloader.warm(date(2026, 1, 1)).compatibility_date == "2026-01-01"
+        assert preloader.load().compatibility_date == "2025-08-26"
+        assert sorted(file.name for file in tmp_path.iterdir()) == [
+            "universe.2025-08-26.bin",
+            "universe.2026-01-01.bin",
+        ]
+
+        client.compatibility_date = date(2026, 1, 1)
+        assert preloader.load().compatibility_date == "2026-01-01"
+        assert client.universe.calls["get_universe_systems"] == 2
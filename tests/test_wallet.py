@@ -0,0 +1,91 @@
+"""Tests for the incremental wallet sync."""
+
+from types import SimpleNamespace
+
+from pyesi_openapi import ApiException
+
+from pyesi_client import EsiBlobStore, EsiWalletSync
+
+PAGE_SIZE = 3
+
+
+class FakeWallet:
+    """Wallet endpoints over in-memory entries, newest first, with page ETags."""
+
+    def __init__(self):
+        self.journal_ids: list[int] = []
+        self.transaction_ids: list[int] = []
+        self.calls: list[dict] = []
+
+    def get_characters_character_id_wallet_journal_with_http_info(self, character_id, page, if_none_match):
+        self.calls.append({"page": page, "if_none_match": if_none_match})
+        ids = sorted(self.journal_ids, reverse=True)
+        chunk = ids[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+        return self._respond(chunk, if_none_match, pages=max(1, -(-len(ids) // PAGE_SIZE)))
+
+    def get_characters_character_id_wallet_transactions_with_http_info(self, character_id, from_id, if_none_match):
+        self.calls.append({"from_id": from_id, "if_none_match": if_none_match})
+        ids = [i for i in sorted(self.transaction_ids, reverse=True) if from_id is None or i <= from_id]
+        return self._respond(ids[:PAGE_SIZE], if_none_match, field="transaction_id")
+
+    def _respond(self, ids, if_none_match, pages=1, field="id"):
+        etag = f'"{",".join(map(str, ids))}"'
+        if etag == if_none_match:
+            raise ApiException(status=304, reason="Not Modified")
+        data = [SimpleNamespace(**{field: i}) for i in ids]
+        return SimpleNamespace(data=data, headers={"ETag": etag, "X-Pages": str(pages)})
+
+
+class FakeRouter:
+    def call(self, func, /, **kwargs):
+        return func(**kwargs)
+
+
+def make_sync(store: EsiBlobStore | None = None) -> tuple[EsiWalletSync, FakeWallet]:
+    wallet = FakeWallet()
+    client = SimpleNamespace(wallet=wallet, router=FakeRouter())
+    return EsiWalletSync(client, store=store), wallet  # type: ignore[arg-type]
+
+
+class TestEsiWalletSync:
+    """Tests for EsiWalletSync."""
+
+    def test_journal_stops_at_known_entries(self):
+        """Test that later syncs read only the pages holding new entries."""
+        sync, wallet = make_sync()
+        wallet.journal_ids = list(range(1, 8))
+        assert [row.id for row in sync.character_journal(1)] == list(range(1, 8))
+        assert len(wallet.calls) == 3
+
+        wallet.calls.clear()
+        wallet.journal_ids += [8, 9]
+        assert [row.id for row in sync.character_journal(1)] == [8, 9]
+        assert [call["page"] for call in wallet.calls] == [1]
+
+    def test_unchanged_wallet_is_revalidated(self):
+        """Test that an unchanged first page ends the sync with a 304."""
+        sync, wallet = make_sync()
+        wallet.journal_ids = [1, 2]
+        sync.character_journal(1)
+        wallet.calls.clear()
+        assert sync.character_journal(1) == []
+        assert wallet.calls == [{"page": 1, "if_none_match": '"2,1"'}]
+
+    def test_transactions_walk_from_id(self, tmp_path):
+        """Test that transactions are followed backwards with from_id and cursors persist."""
+        store = EsiBlobStore(tmp_path / "wallet.sqlite3")
+        sync, wallet = make_sync(store)
+        wallet.transaction_ids = list(range(10, 17))
+        assert [row.transaction_id for row in sync.character_transactions(1)] == list(range(10, 17))
+        assert [call["from_id"] for call in wallet.calls] == [None, 14, 12, 10]
+
+        sync, wallet = make_sync(EsiBlobStore(tmp_path / "wallet.sqlite3"))
+        wallet.transaction_ids = list(range(10, 20))
+        assert [row.transaction_id for row in sync.character_transactions(1)] == [17, 18, 19]
+        assert sync.cursor("character:1:transactions").last_id == 19
+
+    def test_sync_many(self):
+        """Test that sync only reports wallets with new entries."""
+        sync, wallet = make_sync()
+        wallet.journal_ids = [1]
+        assert list(sync.sync(character_ids=[1])) == ["character:1:journal"]